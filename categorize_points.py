@@ -2,11 +2,14 @@
 """
 PAIN_POINTS, POSITIVE_POINTS 카테고리화
 - 이미 재분류된 pain_points/positive_points를 그대로 카테고리로 사용
+- 재분류까지 한 번에 하려면 recategorize_all.py (파일을 1번만 읽고 씀)
 """
 import json
 import sys
 from collections import Counter
 
+from src.categorizer import write_compact_json
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 
@@ -76,9 +79,8 @@ def main():
                 pos_cats.append(pos)
         item['positive_categories'] = list(set(pos_cats))  # 중복 제거
 
-    # 저장
-    with open('output/gpt_analysis_categorized.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # 저장 (1줄 1항목 - export_db_to_json과 같은 형식)
+    write_compact_json(data, 'output/gpt_analysis_categorized.json')
 
     print(f"카테고리 동기화 완료: output/gpt_analysis_categorized.json")
 
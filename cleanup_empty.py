@@ -1,32 +1,45 @@
 # -*- coding: utf-8 -*-
-import sys, os
+"""
+분석 결과 정리 (집합 단위 DELETE, 청크별 커밋)
+- empty_content: 원본 리뷰 본문이 비어 있는 분석
+- duplicates: 같은 리뷰의 중복 분석 (최근 것만 남김)
+- orphans: 원본 리뷰가 없는 분석 (MANUAL 분석 제외)
+"""
+import sys
 from dotenv import load_dotenv
 from sqlalchemy import text
+
+from src.maintenance import (
+    DUPLICATE_ANALYSES_SQL, ORPHAN_ANALYSES_SQL, delete_analyses_where, empty_content_sql, print_counts
+)
+from src.storage import ANALYSIS_TABLE, open_repository
+
 sys.stdout.reconfigure(encoding='utf-8')
 load_dotenv('config/.env')
-_ns = {}
-with open(os.getenv('DB_CONNECTOR'), 'r', encoding='utf-8') as f:
-    exec(f.read(), _ns)
-engine = _ns['engine']
-
-with engine.begin() as conn:
-    # 리뷰 컨텐츠가 없는 분석 건 찾기
-    rows = conn.execute(text("""
-        SELECT a.ANALYSIS_ID, a.REVIEW_ID
-        FROM TB_REVIEW_GPT_ANALYSIS a
-        JOIN TB_CRAWLING_REVIEW cr ON a.REVIEW_ID = cr.REVIEW_ID
-        WHERE cr.REVIEW_CONTENT IS NULL OR TRIM(cr.REVIEW_CONTENT) IS NULL
-    """)).fetchall()
-    print(f"삭제 대상: {len(rows)}건")
-
-    if rows:
-        aids = [r[0] for r in rows]
-        for aid in aids:
-            conn.execute(text("DELETE FROM TB_REVIEW_TAGS WHERE ANALYSIS_ID = :aid"), {'aid': aid})
-            conn.execute(text("DELETE FROM TB_REVIEW_POSITIVE_POINTS WHERE ANALYSIS_ID = :aid"), {'aid': aid})
-            conn.execute(text("DELETE FROM TB_REVIEW_PAIN_POINTS WHERE ANALYSIS_ID = :aid"), {'aid': aid})
-            conn.execute(text("DELETE FROM TB_REVIEW_GPT_ANALYSIS WHERE ANALYSIS_ID = :aid"), {'aid': aid})
-        print(f"삭제 완료: {len(aids)}건")
-
-    cnt = conn.execute(text("SELECT COUNT(*) FROM TB_REVIEW_GPT_ANALYSIS")).scalar()
-    print(f"남은 분석 건수: {cnt:,}건")
+
+DRY_RUN = False                               # True면 삭제 없이 테이블별 대상 행 수만 출력
+CLEANUP_JOBS = ['empty_content']              # 'duplicates'(중복 분석), 'orphans'(원본 리뷰 테이블이 완전할 때만)는 직접 추가
+CHUNK_SIZE = 1000                             # 한 트랜잭션에서 삭제할 분석 수
+
+
+def main():
+    repo = open_repository()
+    jobs = {
+        'empty_content': ("빈 리뷰 분석", empty_content_sql(repo)),
+        'duplicates': ("중복 분석", DUPLICATE_ANALYSES_SQL),
+        'orphans': ("원본 없는 분석", ORPHAN_ANALYSES_SQL),
+    }
+
+    for name in CLEANUP_JOBS:
+        label, id_sql = jobs[name]
+        counts = delete_analyses_where(repo, id_sql, chunk_size=CHUNK_SIZE, dry_run=DRY_RUN)
+        print_counts(counts, label, dry_run=DRY_RUN)
+        print(f"  {'삭제 대상' if DRY_RUN else '삭제 완료'}: {counts[ANALYSIS_TABLE]:,}건")
+
+    with repo.engine.connect() as conn:
+        cnt = conn.execute(text("SELECT COUNT(*) FROM TB_REVIEW_GPT_ANALYSIS")).scalar()
+    print(f"\n남은 분석 건수: {cnt:,}건")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,16 @@ GPT-4o-mini 기반 리뷰 분석
 import json
 import pandas as pd
 import os
-import time
 from openai import OpenAI
 from dotenv import load_dotenv
-from tqdm import tqdm
 import sys
 
+from src.checkpoint import compact_journal, read_journal, seed_journal
+from src.dedup import DEFAULT_THRESHOLD
+from src.llm_engine import JsonlSink, LLMAnalyzer, PromptSpec, ResponseCache, dataframe_source, print_metrics
+from src.resilience import CircuitBreaker
+from src.response_parser import POINTS_SCHEMA
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 # 환경 변수 로드
@@ -24,7 +28,13 @@ api_key = os.getenv('CLASSIFICATION_REVIEW')
 if not api_key:
     raise ValueError("CLASSIFICATION_REVIEW 환경변수가 설정되지 않았습니다.")
 
-client = OpenAI(api_key=api_key)
+client = OpenAI(api_key=api_key, max_retries=0)  # 재시도는 src.resilience에서 처리
+breaker = CircuitBreaker(failure_threshold=10, recovery_timeout=60)
+
+DEAD_LETTER_PATH = 'output/gpt_dead_letter_batch.jsonl'
+CACHE_PATH = 'output/gpt_response_cache.jsonl'
+TELEMETRY_PATH = 'output/gpt_telemetry_batch.jsonl'
+DEDUP_AUDIT_PATH = 'output/gpt_dedup_audit_batch.jsonl'
 
 # 분석 프롬프트
 ANALYSIS_PROMPT = """당신은 화장품 리뷰 분석 전문가입니다. 아래 토너 제품 리뷰를 분석해주세요.
@@ -54,93 +64,90 @@ ANALYSIS_PROMPT = """당신은 화장품 리뷰 분석 전문가입니다. 아
 JSON만 응답하세요."""
 
 
-def analyze_review_gpt(review_text, rating):
-    """단일 리뷰 GPT 분석"""
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "user", "content": ANALYSIS_PROMPT.format(review=review_text, rating=rating)}
-            ],
-            temperature=0.1,
-            max_tokens=300
-        )
-
-        content = response.choices[0].message.content.strip()
-
-        # JSON 파싱
-        if content.startswith('```'):
-            content = content.split('```')[1]
-            if content.startswith('json'):
-                content = content[4:]
-
-        result = json.loads(content)
-        return result, response.usage.total_tokens
-
-    except json.JSONDecodeError as e:
-        return {"sentiment": "NEU", "pain_points": [], "positive_points": [], "error": "json_parse"}, 0
-    except Exception as e:
-        return {"sentiment": "NEU", "pain_points": [], "positive_points": [], "error": str(e)}, 0
-
-
-def analyze_reviews_batch(reviews_df, batch_size=10, delay=0.5, save_interval=100):
-    """배치로 리뷰 분석"""
-    results = []
-    total_tokens = 0
-    errors = 0
-
-    # 기존 결과 로드 (이어서 처리)
+PROMPT = PromptSpec(ANALYSIS_PROMPT, temperature=0.1, max_tokens=300, schema=POINTS_SCHEMA)
+
+
+def _review_key(row, idx):
+    """저널 식별 키: REVIEW_ID가 있으면 사용, 없으면 행 위치"""
+    review_id = row.get('REVIEW_ID')
+    if review_id is None or pd.isna(review_id):
+        return int(idx)
+    return int(review_id)
+
+
+def analyze_reviews_batch(reviews_df, batch_size=50, delay=0.3, workers=4, fsync_policy='always',
+                          dedup_threshold=DEFAULT_THRESHOLD):
+    """
+    배치로 리뷰 분석 (공통 엔진 src.llm_engine 사용)
+
+    완료된 리뷰는 1건씩 JSONL 저널(output/gpt_analysis_results.jsonl)에 덧붙여 기록하고,
+    재개 시 저널의 REVIEW_ID 집합 기준으로 건너뜀. 마지막에 저널을 압축하여 최종 JSON 저장.
+    근사 중복 리뷰는 클러스터 대표만 분석하고 결과를 전파 (dedup_threshold=None이면 비활성화).
+    실패 건은 저널에 남기지 않고 dead-letter로 기록 → 다음 실행에서 다시 분석.
+
+    Args:
+        batch_size: 저널 기록 단위
+        delay: 요청 간 최소 간격 (초) - 초당 1/delay건으로 제한 (0이면 제한 없음)
+        workers: 동시 API 호출 수
+    """
     output_path = 'output/gpt_analysis_results.json'
-    start_idx = 0
+    journal_path = 'output/gpt_analysis_results.jsonl'
 
-    if os.path.exists(output_path):
+    # 저널 도입 이전의 JSON 결과가 있으면 저널로 이관
+    if os.path.exists(output_path) and not os.path.exists(journal_path):
         with open(output_path, 'r', encoding='utf-8') as f:
             existing = json.load(f)
-            results = existing.get('results', [])
-            start_idx = len(results)
-            total_tokens = existing.get('total_tokens', 0)
-            print(f"기존 결과 {start_idx}건 로드, 이어서 분석...")
-
-    print(f"\n총 {len(reviews_df)}건 중 {start_idx}건부터 분석 시작")
-    print(f"예상 비용: ${(len(reviews_df) - start_idx) * 0.00015:.2f} (약 150토큰/리뷰)")
-
-    for idx in tqdm(range(start_idx, len(reviews_df)), desc="GPT 분석"):
-        row = reviews_df.iloc[idx]
-        review_text = str(row['REVIEW_CONTENT'])
+        legacy = []
+        for rec in existing.get('results', []):
+            rec['review_id'] = _review_key(reviews_df.iloc[rec['idx']], rec['idx'])
+            legacy.append(rec)
+        # 기존 누적 토큰은 식별 키 없는 메타 레코드로 보존
+        legacy.append({'_meta': 'legacy_tokens', 'tokens': existing.get('total_tokens', 0)})
+        seeded = seed_journal(journal_path, legacy)
+        print(f"기존 결과 {seeded - 1}건 저널로 이관")
+
+    # 행 위치를 key로, REVIEW_ID(없으면 행 위치)를 id로 사용
+    items = dataframe_source(reviews_df.reset_index(drop=True))
+    for item in items:
+        item['id'] = _review_key(item['row'], item['key'])
+
+    def make_record(item, outcome):
+        row = item['row']
+        result = outcome['result']
         rating = row['REVIEW_RATING']
-        brand = row['BRAND_NAME']
-
-        # 분석
-        result, tokens = analyze_review_gpt(review_text, rating)
-        total_tokens += tokens
-
-        # 결과 저장
-        results.append({
-            'idx': idx,
-            'brand': brand,
-            'rating': rating,
-            'review': review_text[:100],  # 미리보기
+        return {
+            'review_id': item['id'],
+            'idx': item['key'],
+            'brand': row['BRAND_NAME'],
+            'rating': int(rating) if pd.notna(rating) else None,
+            'review': item['text'][:100],  # 미리보기
             'sentiment': result.get('sentiment', 'NEU'),
             'pain_points': result.get('pain_points', []),
             'positive_points': result.get('positive_points', []),
-            'error': result.get('error')
-        })
-
-        if result.get('error'):
-            errors += 1
+            'tokens': outcome['tokens_in'] + outcome['tokens_out'],
+            'propagated_from': outcome['propagated_from'],
+        }
 
-        # 중간 저장
-        if (idx + 1) % save_interval == 0:
-            save_results(results, total_tokens, output_path)
-            print(f"\n  {idx + 1}건 완료, 토큰: {total_tokens:,}, 에러: {errors}")
+    print(f"\n총 {len(reviews_df)}건 분석 시작")
 
-        # 딜레이
-        time.sleep(delay)
-
-    # 최종 저장
+    analyzer = LLMAnalyzer(
+        client, PROMPT, breaker=breaker, cache=ResponseCache(CACHE_PATH),
+        workers=workers, rate_per_sec=1 / delay if delay else None, batch_size=batch_size,
+        dead_letter_path=DEAD_LETTER_PATH, dedup_threshold=dedup_threshold,
+        dedup_audit_path=DEDUP_AUDIT_PATH, telemetry_path=TELEMETRY_PATH,
+    )
+    try:
+        analyzer.run(items, [JsonlSink(journal_path, make_record, fsync_policy=fsync_policy)], desc="GPT 분석")
+    finally:
+        analyzer.cache.close()
+    print_metrics(analyzer.summary(), label="GPT 분석")
+
+    # 최종 저장 (저널 압축)
+    results = compact_journal(journal_path)
+    total_tokens = sum(rec.get('tokens', 0) for rec in read_journal(journal_path))
     save_results(results, total_tokens, output_path)
 
-    return results, total_tokens, errors
+    return results, total_tokens, analyzer.metrics.errors
 
 
 def save_results(results, total_tokens, output_path):
@@ -150,13 +157,14 @@ def save_results(results, total_tokens, output_path):
             'total_tokens': total_tokens,
             'count': len(results),
             'results': results
-        }, f, ensure_ascii=False, indent=2)
+        }, f, ensure_ascii=False, indent=2, default=str)
 
 
 def merge_with_original(df, results):
     """원본 데이터프레임에 GPT 결과 병합"""
-    # 결과를 데이터프레임으로 변환
-    gpt_df = pd.DataFrame(results)
+    # 결과를 데이터프레임으로 변환 (행 위치 기준 정렬)
+    gpt_df = pd.DataFrame(results).set_index('idx').reindex(range(len(df)))
+    gpt_df.index = df.index
 
     # 원본에 병합
     df['gpt_sentiment'] = gpt_df['sentiment']
@@ -184,9 +192,9 @@ def main():
     print("\nGPT 분석 시작...")
     results, total_tokens, errors = analyze_reviews_batch(
         df,
-        batch_size=10,
-        delay=0.3,  # 초당 약 3건
-        save_interval=500
+        batch_size=50,
+        delay=0.125,  # 초당 최대 8건 (동시 4개)
+        workers=4
     )
 
     # 결과 요약
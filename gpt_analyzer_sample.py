@@ -10,6 +10,9 @@ from openai import OpenAI
 from dotenv import load_dotenv
 import sys
 
+from src.llm_engine import JsonSink, LLMAnalyzer, PromptSpec, dataframe_source, print_metrics
+from src.response_parser import FULL_SCHEMA
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 # 환경 변수 로드
@@ -19,7 +22,7 @@ api_key = os.getenv('CLASSIFICATION_REVIEW')
 if not api_key:
     raise ValueError("CLASSIFICATION_REVIEW 환경변수가 설정되지 않았습니다.")
 
-client = OpenAI(api_key=api_key)
+client = OpenAI(api_key=api_key, max_retries=0)  # 재시도는 src.resilience에서 처리
 
 # 분석 프롬프트 (옵션 2: 전체 항목)
 ANALYSIS_PROMPT = """당신은 화장품 리뷰 분석 전문가입니다. 아래 토너 제품 리뷰를 분석해주세요.
@@ -79,29 +82,19 @@ ANALYSIS_PROMPT = """당신은 화장품 리뷰 분석 전문가입니다. 아
 JSON만 응답하세요. 해당 없는 항목은 빈 배열 []로."""
 
 
-def analyze_review(review_text, rating):
-    """단일 리뷰 GPT 분석"""
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "user", "content": ANALYSIS_PROMPT.format(review=review_text, rating=rating)}
-        ],
-        temperature=0.1,
-        max_tokens=500
-    )
-
-    content = response.choices[0].message.content.strip()
-
-    # JSON 파싱
-    if content.startswith('```'):
-        content = content.split('```')[1]
-        if content.startswith('json'):
-            content = content[4:]
+PROMPT = PromptSpec(ANALYSIS_PROMPT, temperature=0.1, max_tokens=500, schema=FULL_SCHEMA)
 
-    result = json.loads(content)
-    tokens = response.usage.total_tokens
 
-    return result, tokens
+def make_record(item, outcome):
+    """JsonSink용 결과 레코드"""
+    row = item['row']
+    return {
+        'brand': row['BRAND_NAME'],
+        'rating': item['rating'],
+        'review': item['text'],
+        **outcome['result'],
+        'tokens': outcome['tokens_in'] + outcome['tokens_out'],
+    }
 
 
 def main():
@@ -164,43 +157,34 @@ def main():
 
     print(f"\n샘플 {len(samples)}건 분석 시작...\n")
 
-    total_tokens = 0
-    results = []
+    # 샘플은 다양성을 위해 고른 것이므로 근사 중복 전파 없이 전부 호출
+    sink = JsonSink('output/gpt_sample_results.json', make_record)
+    analyzer = LLMAnalyzer(client, PROMPT, workers=4, batch_size=len(samples),
+                           dead_letter_path='output/gpt_dead_letter_sample.jsonl',
+                           telemetry_path='output/gpt_telemetry_sample.jsonl')
+    analyzer.run(dataframe_source(pd.DataFrame(samples)), [sink], desc="샘플 분석")
 
-    for i, row in enumerate(samples, 1):
-        review = row['REVIEW_CONTENT']
-        rating = row['REVIEW_RATING']
-        brand = row['BRAND_NAME']
+    results = sink.records
+    total_tokens = sum(r['tokens'] for r in results)
 
-        print(f"[{i}/10] {brand} | 별점 {rating}")
+    for i, r in enumerate(results, 1):
+        review = r['review']
+        print(f"[{i}/{len(results)}] {r['brand']} | 별점 {r['rating']}")
         print(f"리뷰: {review[:60]}..." if len(review) > 60 else f"리뷰: {review}")
-
-        try:
-            result, tokens = analyze_review(review, rating)
-            total_tokens += tokens
-
-            print(f"  → 감성: {result['sentiment']}")
-            print(f"  → Pain: {result.get('pain_points', [])}")
-            print(f"  → Positive: {result.get('positive_points', [])}")
-            print(f"  → 효능: {result.get('benefit_tags', [])}")
-            print(f"  → 사용감: {result.get('texture_tags', [])}")
-            print(f"  → 사용법: {result.get('usage_tags', [])}")
-            print(f"  → 가치: {result.get('value_tags', [])}")
-            print(f"  → 토큰: {tokens}")
-
-            results.append({
-                'brand': brand,
-                'rating': rating,
-                'review': review,
-                **result,
-                'tokens': tokens
-            })
-
-        except Exception as e:
-            print(f"  → 에러: {e}")
-
+        print(f"  → 감성: {r.get('sentiment')}")
+        print(f"  → Pain: {r.get('pain_points', [])}")
+        print(f"  → Positive: {r.get('positive_points', [])}")
+        print(f"  → 효능: {r.get('benefit_tags', [])}")
+        print(f"  → 사용감: {r.get('texture_tags', [])}")
+        print(f"  → 사용법: {r.get('usage_tags', [])}")
+        print(f"  → 가치: {r.get('value_tags', [])}")
+        print(f"  → 토큰: {r['tokens']}")
         print()
 
+    if analyzer.metrics.errors:
+        print(f"에러: {analyzer.metrics.errors}건 (dead-letter: output/gpt_dead_letter_sample.jsonl)\n")
+    print_metrics(analyzer.summary(), label="샘플 분석")
+
     # 결과 요약
     print("=" * 80)
     print("샘플 분석 완료")
@@ -209,9 +193,6 @@ def main():
     print(f"평균 토큰/건: {total_tokens / len(results):.0f}")
     print(f"예상 전체 비용 (27,745건): ${total_tokens / len(results) * 27745 * 0.00000015 + total_tokens / len(results) * 27745 * 0.0000006:.2f}")
 
-    # 결과 저장
-    with open('output/gpt_sample_results.json', 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
     print(f"\n결과 저장: output/gpt_sample_results.json")
 
 
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+태그 저장 방식 전환: TB_REVIEW_TAGS (태그 1개당 1행) → 분석 행의 비트마스크 컬럼 (TAG_LAYOUT=packed)
+
+1) TB_REVIEW_GPT_ANALYSIS에 *_MASK 컬럼, TB_TAG_BITS 생성 (없을 때만)
+2) 기존 태그 값마다 비트 할당 (TAG_TYPE별 빈도순)
+3) ANALYSIS_ID 구간별로 마스크 계산 UPDATE (구간마다 커밋, 다시 실행해도 같은 결과)
+4) 검증: 태그 행 수(분석별 중복 제외) = 마스크에 켜진 비트 수
+5) DROP_TAG_ROWS=True면 검증 통과 후 TB_REVIEW_TAGS 행 삭제
+
+전환 후 config/.env에 TAG_LAYOUT=packed 설정 → 분석기/적재/내보내기/요약/재분류가 마스크 컬럼 사용
+"""
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from src.storage import ANALYSIS_TABLE, TAG_LAYOUT_PACKED, TAG_TABLE, open_repository
+from src.tag_bits import MASK_COLUMNS
+
+sys.stdout.reconfigure(encoding='utf-8')
+load_dotenv('config/.env')
+
+CHUNK_SIZE = 20000     # 한 트랜잭션에서 갱신할 ANALYSIS_ID 구간 크기
+DROP_TAG_ROWS = False  # True면 검증 통과 후 TB_REVIEW_TAGS 행 삭제 (rows 방식으로 되돌릴 수 없음)
+
+
+def register_bits(repo):
+    """기존 태그 값마다 비트 할당 → 할당된 값 수"""
+    with repo.engine.begin() as conn:
+        rows = conn.execute(text(f"""
+            SELECT TAG_TYPE, TAG_VALUE FROM {TAG_TABLE}
+            GROUP BY TAG_TYPE, TAG_VALUE
+            ORDER BY TAG_TYPE, COUNT(*) DESC, TAG_VALUE
+        """)).fetchall()
+        for tag_type, value in rows:
+            repo.tag_bits.bit(conn, tag_type, value)
+    return len(rows)
+
+
+def fill_masks(repo, chunk_size=CHUNK_SIZE):
+    """태그 행 → 마스크 (태그 행이 있는 분석만 - packed로 새로 적재된 분석은 그대로 둠) → 갱신 행 수"""
+    assignments = ',\n'.join(
+        f"""{column} = (SELECT COALESCE(SUM(b.BIT_VALUE), 0) FROM TB_TAG_BITS b
+                   WHERE b.TAG_TYPE = '{tag_type}'
+                     AND EXISTS (SELECT 'x' FROM {TAG_TABLE} t WHERE t.ANALYSIS_ID = {ANALYSIS_TABLE}.ANALYSIS_ID
+                                 AND t.TAG_TYPE = b.TAG_TYPE AND t.TAG_VALUE = b.TAG_VALUE))"""
+        for tag_type, column in MASK_COLUMNS.items()
+    )
+    sql = text(f"""
+        UPDATE {ANALYSIS_TABLE} SET
+        {assignments}
+        WHERE ANALYSIS_ID BETWEEN :lo AND :hi
+          AND EXISTS (SELECT 'x' FROM {TAG_TABLE} t WHERE t.ANALYSIS_ID = {ANALYSIS_TABLE}.ANALYSIS_ID)
+    """)
+
+    with repo.engine.connect() as conn:
+        lo, hi = conn.execute(text(f"SELECT MIN(ANALYSIS_ID), MAX(ANALYSIS_ID) FROM {TAG_TABLE}")).fetchone()
+    if lo is None:
+        return 0
+
+    updated = 0
+    for start in range(lo, hi + 1, chunk_size):
+        with repo.engine.begin() as conn:
+            updated += conn.execute(sql, {'lo': start, 'hi': start + chunk_size - 1}).rowcount
+        print(f"  ANALYSIS_ID {start:,} ~ {min(start + chunk_size - 1, hi):,}: 누적 {updated:,}건")
+    return updated
+
+
+def verify(repo):
+    """(태그 행 수, 마스크 비트 수) - 태그 행이 있는 분석 기준, 같은 분석의 중복 태그는 1개로"""
+    packed = type(repo)(repo.engine, tag_layout=TAG_LAYOUT_PACKED)
+    with repo.engine.connect() as conn:
+        expected = conn.execute(text(f"""
+            SELECT COUNT(*) FROM (SELECT DISTINCT ANALYSIS_ID, TAG_TYPE, TAG_VALUE FROM {TAG_TABLE}) x
+        """)).scalar()
+        actual = conn.execute(text(f"""
+            SELECT COUNT(*) FROM {packed.tag_source()} p
+            WHERE EXISTS (SELECT 'x' FROM {TAG_TABLE} t WHERE t.ANALYSIS_ID = p.ANALYSIS_ID)
+        """)).scalar()
+    return expected, actual
+
+
+def drop_tag_rows(repo, chunk_size=CHUNK_SIZE):
+    """TB_REVIEW_TAGS 행 삭제 (구간별 커밋) → 삭제 행 수"""
+    with repo.engine.connect() as conn:
+        lo, hi = conn.execute(text(f"SELECT MIN(ANALYSIS_ID), MAX(ANALYSIS_ID) FROM {TAG_TABLE}")).fetchone()
+    if lo is None:
+        return 0
+    deleted = 0
+    for start in range(lo, hi + 1, chunk_size):
+        with repo.engine.begin() as conn:
+            deleted += conn.execute(text(f"DELETE FROM {TAG_TABLE} WHERE ANALYSIS_ID BETWEEN :lo AND :hi"),
+                                    {'lo': start, 'hi': start + chunk_size - 1}).rowcount
+    return deleted
+
+
+def main():
+    print("=" * 60)
+    print("태그 저장 방식 전환 (TB_REVIEW_TAGS → 마스크 컬럼)")
+    print("=" * 60)
+
+    repo = open_repository()
+    with repo.engine.begin() as conn:
+        repo.ensure_tag_masks(conn)
+        tag_rows = conn.execute(text(f"SELECT COUNT(*) FROM {TAG_TABLE}")).scalar()
+    print(f"\n[1] 마스크 컬럼 / TB_TAG_BITS 확인 완료 (태그 행 {tag_rows:,}건)")
+    if not tag_rows:
+        print("  전환할 태그 행이 없습니다.")
+        return
+
+    print(f"\n[2] 태그 값 비트 할당: {register_bits(repo):,}개")
+    with repo.engine.connect() as conn:
+        for tag_type, n in conn.execute(text(
+                "SELECT TAG_TYPE, COUNT(*) FROM TB_TAG_BITS GROUP BY TAG_TYPE ORDER BY TAG_TYPE")):
+            print(f"  {tag_type}: {n}개")
+
+    print("\n[3] 마스크 계산...")
+    updated = fill_masks(repo)
+    print(f"  갱신: {updated:,}건")
+
+    expected, actual = verify(repo)
+    print(f"\n[4] 검증: 태그 행(중복 제외) {expected:,}건 / 마스크 비트 {actual:,}개")
+    if expected != actual:
+        print("  ⚠️ 불일치 - TB_REVIEW_TAGS는 그대로 둡니다. 다시 실행해 주세요.")
+        return
+
+    if DROP_TAG_ROWS:
+        print(f"\n[5] TB_REVIEW_TAGS 삭제: {drop_tag_rows(repo):,}건")
+
+    print("\n✅ 전환 완료 - config/.env에 TAG_LAYOUT=packed 를 설정하면 마스크 컬럼을 사용합니다.")
+    if repo.tag_layout != TAG_LAYOUT_PACKED:
+        print("  (현재 TAG_LAYOUT=rows: 설정 전까지 새 분석은 TB_REVIEW_TAGS에 적재)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Pain / Positive Points, Usage Tags 재분류 + 카테고리 동기화 (한 번에)
+
+categorize_points / recategorize_pain_points / recategorize_positive_points / recategorize_usage를 차례로 돌리던 것 대체
+- gpt_analysis_categorized.json을 1번 읽고 모든 매핑을 한 번에 적용해 1번 씀 (src/categorizer.py)
+- 매핑별 적중 수, 한 번도 쓰이지 않은 매핑 표현, 매핑되지 않은 값(롱테일) 출력 → 매핑 보강용
+- STEM_MATCH=True면 Pain / Positive는 정확히 일치하지 않는 표현도 정규화 줄기로 매핑 (src/point_normalizer.py)
+  줄기로 매핑된 표현은 STEM_REVIEW_PATH에 저장 → 검토 후 맞는 것만 PAIN_MAPPING / POSITIVE_MAPPING에 추가
+  (DB 적용은 항상 손으로 관리하는 매핑만 사용)
+- APPLY_TO_DB=True면 DB에도 같은 매핑 적용 (TB_CATEGORY_MAP 버전 기준, 바뀐 매핑/새 분석의 행만)
+"""
+import json
+import sys
+
+from recategorize_pain_points import PAIN_MAPPING
+from recategorize_positive_points import POSITIVE_MAPPING
+from recategorize_usage import USAGE_MAPPING
+from src.categorizer import CategorizationEngine, CategoryMapping, categorize_file, print_report
+from src.point_normalizer import StemMatcher, compact_mapping
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+JSON_PATH = 'output/gpt_analysis_categorized.json'
+APPLY_TO_DB = False  # True면 DB 분석 결과에도 같은 매핑 적용 (config/.env의 DB 설정 사용)
+LONG_TAIL_TOP = 20   # 출력할 미매핑 값 수 (필드별)
+STEM_MATCH = False   # True면 Pain / Positive에 정규화 줄기 매칭 사용 (False면 정확 일치만)
+STEM_REVIEW_PATH = 'output/stem_match_review.json'  # 줄기로 매핑된 표현 (검토용)
+
+MAPPINGS = [
+    CategoryMapping('PAIN', 'pain_points', PAIN_MAPPING,
+                    matcher=StemMatcher(PAIN_MAPPING) if STEM_MATCH else None),
+    CategoryMapping('POSITIVE', 'positive_points', POSITIVE_MAPPING,
+                    matcher=StemMatcher(POSITIVE_MAPPING) if STEM_MATCH else None),
+    CategoryMapping('USAGE', 'usage_tags', USAGE_MAPPING, drop_values=('기타',)),
+]
+
+
+def print_stem_summary():
+    """매핑 표현 수 → 줄기 매칭으로 같은 결과를 내는 최소 표현 수 (매핑 정리 참고용)"""
+    print("\n[줄기 매칭]")
+    for m in MAPPINGS:
+        if m.matcher is None:
+            continue
+        print(f"  {m.name}: 매핑 {len(m.mapping):,}개 → 줄기 {len(m.matcher.stems):,}개 "
+              f"(최소 매핑 {len(compact_mapping(m.mapping)):,}개)")
+        for source, stem, kept, dropped in m.matcher.conflicts:
+            print(f"    ⚠️ 줄기 충돌: {source} ({stem}) → {dropped} 대신 {kept}")
+
+
+def save_stem_review(report, path=STEM_REVIEW_PATH):
+    """줄기로 매핑된 표현을 건수순으로 저장 (매핑에 추가할지 검토용)"""
+    review = {
+        name: [{'value': value, **match} for value, match in
+               sorted(r['stem_matches'].items(), key=lambda e: -e[1]['count'])]
+        for name, r in report['mappings'].items() if r['stem_matches']
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(review, f, ensure_ascii=False, indent=2)
+    print(f"\n줄기 매칭 검토 목록: {path} ({sum(len(v) for v in review.values()):,}개 표현)")
+
+
+def recategorize_file(path=JSON_PATH):
+    print("=" * 60)
+    print("분석 결과 재분류 (Pain / Positive / Usage + 카테고리 동기화)")
+    print("=" * 60)
+    report = categorize_file(CategorizationEngine(MAPPINGS), path)
+    print_report(report, top=LONG_TAIL_TOP)
+    if STEM_MATCH:
+        print_stem_summary()
+        save_stem_review(report)
+    print(f"\n저장: {path}")
+    return report
+
+
+def recategorize_db(dry_run=False):
+    """
+    DB에도 같은 매핑 적용 (Point 테이블은 UPDATE 1문장, 태그는 (TAG_TYPE, TAG_VALUE) 기준)
+
+    줄기 매칭 결과는 넣지 않음 (검토 전 표현이 TB_CATEGORY_MAP에 기록되지 않도록)
+    """
+    from dotenv import load_dotenv
+    from src.maintenance import apply_point_mapping, apply_tag_mapping
+    from src.storage import PAIN_TABLE, POSITIVE_TABLE, open_repository
+
+    load_dotenv('config/.env')
+
+    repo = open_repository()
+    label = '변경 대상' if dry_run else '변경'
+    print("\n[DB 재분류]")
+    for name, table, mapping in (('PAIN', PAIN_TABLE, PAIN_MAPPING), ('POSITIVE', POSITIVE_TABLE, POSITIVE_MAPPING)):
+        result = apply_point_mapping(repo, name, table, mapping, dry_run=dry_run)
+        print(f"  {name} v{result['version']}: 카테고리 {label} {result['rows']:,}건")
+    result = apply_tag_mapping(repo, 'USAGE', 'USAGE', USAGE_MAPPING, drop_values=('기타',), dry_run=dry_run)
+    print(f"  USAGE v{result['version']}: 값 {label} {result['updated']:,}건 | 삭제 {result['deleted']:,}건 | "
+          f"중복 제거 {result['deduplicated']:,}건")
+
+
+if __name__ == "__main__":
+    recategorize_file()
+    if APPLY_TO_DB:
+        recategorize_db()
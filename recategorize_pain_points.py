@@ -2,11 +2,12 @@
 """
 Pain Points 재분류 - 유사한 표현 통합
 """
-import json
 import sys
 
 sys.stdout.reconfigure(encoding='utf-8')
 
+APPLY_TO_DB = False  # True면 DB 분석 결과에도 같은 매핑 적용 (config/.env의 DB 설정 사용)
+
 # Pain Points 매핑 (유사 표현 → 대표 표현)
 PAIN_MAPPING = {
     # === 건조/보습 부족 ===
@@ -197,54 +198,32 @@ PAIN_MAPPING = {
 }
 
 def recategorize_pain_points():
+    """gpt_analysis_categorized.json의 pain_points 재분류 (전체 매핑을 한 번에 적용하려면 recategorize_all.py)"""
+    from src.categorizer import CategorizationEngine, CategoryMapping, categorize_file, print_report
+
     print("Pain Points 재분류 시작...")
+    engine = CategorizationEngine([CategoryMapping('PAIN', 'pain_points', PAIN_MAPPING)], sync_categories=False)
+    report = categorize_file(engine, 'output/gpt_analysis_categorized.json')
+    print_report(report, top=20)
+    return report
+
+
+def recategorize_pain_points_db(dry_run=False):
+    """DB의 TB_REVIEW_PAIN_POINTS.CATEGORY에도 같은 매핑 적용 (TB_CATEGORY_MAP 'PAIN' 버전 기준, 바뀐 매핑/새 분석의 행만 UPDATE)"""
+    from dotenv import load_dotenv
+    from src.maintenance import apply_point_mapping
+    from src.storage import PAIN_TABLE, open_repository
+
+    load_dotenv('config/.env')
 
-    # 데이터 로드
-    with open('output/gpt_analysis_categorized.json', 'r', encoding='utf-8') as f:
-        cat_data = json.load(f)
-
-    print(f"총 {len(cat_data):,}건 분석 데이터")
-
-    # 재분류 전 통계
-    before_pain = {}
-    for r in cat_data:
-        for p in r.get('pain_points', []):
-            before_pain[p] = before_pain.get(p, 0) + 1
-    print(f"재분류 전 고유 Pain Points: {len(before_pain)}개")
-
-    # 재분류 적용
-    mapped_count = 0
-    for r in cat_data:
-        new_pain_points = []
-        for p in r.get('pain_points', []):
-            if p in PAIN_MAPPING:
-                new_pain_points.append(PAIN_MAPPING[p])
-                mapped_count += 1
-            else:
-                new_pain_points.append(p)
-        # 중복 제거 (같은 카테고리로 매핑된 경우)
-        r['pain_points'] = list(dict.fromkeys(new_pain_points))
-
-    print(f"매핑 적용: {mapped_count}건")
-
-    # 재분류 후 통계
-    after_pain = {}
-    for r in cat_data:
-        for p in r.get('pain_points', []):
-            after_pain[p] = after_pain.get(p, 0) + 1
-    print(f"재분류 후 고유 Pain Points: {len(after_pain)}개")
-
-    # 저장
-    with open('output/gpt_analysis_categorized.json', 'w', encoding='utf-8') as f:
-        json.dump(cat_data, f, ensure_ascii=False, indent=2)
-
-    print("\n=== 재분류 후 TOP 20 Pain Points ===")
-    sorted_after = sorted(after_pain.items(), key=lambda x: -x[1])
-    for i, (p, c) in enumerate(sorted_after[:20], 1):
-        print(f"{i}. {p}: {c}건")
-
-    return after_pain
+    result = apply_point_mapping(open_repository(), 'PAIN', PAIN_TABLE, PAIN_MAPPING, dry_run=dry_run)
+    print(f"\nDB Pain Points 매핑 v{result['version']} (적용돼 있던 버전 v{result['applied_version']}): "
+          f"추가 {result['added']:,} | 변경 {result['changed']:,} | 삭제 {result['removed']:,}개 항목")
+    print(f"  카테고리 {'변경 대상' if dry_run else '변경'}: {result['rows']:,}건")
+    return result
 
 
 if __name__ == "__main__":
     recategorize_pain_points()
+    if APPLY_TO_DB:
+        recategorize_pain_points_db()
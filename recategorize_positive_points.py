@@ -2,11 +2,12 @@
 """
 Positive Points 재분류 - 유사한 표현 통합
 """
-import json
 import sys
 
 sys.stdout.reconfigure(encoding='utf-8')
 
+APPLY_TO_DB = False  # True면 DB 분석 결과에도 같은 매핑 적용 (config/.env의 DB 설정 사용)
+
 # Positive Points 매핑 (유사 표현 → 대표 표현)
 POSITIVE_MAPPING = {
     # === 순함/자극없음 ===
@@ -217,54 +218,33 @@ POSITIVE_MAPPING = {
 
 
 def recategorize_positive_points():
-    print("Positive Points 재분류 시작...")
-
-    # 데이터 로드
-    with open('output/gpt_analysis_categorized.json', 'r', encoding='utf-8') as f:
-        cat_data = json.load(f)
-
-    print(f"총 {len(cat_data):,}건 분석 데이터")
+    """gpt_analysis_categorized.json의 positive_points 재분류 (전체 매핑을 한 번에 적용하려면 recategorize_all.py)"""
+    from src.categorizer import CategorizationEngine, CategoryMapping, categorize_file, print_report
 
-    # 재분류 전 통계
-    before_pos = {}
-    for r in cat_data:
-        for p in r.get('positive_points', []):
-            before_pos[p] = before_pos.get(p, 0) + 1
-    print(f"재분류 전 고유 Positive Points: {len(before_pos)}개")
-
-    # 재분류 적용
-    mapped_count = 0
-    for r in cat_data:
-        new_pos_points = []
-        for p in r.get('positive_points', []):
-            if p in POSITIVE_MAPPING:
-                new_pos_points.append(POSITIVE_MAPPING[p])
-                mapped_count += 1
-            else:
-                new_pos_points.append(p)
-        # 중복 제거 (같은 카테고리로 매핑된 경우)
-        r['positive_points'] = list(dict.fromkeys(new_pos_points))
-
-    print(f"매핑 적용: {mapped_count}건")
+    print("Positive Points 재분류 시작...")
+    engine = CategorizationEngine([CategoryMapping('POSITIVE', 'positive_points', POSITIVE_MAPPING)],
+                                  sync_categories=False)
+    report = categorize_file(engine, 'output/gpt_analysis_categorized.json')
+    print_report(report, top=20)
+    return report
 
-    # 재분류 후 통계
-    after_pos = {}
-    for r in cat_data:
-        for p in r.get('positive_points', []):
-            after_pos[p] = after_pos.get(p, 0) + 1
-    print(f"재분류 후 고유 Positive Points: {len(after_pos)}개")
 
-    # 저장
-    with open('output/gpt_analysis_categorized.json', 'w', encoding='utf-8') as f:
-        json.dump(cat_data, f, ensure_ascii=False, indent=2)
+def recategorize_positive_points_db(dry_run=False):
+    """DB의 TB_REVIEW_POSITIVE_POINTS.CATEGORY에도 같은 매핑 적용 (TB_CATEGORY_MAP 'POSITIVE' 버전 기준, 바뀐 매핑/새 분석의 행만 UPDATE)"""
+    from dotenv import load_dotenv
+    from src.maintenance import apply_point_mapping
+    from src.storage import POSITIVE_TABLE, open_repository
 
-    print("\n=== 재분류 후 TOP 20 Positive Points ===")
-    sorted_after = sorted(after_pos.items(), key=lambda x: -x[1])
-    for i, (p, c) in enumerate(sorted_after[:20], 1):
-        print(f"{i}. {p}: {c}건")
+    load_dotenv('config/.env')
 
-    return after_pos
+    result = apply_point_mapping(open_repository(), 'POSITIVE', POSITIVE_TABLE, POSITIVE_MAPPING, dry_run=dry_run)
+    print(f"\nDB Positive Points 매핑 v{result['version']} (적용돼 있던 버전 v{result['applied_version']}): "
+          f"추가 {result['added']:,} | 변경 {result['changed']:,} | 삭제 {result['removed']:,}개 항목")
+    print(f"  카테고리 {'변경 대상' if dry_run else '변경'}: {result['rows']:,}건")
+    return result
 
 
 if __name__ == "__main__":
     recategorize_positive_points()
+    if APPLY_TO_DB:
+        recategorize_positive_points_db()
@@ -2,12 +2,12 @@
 """
 Usage Tags 재분류 - 유사한 표현 통합
 """
-import json
 import sys
-from collections import Counter
 
 sys.stdout.reconfigure(encoding='utf-8')
 
+APPLY_TO_DB = False  # True면 DB 분석 결과에도 같은 매핑 적용 (config/.env의 DB 설정 사용)
+
 # Usage Tags 매핑 (유사 표현 → 대표 표현)
 USAGE_MAPPING = {
     # === 닦토 ===
@@ -78,55 +78,35 @@ USAGE_MAPPING = {
 
 
 def recategorize_usage():
+    """gpt_analysis_categorized.json의 usage_tags 재분류 ('기타'는 제외, 전체 매핑을 한 번에 적용하려면 recategorize_all.py)"""
+    from src.categorizer import CategorizationEngine, CategoryMapping, categorize_file, print_report
+
     print("Usage Tags 재분류 시작...")
+    engine = CategorizationEngine([CategoryMapping('USAGE', 'usage_tags', USAGE_MAPPING, drop_values=('기타',))],
+                                  sync_categories=False)
+    report = categorize_file(engine, 'output/gpt_analysis_categorized.json')
+    print_report(report, top=10)
+    return report
+
+
+def recategorize_usage_db(dry_run=False):
+    """DB의 USAGE 태그에도 같은 매핑 적용 ('기타'는 삭제, 같은 분석의 중복 태그 제거, TB_CATEGORY_MAP 'USAGE'에 버전 기록)"""
+    from dotenv import load_dotenv
+    from src.maintenance import apply_tag_mapping
+    from src.storage import open_repository
+
+    load_dotenv('config/.env')
 
-    # 데이터 로드
-    with open('output/gpt_analysis_categorized.json', 'r', encoding='utf-8') as f:
-        cat_data = json.load(f)
-
-    print(f"총 {len(cat_data):,}건 분석 데이터")
-
-    # 재분류 전 통계
-    before_usage = Counter()
-    for r in cat_data:
-        for u in r.get('usage_tags', []):
-            before_usage[u] += 1
-    print(f"재분류 전 고유 Usage Tags: {len(before_usage)}개")
-
-    # 재분류 적용
-    mapped_count = 0
-    for r in cat_data:
-        new_usage_tags = []
-        for u in r.get('usage_tags', []):
-            if u in USAGE_MAPPING:
-                mapped = USAGE_MAPPING[u]
-                if mapped != '기타':  # 기타는 제외
-                    new_usage_tags.append(mapped)
-                mapped_count += 1
-            else:
-                new_usage_tags.append(u)
-        # 중복 제거
-        r['usage_tags'] = list(dict.fromkeys(new_usage_tags))
-
-    print(f"매핑 적용: {mapped_count}건")
-
-    # 재분류 후 통계
-    after_usage = Counter()
-    for r in cat_data:
-        for u in r.get('usage_tags', []):
-            after_usage[u] += 1
-    print(f"재분류 후 고유 Usage Tags: {len(after_usage)}개")
-
-    # 저장
-    with open('output/gpt_analysis_categorized.json', 'w', encoding='utf-8') as f:
-        json.dump(cat_data, f, ensure_ascii=False, indent=2)
-
-    print("\n=== 재분류 후 TOP 10 Usage Tags ===")
-    for i, (u, c) in enumerate(after_usage.most_common(10), 1):
-        print(f"{i}. {u}: {c}건")
-
-    return after_usage
+    result = apply_tag_mapping(open_repository(), 'USAGE', 'USAGE', USAGE_MAPPING, drop_values=('기타',),
+                               dry_run=dry_run)
+    print(f"\nDB Usage 매핑 v{result['version']}: 추가 {result['added']:,} | 변경 {result['changed']:,} | "
+          f"삭제 {result['removed']:,}개 항목")
+    print(f"  Usage Tags {'변경 대상' if dry_run else '변경'}: 값 변경 {result['updated']:,}건 | "
+          f"삭제 {result['deleted']:,}건 | 중복 제거 {result['deduplicated']:,}건")
+    return result
 
 
 if __name__ == "__main__":
     recategorize_usage()
+    if APPLY_TO_DB:
+        recategorize_usage_db()
@@ -5,12 +5,20 @@ GPT-4o-mini를 사용하여 애매한 리뷰를 재분석
 
 import os
 import json
-import time
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
 import pandas as pd
 
+from src.dedup import DEFAULT_THRESHOLD
+from src.llm_engine import DataFrameSink, LLMAnalyzer, PromptSpec, ResponseCache, dataframe_source
+from src.local_classifier import DEFAULT_CONFIDENCE, LocalReviewClassifier, route_by_confidence
+from src.resilience import CircuitBreaker, RetryPolicy
+from src.response_parser import ENHANCER_SCHEMA
+from src.selection_planner import estimate_review_costs, plan_selection, print_plan_summary
+from src.telemetry import print_telemetry
+from src.token_estimator import estimate_messages_tokens
+
 # OpenAI 라이브러리
 try:
     from openai import OpenAI
@@ -30,7 +38,40 @@ def get_openai_client():
     api_key = os.getenv("CLASSIFICATION_REVIEW")
     if not api_key:
         raise ValueError("API 키가 설정되지 않았습니다. config/.env 파일에 CLASSIFICATION_REVIEW를 설정하세요.")
-    return OpenAI(api_key=api_key)
+    return OpenAI(api_key=api_key, max_retries=0)  # 재시도는 src.resilience에서 처리
+
+
+def _tag_count(tags):
+    """태그 리스트 컬럼 → 태그 개수 (리스트가 아닌 값은 0)"""
+    if tags.dtype != object:
+        return pd.Series(0, index=tags.index)
+    return tags.str.len().fillna(0)
+
+
+def compute_ambiguity_features(df):
+    """
+    리뷰별 애매함 신호 계산 (행 단위 apply 없이 컬럼 연산)
+
+    Returns:
+        DataFrame: is_neu, rating_mismatch, no_tags_long (불리언)
+    """
+    # 1. NEU (중립) 판정
+    cond_neu = df['sentiment'] == 'NEU'
+
+    # 2. 별점-내용 불일치 (5점인데 WEAK, 1-2점인데 STRONG)
+    cond_mismatch_high = (df['REVIEW_RATING'] == 5) & (df['strength'] == 'WEAK')
+    cond_mismatch_low = (df['REVIEW_RATING'] <= 2) & (df['strength'] == 'STRONG')
+
+    # 3. 긴 리뷰인데 태그 미추출 - 30자 이상만
+    is_long = df['REVIEW_CONTENT'].astype(str).str.len() >= 30
+    no_tags = (_tag_count(df['benefit_tags']) == 0) & (_tag_count(df['texture_tags']) == 0)
+    cond_no_tags_long = is_long & no_tags
+
+    return pd.DataFrame({
+        'is_neu': cond_neu,
+        'rating_mismatch': cond_mismatch_high | cond_mismatch_low,
+        'no_tags_long': cond_no_tags_long,
+    }, index=df.index)
 
 
 def select_ambiguous_reviews(df, max_samples=3000):
@@ -49,40 +90,19 @@ def select_ambiguous_reviews(df, max_samples=3000):
     Returns:
         DataFrame: 샘플링된 리뷰
     """
-    # 우선순위별 점수 부여
-    df = df.copy()
-    df['_ambiguity_score'] = 0
+    features = compute_ambiguity_features(df)
 
-    # 1. NEU (중립) 판정 - 최우선 (점수 3점)
-    cond_neu = df['sentiment'] == 'NEU'
-    df.loc[cond_neu, '_ambiguity_score'] += 3
+    # 우선순위별 점수 부여 (NEU 3점, 불일치 2점, 긴 리뷰+태그 없음 1점)
+    score = features['is_neu'] * 3 + features['rating_mismatch'] * 2 + features['no_tags_long'] * 1
 
-    # 2. 별점-내용 불일치 (점수 2점)
-    cond_mismatch_high = (df['REVIEW_RATING'] == 5) & (df['strength'] == 'WEAK')
-    cond_mismatch_low = (df['REVIEW_RATING'] <= 2) & (df['strength'] == 'STRONG')
-    df.loc[cond_mismatch_high | cond_mismatch_low, '_ambiguity_score'] += 2
-
-    # 3. 긴 리뷰인데 태그 미추출 (점수 1점) - 30자 이상만
-    def no_tags_long(row):
-        if len(str(row['REVIEW_CONTENT'])) < 30:
-            return False
-        benefit = row['benefit_tags'] if isinstance(row['benefit_tags'], list) else []
-        texture = row['texture_tags'] if isinstance(row['texture_tags'], list) else []
-        return len(benefit) == 0 and len(texture) == 0
-
-    cond_no_tags_long = df.apply(no_tags_long, axis=1)
-    df.loc[cond_no_tags_long, '_ambiguity_score'] += 1
-
-    # 점수가 1점 이상인 리뷰만 선택
-    sampled_df = df[df['_ambiguity_score'] >= 1].copy()
-
-    # 우선순위 정렬 후 상한 적용
-    sampled_df = sampled_df.sort_values('_ambiguity_score', ascending=False)
+    # 점수가 1점 이상인 리뷰만 선택 후 우선순위 정렬
+    candidates = score[score >= 1].sort_values(ascending=False, kind='stable')
+    sampled_df = df.loc[candidates.index]
 
     print(f"\n  [AI 샘플링] 선별 결과:")
-    print(f"    - NEU 판정: {cond_neu.sum():,}건")
-    print(f"    - 별점-내용 불일치: {(cond_mismatch_high | cond_mismatch_low).sum():,}건")
-    print(f"    - 긴 리뷰+태그 미추출: {cond_no_tags_long.sum():,}건")
+    print(f"    - NEU 판정: {features['is_neu'].sum():,}건")
+    print(f"    - 별점-내용 불일치: {features['rating_mismatch'].sum():,}건")
+    print(f"    - 긴 리뷰+태그 미추출: {features['no_tags_long'].sum():,}건")
     print(f"    - 총 후보 (중복 제거): {len(sampled_df):,}건")
 
     # 상한 적용
@@ -90,13 +110,42 @@ def select_ambiguous_reviews(df, max_samples=3000):
         print(f"    - 상한 적용: {len(sampled_df):,} → {max_samples:,}건")
         sampled_df = sampled_df.head(max_samples)
 
-    # 임시 컬럼 제거
-    sampled_df = sampled_df.drop(columns=['_ambiguity_score'])
-    df.drop(columns=['_ambiguity_score'], inplace=True)
-
     return sampled_df
 
 
+def select_reviews_by_budget(df, budget_usd=None, budget_tokens=None, max_samples=None):
+    """
+    예산 기반 AI 분석 대상 선별
+
+    애매함 신호별 보정 확률과 리뷰별 예상 토큰 비용을 함께 고려하여
+    예산 안에서 기대 보정 건수가 최대가 되도록 선택
+
+    Args:
+        df: 데이터프레임
+        budget_usd: 비용 예산 (USD)
+        budget_tokens: 토큰 예산 (입력+출력)
+        max_samples: 최대 샘플 수
+
+    Returns:
+        tuple: (샘플링된 리뷰 DataFrame, 선택 계획 DataFrame)
+    """
+    features = compute_ambiguity_features(df)
+    plan = plan_selection(
+        df['REVIEW_CONTENT'], features, get_prompt_overhead_tokens(),
+        budget_usd=budget_usd, budget_tokens=budget_tokens, max_samples=max_samples
+    )
+
+    budget_desc = f"${budget_usd}" if budget_tokens is None else f"{budget_tokens:,} 토큰"
+    print(f"\n  [AI 샘플링] 예산 기반 선별 ({budget_desc}):")
+    print(f"    - 후보 (신호 1개 이상): {int(features.any(axis=1).sum()):,}건")
+    print(f"    - 선택: {len(plan):,}건")
+
+    return df.loc[plan.index], plan
+
+
+SYSTEM_PROMPT = "You are a Korean cosmetics review analyzer. Always respond in valid JSON format only."
+
+
 def create_prompt(review_text):
     """GPT에게 보낼 프롬프트 생성"""
     prompt = f"""다음 화장품(토너) 리뷰를 분석해주세요.
@@ -124,72 +173,41 @@ def create_prompt(review_text):
     return prompt
 
 
-def call_gpt_api(client, review_text, review_id, token_log):
-    """
-    GPT-4o-mini API 호출
+def get_prompt_overhead_tokens():
+    """리뷰 본문을 제외한 프롬프트(시스템 메시지 포함) 추정 토큰 수"""
+    return estimate_messages_tokens([
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": create_prompt("")},
+    ])
 
-    Args:
-        client: OpenAI 클라이언트
-        review_text: 리뷰 텍스트
-        review_id: 리뷰 ID
-        token_log: 토큰 사용량 로그 리스트
 
-    Returns:
-        dict: 분석 결과
-    """
-    prompt = create_prompt(review_text)
+# DataFrame에 덮어쓸 AI 분석 결과 필드
+AI_FIELDS = ['sentiment', 'strength', 'benefit_tags', 'texture_tags', 'usage_tags', 'reason_buy']
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a Korean cosmetics review analyzer. Always respond in valid JSON format only."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=300
-        )
+PROMPT = PromptSpec(
+    lambda item: create_prompt(item['text']), system=SYSTEM_PROMPT,
+    temperature=0.3, max_tokens=300, uses_rating=False, schema=ENHANCER_SCHEMA
+)
 
-        # 토큰 사용량 기록
-        usage = response.usage
-        token_log.append({
-            "review_id": int(review_id),
-            "input_tokens": usage.prompt_tokens,
-            "output_tokens": usage.completion_tokens,
-            "total_tokens": usage.total_tokens,
-            "timestamp": datetime.now().isoformat()
-        })
-
-        # 응답 파싱
-        content = response.choices[0].message.content.strip()
-
-        # JSON 파싱 시도
-        # 가끔 ```json ... ``` 형태로 올 수 있음
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-
-        result = json.loads(content)
-        return result
-
-    except json.JSONDecodeError as e:
-        print(f"    JSON 파싱 오류 (review_id={review_id}): {e}")
-        return None
-    except Exception as e:
-        print(f"    API 호출 오류 (review_id={review_id}): {e}")
-        return None
-
-
-def enhance_with_ai(df, output_dir, batch_size=50, delay=0.5, max_samples=3000):
+
+def enhance_with_ai(df, output_dir, batch_size=50, delay=0.5, max_samples=3000,
+                    budget_usd=None, budget_tokens=None, dedup_threshold=DEFAULT_THRESHOLD,
+                    local_model=None, local_threshold=DEFAULT_CONFIDENCE, workers=4):
     """
-    AI를 사용하여 애매한 리뷰 분석 보정
+    AI를 사용하여 애매한 리뷰 분석 보정 (공통 엔진 src.llm_engine 사용)
 
     Args:
         df: 전체 데이터프레임 (이미 1차 분석 완료)
         output_dir: 출력 디렉토리
-        batch_size: 배치 크기 (진행상황 출력용)
-        delay: API 호출 간 딜레이 (초)
+        batch_size: 결과 반영 단위
+        delay: 요청 간 최소 간격 (초) - 초당 1/delay건으로 제한 (0이면 제한 없음)
+        max_samples: 최대 샘플 수
+        budget_usd: 비용 예산 (USD). 지정 시 예산 기반 선별 사용
+        budget_tokens: 토큰 예산 (입력+출력). 지정 시 예산 기반 선별 사용
+        dedup_threshold: 근사 중복 클러스터 유사도 기준 (None이면 비활성화)
+        local_model: LocalReviewClassifier 또는 모델 파일 경로 (None이면 전부 API)
+        local_threshold: 로컬 분류기 확신도 기준 (미만이면 API로 라우팅)
+        workers: 동시 API 호출 수
 
     Returns:
         DataFrame: AI 분석이 반영된 데이터프레임
@@ -205,93 +223,85 @@ def enhance_with_ai(df, output_dir, batch_size=50, delay=0.5, max_samples=3000):
         return df
 
     # 샘플링
-    sampled_df = select_ambiguous_reviews(df, max_samples=max_samples)
+    if budget_usd is not None or budget_tokens is not None:
+        sampled_df, plan = select_reviews_by_budget(
+            df, budget_usd=budget_usd, budget_tokens=budget_tokens, max_samples=max_samples
+        )
+    else:
+        sampled_df = select_ambiguous_reviews(df, max_samples=max_samples)
+        plan = estimate_review_costs(sampled_df['REVIEW_CONTENT'], get_prompt_overhead_tokens())
 
     if len(sampled_df) == 0:
         print("  [AI 보정] 샘플링된 리뷰가 없습니다.")
         return df
 
-    print(f"\n  [AI 보정] GPT-4o-mini 분석 시작 ({len(sampled_df):,}건)...")
-
-    # 토큰 로그
-    token_log = []
-
-    # AI 분석 결과 저장
-    ai_results = {}
-
-    # 진행 상황
-    total = len(sampled_df)
-    processed = 0
-    errors = 0
-
-    for idx, row in sampled_df.iterrows():
-        review_id = row['REVIEW_ID']
-        review_text = row['REVIEW_CONTENT']
-
-        # API 호출
-        result = call_gpt_api(client, review_text, review_id, token_log)
-
-        if result:
-            ai_results[idx] = result
-        else:
-            errors += 1
-
-        processed += 1
-
-        # 진행 상황 출력
-        if processed % batch_size == 0 or processed == total:
-            print(f"    진행: {processed:,}/{total:,} ({processed/total*100:.1f}%) - 오류: {errors}건")
-
-        # Rate limiting
-        if delay > 0:
-            time.sleep(delay)
-
-    # 결과 반영
-    print(f"\n  [AI 보정] 결과 반영 중...")
-
-    for idx, result in ai_results.items():
-        if 'sentiment' in result:
-            df.at[idx, 'sentiment'] = result['sentiment']
-        if 'strength' in result:
-            df.at[idx, 'strength'] = result['strength']
-        if 'benefit_tags' in result:
-            df.at[idx, 'benefit_tags'] = result['benefit_tags']
-        if 'texture_tags' in result:
-            df.at[idx, 'texture_tags'] = result['texture_tags']
-        if 'usage_tags' in result:
-            df.at[idx, 'usage_tags'] = result['usage_tags']
-        if 'reason_buy' in result:
-            df.at[idx, 'reason_buy'] = result['reason_buy']
+    output_dir = Path(output_dir)
+    overrides = DataFrameSink(df, AI_FIELDS)
+    api_df = sampled_df
+
+    # 로컬 분류기: 확신도 높은 리뷰는 API 없이 처리
+    if local_model is not None:
+        if not isinstance(local_model, LocalReviewClassifier):
+            local_model = LocalReviewClassifier.load(local_model)
+        local_pred, api_index = route_by_confidence(
+            local_model, sampled_df['REVIEW_CONTENT'].tolist(), index=sampled_df.index, threshold=local_threshold
+        )
+        overrides.results.update(
+            local_pred[['sentiment', 'benefit_tags', 'texture_tags', 'usage_tags']].to_dict('index')
+        )
+        print(f"\n  [로컬 분류기] 확신도 >= {local_threshold}: {len(local_pred):,}건 로컬 처리, "
+              f"{len(api_index):,}건 API 호출")
+        api_df = sampled_df.loc[api_index]
+
+    # 호출 전 예상 비용/시간 (근사 중복 제거 전 기준 상한)
+    print_plan_summary(plan.loc[api_df.index], delay=delay, concurrency=workers)
+
+    print(f"\n  [AI 보정] GPT-4o-mini 분석 시작 ({len(api_df):,}건)...")
+
+    dead_letter_path = output_dir / "ai_dead_letter.jsonl"
+    cache = ResponseCache(output_dir / "ai_response_cache.jsonl")
+    analyzer = LLMAnalyzer(
+        client, PROMPT,
+        policy=RetryPolicy(max_retries=5),
+        breaker=CircuitBreaker(failure_threshold=10, recovery_timeout=60),
+        cache=cache, workers=workers, rate_per_sec=1 / delay if delay else None, batch_size=batch_size,
+        dead_letter_path=dead_letter_path, dedup_threshold=dedup_threshold,
+        dedup_audit_path=output_dir / "ai_dedup_audit.jsonl", telemetry_path=output_dir / "ai_telemetry.jsonl",
+    )
+
+    # 결과는 DataFrameSink가 종료 시 df에 반영
+    try:
+        summary = analyzer.run(dataframe_source(api_df), [overrides], desc="AI 보정")
+    finally:
+        cache.close()
 
     # 토큰 로그 저장
-    output_dir = Path(output_dir)
     token_log_path = output_dir / "ai_token_usage.json"
 
-    # 총합 계산
-    total_input = sum(t['input_tokens'] for t in token_log)
-    total_output = sum(t['output_tokens'] for t in token_log)
-    total_tokens = sum(t['total_tokens'] for t in token_log)
-
     log_data = {
         "summary": {
-            "total_reviews_processed": len(token_log),
-            "total_input_tokens": total_input,
-            "total_output_tokens": total_output,
-            "total_tokens": total_tokens,
-            "estimated_cost_usd": round(total_tokens * 0.00000015, 4),  # gpt-4o-mini 가격
+            "total_reviews_processed": len(overrides.results),
+            "api_calls": summary['api_calls'],
+            "total_input_tokens": summary['tokens_in'],
+            "total_output_tokens": summary['tokens_out'],
+            "total_tokens": summary['total_tokens'],
+            "estimated_cost_usd": summary['cost_usd'],
+            "cache_hits": summary['cache_hits'],
             "created_at": datetime.now().isoformat()
         },
-        "details": token_log
+        "telemetry": summary['telemetry'],
+        "details": analyzer.metrics.calls
     }
 
     with open(token_log_path, 'w', encoding='utf-8') as f:
-        json.dump(log_data, f, ensure_ascii=False, indent=2)
+        json.dump(log_data, f, ensure_ascii=False, indent=2, default=str)
 
     print(f"\n  [AI 보정] 완료!")
-    print(f"    - 처리: {len(ai_results):,}건")
-    print(f"    - 오류: {errors}건")
-    print(f"    - 총 토큰: {total_tokens:,} (입력: {total_input:,}, 출력: {total_output:,})")
-    print(f"    - 예상 비용: ${log_data['summary']['estimated_cost_usd']:.4f}")
+    print(f"    - 처리: {len(overrides.results):,}건")
+    print(f"    - 오류: {summary['errors']}건 (dead-letter: {dead_letter_path})")
+    print_telemetry(summary['telemetry'], label="AI 보정 텔레메트리")
+    print(f"    - 총 토큰: {summary['total_tokens']:,} (입력: {summary['tokens_in']:,}, 출력: {summary['tokens_out']:,})")
+    print(f"    - 예상 비용: ${summary['cost_usd']:.4f}")
     print(f"    - 토큰 로그: {token_log_path}")
 
     return df
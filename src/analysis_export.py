@@ -0,0 +1,566 @@
+"""
+GPT 분석 결과 스트리밍 내보내기
+
+분석/Pain/Positive/Tag 테이블을 각각 fetchall로 전부 읽고 analysis_id → index dict로 이어 붙인 뒤
+indent JSON 하나로 덤프하던 방식은 분석 건수에 비례해 메모리를 사용했음
+
+- 쿼리 1개: 부모 행(KIND 0)과 자식 행(KIND 1~3)을 UNION ALL로 세로로 쌓고 ANALYSIS_ID 순 정렬
+  → JOIN으로 곱해지는 행 없이 분석 1건의 행이 연속으로 나옴
+- 서버 측 커서(stream_results) + fetchmany(batch_size)
+- 분석 1건이 끝날 때마다 바로 파일에 기록 (JSONL / 대시보드용 JSON 배열 / 리뷰 CSV)
+  → 메모리는 배치 크기 + 통계 Counter만 사용
+- IncrementalExporter: 워터마크 이후 변경분만 조회해 기존 출력에 병합 (삭제는 TB_ANALYSIS_DELETE_LOG)
+"""
+
+import codecs
+import csv
+import hashlib
+import io
+import json
+import os
+import shutil
+from collections import Counter
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import text
+
+from src.bulk_loader import TAG_FIELDS, TAG_TABLE
+from src.storage import CHANGED_SINCE_CONDITION, DELETE_LOG_TABLE, latest_change_or_delete
+
+
+KIND_ANALYSIS, KIND_PAIN, KIND_POSITIVE, KIND_TAG = 0, 1, 2, 3
+
+# 컬럼: ANALYSIS_ID, KIND, SUB_ID, REVIEW_ID, REVIEW_RATING, SENTIMENT, PRODUCT_NAME, REVIEW_CONTENT,
+#       REVIEW_DATE, REVIEWER_INFO, ADDITIONAL_INFO, TAGS, PLATFORM_CODE, VAL1, VAL2
+# 자식 행의 VAL1/VAL2: (POINT_TEXT, CATEGORY) 또는 (TAG_TYPE, TAG_VALUE)
+# 태그는 {tag_source}에서 조회 (rows: TB_REVIEW_TAGS, packed: 마스크를 TB_TAG_BITS로 펼친 인라인 뷰 - 저장소의 tag_source())
+EXPORT_SQL = """
+    SELECT a.ANALYSIS_ID, 0 KIND, 0 SUB_ID, a.REVIEW_ID, a.REVIEW_RATING, a.SENTIMENT,
+           cr.PRODUCT_NAME, cr.REVIEW_CONTENT, cr.REVIEW_DATE,
+           cr.REVIEWER_INFO, cr.ADDITIONAL_INFO, cr.TAGS, cr.PLATFORM_CODE,
+           NULL VAL1, NULL VAL2
+    FROM TB_REVIEW_GPT_ANALYSIS a
+    JOIN TB_CRAWLING_REVIEW cr ON a.REVIEW_ID = cr.REVIEW_ID
+    {where}
+    UNION ALL
+    SELECT p.ANALYSIS_ID, 1, p.ID, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+           p.POINT_TEXT, p.CATEGORY
+    FROM TB_REVIEW_PAIN_POINTS p
+    {child_where}
+    UNION ALL
+    SELECT p.ANALYSIS_ID, 2, p.ID, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+           p.POINT_TEXT, p.CATEGORY
+    FROM TB_REVIEW_POSITIVE_POINTS p
+    {child_where}
+    UNION ALL
+    SELECT p.ANALYSIS_ID, 3, p.ID, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+           p.TAG_TYPE, p.TAG_VALUE
+    FROM {tag_source} p
+    {child_where}
+    ORDER BY 1, 2, 3
+"""
+
+# Streamlit / 보고서가 읽는 필드 (gpt_analysis_categorized.json)
+EXPORT_FIELDS = [
+    'pain_points', 'positive_points', 'benefit_tags', 'texture_tags', 'usage_tags', 'value_tags',
+    'pain_categories', 'positive_categories',
+]
+
+CSV_COLUMNS = [
+    'BRAND_NAME', 'REVIEW_CONTENT', 'REVIEW_RATING', 'REVIEW_DATE', 'REVIEWER_INFO',
+    'REVIEW_ADDITIONAL_INFO', 'PURCHASE_TAG', 'REVIEW_ID', 'PLATFORM_CODE',
+]
+
+
+def normalize_platform(code):
+    """플랫폼 코드 → OLIVEYOUNG / COUPANG (그 외는 그대로)"""
+    upper = str(code).upper() if code else ''
+    if 'OLIVEYOUNG' in upper:
+        return 'OLIVEYOUNG'
+    if 'COUPANG' in upper:
+        return 'COUPANG'
+    return code
+
+
+def _new_record(r):
+    record = {
+        'analysis_id': r[0],
+        'review_id': r[3],
+        'rating': r[4],
+        'sentiment': r[5],
+        'product_name': r[6],
+        'review_content': r[7],
+        'review_date': str(r[8]) if r[8] else None,
+        'reviewer_info': r[9],
+        'additional_info': r[10],
+        'purchase_tag': r[11],
+        'platform_code': normalize_platform(r[12]),
+    }
+    for field in EXPORT_FIELDS:
+        record[field] = []
+    return record
+
+
+def _finish(record):
+    # CATEGORY가 NULL인 경우 point_text를 그대로 사용
+    if not record['pain_categories'] and record['pain_points']:
+        record['pain_categories'] = list(set(record['pain_points']))
+    if not record['positive_categories'] and record['positive_points']:
+        record['positive_categories'] = list(set(record['positive_points']))
+    return record
+
+
+def iter_analysis_records(conn, batch_size=5000, where='', child_where='', params=None, tag_source=TAG_TABLE):
+    """
+    분석 결과를 ANALYSIS_ID 순서로 1건씩 생성 (쿼리 1개, fetchmany 스트리밍)
+
+    Args:
+        conn: DB 연결
+        batch_size: fetchmany 크기 (서버 측 커서 버퍼)
+        where / child_where: 부모 / 자식 쿼리에 붙일 WHERE 절 (증분 내보내기용)
+        params: WHERE 절 바인드 값
+        tag_source: 태그 조회 대상 (AnalysisRepository.tag_source())
+
+    Returns:
+        generator of dict (analysis_id, review_id, rating, sentiment, product_name, ..., EXPORT_FIELDS)
+    """
+    sql = EXPORT_SQL.format(where=where, child_where=child_where, tag_source=tag_source)
+    result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(text(sql), params or {})
+
+    record = None
+    while True:
+        rows = result.fetchmany(batch_size)
+        if not rows:
+            break
+        for r in rows:
+            kind = r[1]
+            if kind == KIND_ANALYSIS:
+                if record is not None:
+                    yield _finish(record)
+                record = _new_record(r)
+                continue
+            # 부모 행이 없는 자식 행 (원본 리뷰가 없는 분석 등)은 건너뜀
+            if record is None or record['analysis_id'] != r[0]:
+                continue
+            if kind == KIND_PAIN:
+                record['pain_points'].append(r[13])
+                if r[14]:
+                    record['pain_categories'].append(r[14])
+            elif kind == KIND_POSITIVE:
+                record['positive_points'].append(r[13])
+                if r[14]:
+                    record['positive_categories'].append(r[14])
+            elif r[13] in TAG_FIELDS:
+                record[TAG_FIELDS[r[13]]].append(r[14])
+    result.close()
+
+    if record is not None:
+        yield _finish(record)
+
+
+class ExportStats:
+    """내보내기 통계 (건수, 감성/브랜드 분포, Pain/Positive 빈도)를 1건씩 누적"""
+
+    def __init__(self):
+        self.total = 0
+        self.sentiments = Counter()
+        self.brands = Counter()
+        self.pain = Counter()
+        self.positive = Counter()
+
+    def add(self, record, brand):
+        self.total += 1
+        self.sentiments[record['sentiment']] += 1
+        self.brands[brand] += 1
+        self.pain.update(record['pain_points'])
+        self.positive.update(record['positive_points'])
+
+
+def record_fingerprint(record):
+    """분석 1건의 내용 해시 (증분 내보내기에서 변경 여부 판단용, int64)"""
+    payload = json.dumps(record, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), 'big', signed=True)
+
+
+class AnalysisExportWriter:
+    """
+    분석 결과를 파일에 1건씩 기록
+
+    - json_path: 대시보드용 JSON 배열 (기존 형식 유지, 항목을 차례로 이어 씀)
+    - jsonl_path: 1줄 1건 JSONL (분석/리뷰 필드 전체, 증분 내보내기의 원본 저장소)
+    - csv_path: 리뷰 원본 CSV (Streamlit이 읽는 형식)
+
+    새로 쓸 때는 임시 파일(.tmp)에 쓰고 정상 종료 시에만 교체 → 내보내는 중에도 대시보드는 이전 파일을 읽음
+    start_idx > 0이면 기존 파일 뒤에 이어 씀 (실패 시 원래 내용으로 되돌림)
+    - cut을 주면 start_idx번째 항목부터 잘라내고 그 자리부터 다시 씀
+      잘라낸 뒷부분은 .tail 파일에 보관 (JSONL은 다시 쓸 원본으로 읽고, 실패 시 복원)
+    항목별 시작 바이트 위치를 offsets에 모음 → 다음 증분에서 cut으로 사용
+
+    Args:
+        brand_fn: product_name → 브랜드(정규화된 제품명)
+        경로가 None인 파일은 쓰지 않음
+        start_idx: 이어 쓸 때 기존 건수 (idx는 start_idx부터)
+        cut: {'json' / 'jsonl' / 'csv': start_idx번째 항목의 시작 바이트} (None이면 파일 끝에 이어 씀)
+    """
+
+    def __init__(self, brand_fn, json_path=None, jsonl_path=None, csv_path=None, start_idx=0, cut=None):
+        self.brand_fn = brand_fn
+        self.paths = {'json': json_path, 'jsonl': jsonl_path, 'csv': csv_path}
+        self.start_idx = start_idx
+        self.cut = cut
+        self.stats = ExportStats()
+        self.ids = []           # 기록한 ANALYSIS_ID (기록 순서)
+        self.fingerprints = []  # record_fingerprint
+        self.offsets = {key: [] for key, path in self.paths.items() if path}  # 항목별 시작 바이트
+        self._files = {}
+        self._pos = {}
+        self._csv_buf = io.StringIO()
+        self._csv = csv.writer(self._csv_buf)
+        self._rollback = {}
+
+    def _target(self, key):
+        return self.paths[key] if self.start_idx else self.paths[key] + '.tmp'
+
+    def tail_path(self, key):
+        """cut으로 잘라낸 뒷부분 보관 파일"""
+        return self.paths[key] + '.tail'
+
+    def _cut_position(self, key):
+        if self.cut is not None:
+            return self.cut[key]
+        if key != 'json':
+            return os.path.getsize(self.paths[key])
+        # 마지막 항목 뒤('\n]\n' 앞)에서 잘라 배열을 다시 연 상태로 만듦
+        with open(self.paths[key], 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - 16))
+            tail = f.read()
+        return size - len(tail) + len(tail[:tail.rindex(b']')].rstrip())
+
+    def __enter__(self):
+        for key in self.offsets:
+            if not self.start_idx:
+                # 새 파일: JSON은 '[', CSV는 BOM 다음부터
+                self._pos[key] = {'json': 1, 'jsonl': 0, 'csv': len(codecs.BOM_UTF8)}[key]
+                continue
+            cut = self._cut_position(key)
+            with open(self.paths[key], 'r+b') as f:
+                if self.cut is not None:
+                    f.seek(cut)
+                    with open(self.tail_path(key), 'wb') as tail:
+                        shutil.copyfileobj(f, tail)
+                f.truncate(cut)
+            self._rollback[key] = self._pos[key] = cut
+
+        mode = 'a' if self.start_idx else 'w'
+        if self.paths['json']:
+            self._files['json'] = open(self._target('json'), mode, encoding='utf-8')
+            if not self.start_idx:
+                self._files['json'].write('[')
+        if self.paths['jsonl']:
+            self._files['jsonl'] = open(self._target('jsonl'), mode, encoding='utf-8')
+        if self.paths['csv']:
+            # 이어 쓸 때는 BOM/헤더 없이
+            encoding = 'utf-8' if self.start_idx else 'utf-8-sig'
+            self._files['csv'] = open(self._target('csv'), mode, encoding=encoding, newline='')
+            if not self.start_idx:
+                self._emit('csv', self._csv_line(CSV_COLUMNS), item=False)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+    def _csv_line(self, row):
+        self._csv_buf.seek(0)
+        self._csv_buf.truncate()
+        self._csv.writerow(row)
+        return self._csv_buf.getvalue()
+
+    def _emit(self, key, data, item=True):
+        if item:
+            self.offsets[key].append(self._pos[key])
+        self._files[key].write(data)
+        self._pos[key] += len(data.encode('utf-8'))
+
+    def write(self, record):
+        """분석 1건 기록 (idx는 기록 순서)"""
+        idx = self.start_idx + self.stats.total
+        brand = self.brand_fn(record['product_name'])
+
+        if 'json' in self._files:
+            item = {'idx': idx, 'brand': brand, 'rating': record['rating'], 'sentiment': record['sentiment']}
+            item.update((field, record[field]) for field in EXPORT_FIELDS)
+            self._emit('json', ('\n' if idx == 0 else ',\n') + json.dumps(item, ensure_ascii=False))
+        if 'jsonl' in self._files:
+            self._emit('jsonl', json.dumps(dict(record, idx=idx, brand=brand), ensure_ascii=False, default=str) + '\n')
+        if 'csv' in self._files:
+            self._emit('csv', self._csv_line([
+                brand, record['review_content'], record['rating'], record['review_date'],
+                record['reviewer_info'], record['additional_info'], record['purchase_tag'],
+                record['review_id'], record['platform_code'],
+            ]))
+        self.ids.append(record['analysis_id'])
+        self.fingerprints.append(record_fingerprint(record))
+        self.stats.add(record, brand)
+
+    def close(self, commit=True):
+        """파일 닫기 (commit=False면 임시 파일 삭제 / 이어 쓴 부분 제거 + 잘라낸 부분 복원 → 기존 파일 유지)"""
+        if 'json' in self._files and (commit or not self.start_idx):
+            self._files['json'].write('\n]\n')
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+        if self.start_idx:
+            for key, size in self._rollback.items():
+                tail_path = self.tail_path(key)
+                if not commit:
+                    with open(self.paths[key], 'r+b') as f:
+                        f.truncate(size)
+                        f.seek(size)
+                        if self.cut is not None:
+                            with open(tail_path, 'rb') as tail:
+                                shutil.copyfileobj(tail, f)
+                        elif key == 'json':
+                            f.write(b'\n]\n')
+                if os.path.exists(tail_path):
+                    os.remove(tail_path)
+            self._rollback = {}
+            return
+
+        for path in self.paths.values():
+            if path and os.path.exists(path + '.tmp'):
+                if commit:
+                    os.replace(path + '.tmp', path)
+                else:
+                    os.remove(path + '.tmp')
+
+
+# ===== 증분 내보내기 =====
+def _stored_record(line):
+    """JSONL 1줄 → iter_analysis_records 형식 (idx/brand는 다시 기록할 때 새로 계산)"""
+    record = json.loads(line)
+    record.pop('idx', None)
+    record.pop('brand', None)
+    return record
+
+
+class IncrementalExporter:
+    """
+    ANALYSIS_ID / ANALYZED_AT / CHANGED_AT 워터마크 기반 증분 내보내기
+
+    1) 변경분 조회: ANALYSIS_ID > 마지막 ID 또는 ANALYZED_AT / CHANGED_AT >= 마지막 시각 - overlap
+       (ID 블록 할당으로 늦게 커밋된 작은 ID, 재분류로 CHANGED_AT이 갱신된 분석까지 포함)
+    2) 내용 해시(index)와 비교 → 신규 / 변경 / 그대로 분류
+    3) 삭제 확인: TB_ANALYSIS_DELETE_LOG에서 DELETED_AT >= 마지막 시각 - overlap 인 ID만 조회 (요약 갱신과 같은 방식)
+       verify=True면 DB의 ANALYSIS_ID 전체를 인덱스와 집합 비교 (로그 없이 지운 분석, 원본 리뷰가 늦게 적재된
+       워터마크 밖의 분석까지 찾음 - ID 전체를 읽으므로 가끔 점검용으로만)
+    4) 신규만 있으면 기존 파일 뒤에 이어 쓰기
+       변경/삭제가 있으면 처음 바뀐 항목부터만 로컬 JSONL을 읽어 다시 쓰기 (인덱스의 항목별 바이트 위치, DB 재조회 없음)
+
+    상태: state_path(JSON 워터마크) + index_path(npz: 기록 순서의 ANALYSIS_ID, 내용 해시, 파일별 항목 시작 위치)
+    상태 파일이 없거나 다시 쓰기가 중단된 흔적(.tail)이 있으면 전체 내보내기
+
+    Args:
+        engine: DB 엔진
+        brand_fn: product_name → 브랜드
+        json_path / jsonl_path / csv_path: 출력 파일 (jsonl_path는 필수, 다시 쓰기의 원본)
+        batch_size: fetchmany 크기
+        overlap: 시각 워터마크 여유 구간
+        tag_source: 태그 조회 대상 (AnalysisRepository.tag_source())
+    """
+
+    def __init__(self, engine, brand_fn, json_path, jsonl_path, csv_path, state_path, index_path,
+                 batch_size=5000, overlap=timedelta(minutes=10), tag_source=TAG_TABLE):
+        self.engine = engine
+        self.brand_fn = brand_fn
+        self.paths = {'json_path': json_path, 'jsonl_path': jsonl_path, 'csv_path': csv_path}
+        self.state_path = state_path
+        self.index_path = index_path
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self.tag_source = tag_source
+
+    # ===== 상태 =====
+    def load_state(self):
+        """워터마크 + 인덱스 (출력 파일이 하나라도 없으면 None → 전체 내보내기)"""
+        files = [self.state_path, self.index_path] + [p for p in self.paths.values() if p]
+        if not all(os.path.exists(p) for p in files):
+            return None
+        if any(os.path.exists(p + '.tail') for p in self.paths.values() if p):
+            return None
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        index = np.load(self.index_path)
+        state['ids'] = index['ids']
+        state['fingerprints'] = index['fingerprints']
+        if len(state['ids']) != state['count']:
+            return None
+        # 항목 위치가 없는 예전 인덱스는 처음부터 다시 쓰기
+        keys = [path[:-len('_path')] for path, value in self.paths.items() if value]
+        if all(f'offsets_{key}' in index.files for key in keys):
+            state['offsets'] = {key: index[f'offsets_{key}'] for key in keys}
+        else:
+            state['offsets'] = None
+        return state
+
+    def _save_state(self, ids, fingerprints, offsets, watermark):
+        ids = np.asarray(ids, dtype=np.int64)
+        state = {
+            'last_analysis_id': int(ids.max()) if len(ids) else 0,
+            'last_analyzed_at': str(watermark) if watermark is not None else None,
+            'count': len(ids),
+            'exported_at': datetime.now().isoformat(),
+        }
+        arrays = {f'offsets_{key}': np.asarray(values, dtype=np.int64) for key, values in (offsets or {}).items()}
+        with open(self.index_path + '.tmp', 'wb') as f:
+            np.savez(f, ids=ids, fingerprints=np.asarray(fingerprints, dtype=np.int64), **arrays)
+        os.replace(self.index_path + '.tmp', self.index_path)
+        with open(self.state_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(self.state_path + '.tmp', self.state_path)
+
+    def _watermark(self, conn):
+        return latest_change_or_delete(conn)
+
+    # ===== 실행 =====
+    def run(self, full=False, verify=False):
+        """
+        내보내기 실행
+
+        Args:
+            full: 상태를 무시하고 전체 내보내기
+            verify: 삭제 로그 대신 DB의 ANALYSIS_ID 전체와 비교 (누락 / 로그 없는 삭제 점검)
+
+        Returns:
+            dict: mode(full/append/merge), total, inserted, updated, deleted, unchanged,
+                  rewritten(이번에 기록한 건수), stats(이번에 기록한 건 기준)
+        """
+        state = None if full else self.load_state()
+        with self.engine.connect() as conn:
+            watermark = self._watermark(conn)
+            if state is None:
+                return self._full(conn, watermark)
+            return self._incremental(conn, state, watermark, verify)
+
+    def _full(self, conn, watermark):
+        with AnalysisExportWriter(self.brand_fn, **self.paths) as writer:
+            for record in iter_analysis_records(conn, batch_size=self.batch_size, tag_source=self.tag_source):
+                writer.write(record)
+        self._save_state(writer.ids, writer.fingerprints, writer.offsets, watermark)
+        return {'mode': 'full', 'total': writer.stats.total, 'inserted': writer.stats.total,
+                'updated': 0, 'deleted': 0, 'unchanged': 0, 'rewritten': writer.stats.total, 'stats': writer.stats}
+
+    def _incremental(self, conn, state, watermark, verify):
+        ids, fingerprints, offsets = state['ids'], state['fingerprints'], state['offsets']
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+
+        def position(aid):
+            i = np.searchsorted(sorted_ids, aid)
+            return int(order[i]) if i < len(sorted_ids) and sorted_ids[i] == aid else None
+
+        # 1) 변경분 조회 → 신규 / 변경 / 그대로
+        since = None
+        if state['last_analyzed_at']:
+            since = datetime.fromisoformat(state['last_analyzed_at']) - self.overlap
+        cond = "a.ANALYSIS_ID > :last_id"
+        params = {'last_id': state['last_analysis_id']}
+        if since is not None:
+            cond += f" OR {CHANGED_SINCE_CONDITION}"
+            params['since'] = since
+        inserts, updates, unchanged = {}, {}, 0
+        for record in self._fetch(conn, cond, params):
+            pos = position(record['analysis_id'])
+            if pos is None:
+                inserts[record['analysis_id']] = record
+            elif fingerprints[pos] != record_fingerprint(record):
+                updates[record['analysis_id']] = record
+            else:
+                unchanged += 1
+
+        # 2) 삭제 확인 (삭제 로그, verify면 ID 집합 비교 + 누락 분석 조회)
+        if verify:
+            db_ids = self._fetch_ids(conn)
+            known = np.union1d(ids, np.fromiter(inserts, dtype=np.int64, count=len(inserts)))
+            deleted = set(np.setdiff1d(ids, db_ids).tolist())
+            missing = np.setdiff1d(db_ids, known).tolist()
+            for start in range(0, len(missing), 1000):
+                chunk = missing[start:start + 1000]
+                binds = {f'm{i}': aid for i, aid in enumerate(chunk)}
+                for record in self._fetch(conn, f"a.ANALYSIS_ID IN ({', '.join(':' + k for k in binds)})", binds):
+                    inserts[record['analysis_id']] = record
+        else:
+            # 지운 뒤 같은 ID로 다시 적재된 분석은 변경으로 처리
+            deleted = {aid for aid in self._fetch_deleted(conn, since)
+                       if position(aid) is not None and aid not in updates}
+
+        # 3) 적용
+        new_records = [inserts[aid] for aid in sorted(inserts)]
+        if not updates and not deleted:
+            mode, first = 'append', len(ids)
+        else:
+            mode = 'merge'
+            # 처음 바뀐 항목 앞까지는 그대로 두고 뒷부분만 다시 쓰기
+            first = min(position(aid) for aid in list(updates) + list(deleted)) if offsets is not None else 0
+
+        if mode == 'append' and not new_records:
+            all_ids, all_fps, all_offsets, stats = ids, fingerprints, offsets, ExportStats()
+        else:
+            cut = {key: int(values[first]) for key, values in offsets.items()} \
+                if mode == 'merge' and first else None
+            with AnalysisExportWriter(self.brand_fn, start_idx=first, cut=cut, **self.paths) as writer:
+                if mode == 'merge':
+                    source = writer.tail_path('jsonl') if first else self.paths['jsonl_path']
+                    with open(source, 'r', encoding='utf-8') as src:
+                        for line in src:
+                            record = _stored_record(line)
+                            aid = record['analysis_id']
+                            if aid in deleted:
+                                continue
+                            writer.write(updates.get(aid, record))
+                for record in new_records:
+                    writer.write(record)
+            all_ids = np.concatenate([ids[:first], np.asarray(writer.ids, dtype=np.int64)])
+            all_fps = np.concatenate([fingerprints[:first], np.asarray(writer.fingerprints, dtype=np.int64)])
+            if not first:
+                all_offsets = writer.offsets
+            elif offsets is not None:
+                all_offsets = {key: np.concatenate([values[:first], np.asarray(writer.offsets[key], dtype=np.int64)])
+                               for key, values in offsets.items()}
+            else:
+                all_offsets = None
+            stats = writer.stats
+
+        self._save_state(all_ids, all_fps, all_offsets, watermark or state['last_analyzed_at'])
+        return {'mode': mode, 'total': len(all_ids), 'inserted': len(new_records), 'updated': len(updates),
+                'deleted': len(deleted), 'unchanged': unchanged, 'rewritten': stats.total, 'stats': stats}
+
+    def _fetch(self, conn, cond, params):
+        where = f"WHERE {cond}"
+        child_where = f"WHERE p.ANALYSIS_ID IN (SELECT a.ANALYSIS_ID FROM TB_REVIEW_GPT_ANALYSIS a {where})"
+        return iter_analysis_records(conn, batch_size=self.batch_size, where=where, child_where=child_where,
+                                     params=params, tag_source=self.tag_source)
+
+    def _fetch_deleted(self, conn, since):
+        """since 이후 삭제 로그에 남은 ANALYSIS_ID (since가 None이면 전체)"""
+        sql = f"SELECT DISTINCT ANALYSIS_ID FROM {DELETE_LOG_TABLE}"
+        if since is None:
+            return [r[0] for r in conn.execute(text(sql))]
+        return [r[0] for r in conn.execute(text(sql + " WHERE DELETED_AT >= :since"), {'since': since})]
+
+    def _fetch_ids(self, conn):
+        result = conn.execution_options(stream_results=True, max_row_buffer=self.batch_size).execute(text("""
+            SELECT a.ANALYSIS_ID FROM TB_REVIEW_GPT_ANALYSIS a
+            JOIN TB_CRAWLING_REVIEW cr ON a.REVIEW_ID = cr.REVIEW_ID
+        """))
+        chunks = []
+        while True:
+            rows = result.fetchmany(self.batch_size)
+            if not rows:
+                break
+            chunks.append(np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows)))
+        result.close()
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
@@ -0,0 +1,156 @@
+"""
+DB 리뷰 분석 실행기 (gpt_analyzer_full / gpt_analyzer_manual 공통)
+
+두 스크립트가 각자 복사해 두던 프롬프트, 분석 엔진 구성, 실행 흐름을 한곳으로 모음
+스크립트에는 분석 대상(미분석 리뷰 쿼리, 큐 이름)과 REVIEW_ID 변환만 남김
+
+실행 흐름 (run_db_analysis):
+    1) 미분석 리뷰를 키셋 페이지 단위로 조회해 공유 작업 큐에 등록
+       (대기/처리 중인 ID는 무시, failed / 분석이 삭제된 done은 다시 대기)
+    2) 리스 단위로 가져와 근사 중복 대표만 API 호출 (재시도 / 서킷 브레이커 / 응답 캐시)
+    3) DbSink가 commit_every건 / commit_interval초마다 커밋, 커밋된 건만 큐에 완료 처리
+"""
+
+import os
+from datetime import datetime
+from functools import partial
+
+from src.dedup import DEFAULT_THRESHOLD
+from src.llm_engine import DbSink, LLMAnalyzer, PromptSpec, ResponseCache, db_rows_to_items, print_metrics
+from src.resilience import CircuitBreaker, RetryPolicy
+from src.response_parser import FULL_SCHEMA
+from src.work_queue import SQLiteQueueBackend, WorkQueue, print_queue_stats, run_with_queue
+
+
+CACHE_PATH = 'output/gpt_response_cache.jsonl'  # 같은 프롬프트를 쓰는 스크립트끼리 공유
+WORK_QUEUE_PATH = 'output/gpt_work_queue.db'    # 여러 프로세스가 공유 (큐 이름으로 구분)
+
+# ===== 분석 프롬프트 =====
+ANALYSIS_PROMPT = """화장품 리뷰 분석. JSON으로 응답.
+
+리뷰: "{review}"
+별점: {rating}점
+
+{{
+    "sentiment": "POS/NEU/NEG",
+    "pain_points": ["불만점"],
+    "positive_points": ["장점"],
+    "benefit_tags": ["진정/보습/장벽/결/피지 중 해당"],
+    "texture_tags": ["물같음/쫀쫀/끈적/흡수 중 해당"],
+    "usage_tags": ["닦토/스킨팩/레이어링/바디 중 해당"],
+    "value_tags": ["가성비/무난/애매/인생템 중 해당"]
+}}
+
+sentiment: 내용 기반. 별점 높아도 불만이면 NEG.
+없는 항목은 빈 배열."""
+
+
+PROMPT = PromptSpec(ANALYSIS_PROMPT, temperature=0.1, max_tokens=300, max_chars=500, schema=FULL_SCHEMA)
+
+
+def create_client():
+    """CLASSIFICATION_REVIEW 키로 OpenAI 클라이언트 생성 (재시도는 src.resilience에서 처리)"""
+    from openai import OpenAI
+
+    api_key = os.getenv('CLASSIFICATION_REVIEW')
+    if not api_key:
+        raise ValueError("CLASSIFICATION_REVIEW 환경변수가 설정되지 않았습니다.")
+    return OpenAI(api_key=api_key, max_retries=0)
+
+
+def create_analyzer(client, cache, dead_letter_path, dedup_audit_path, telemetry_path, workers=8, rate_per_sec=8,
+                    batch_size=50, dedup_threshold=DEFAULT_THRESHOLD):
+    """공통 분석 엔진 구성 (재시도/서킷 브레이커/캐시/근사 중복/동시 호출)"""
+    return LLMAnalyzer(
+        client, PROMPT, policy=RetryPolicy(max_retries=3),
+        breaker=CircuitBreaker(failure_threshold=10, recovery_timeout=60), cache=cache,
+        workers=workers, rate_per_sec=rate_per_sec, batch_size=batch_size,
+        dead_letter_path=dead_letter_path, dedup_threshold=dedup_threshold, dedup_audit_path=dedup_audit_path,
+        telemetry_path=telemetry_path,
+    )
+
+
+def insert_outcomes(repo, id_allocator, review_id_fn, conn, records):
+    """DbSink용: 배치 1개를 테이블별 배열 바인드로 적재 (review_id_fn: 큐 ID → REVIEW_ID, 전파된 멤버는 토큰 0)"""
+    with repo.bulk_loader(conn, batch_size=len(records), ids=id_allocator) as loader:
+        for item, outcome in records:
+            result = outcome['result']
+            review_id = review_id_fn(item['id']) if review_id_fn else item['id']
+            loader.add(review_id, item['rating'], result.get('sentiment', 'NEU'),
+                       outcome['tokens_in'], outcome['tokens_out'], result)
+
+
+def enqueue_pending(repo, work_queue, pending_sql, key_column, params, page_size=5000):
+    """
+    미분석 리뷰를 페이지 단위로 조회해 작업 큐에 등록
+
+    Args:
+        pending_sql: 본문 / 별점을 조회하는 키셋 페이지 쿼리 ({after} 자리 포함, repo.iter_pages 형식)
+        key_column: 페이지 키 컬럼
+
+    Returns:
+        tuple: (미분석 건수, 신규 등록 + 다시 대기 건수)
+    """
+    pending = added = 0
+    # 조회 시작 전에 완료된 done만 다시 대기 (조회 중에 다른 워커가 완료한 건은 분석이 이미 있음)
+    listed_at = datetime.now()
+    with repo.engine.connect() as conn:
+        for rows in repo.iter_pages(conn, pending_sql, key_column, params, page_size):
+            pending += len(rows)
+            added += work_queue.enqueue_items(db_rows_to_items(rows), listed_at=listed_at)
+    return pending, added
+
+
+def run_db_analysis(repo, pending_sql, key_column, params, queue_name, dead_letter_path, dedup_audit_path,
+                    telemetry_path, review_id_fn=None, workers=8, rate_per_sec=8, batch_size=50, commit_every=500,
+                    commit_interval=30, lease_size=500, page_size=5000, dedup_threshold=DEFAULT_THRESHOLD):
+    """
+    미분석 리뷰 큐 등록 → 리스 단위 분석 → DB 적재 → 결과 요약 출력
+
+    Args:
+        repo: AnalysisRepository
+        pending_sql / key_column / params: 미분석 리뷰 페이지 쿼리 (enqueue_pending)
+        queue_name: 작업 큐 이름 (WORK_QUEUE_PATH 안에서 구분)
+        review_id_fn: 큐 ID(원본 REVIEW_ID) → 분석 테이블 REVIEW_ID (None이면 그대로)
+        workers / rate_per_sec: 동시 API 호출 수 / 초당 최대 요청 수
+        batch_size: DB 적재 단위 (세이브포인트 1개)
+        commit_every / commit_interval: 커밋 단위 리뷰 수 / 최대 간격(초)
+        lease_size: 작업 큐에서 한 번에 가져오는 건수 (근사 중복 클러스터링 범위)
+
+    Returns:
+        dict: pending, added, loaded(커밋된 적재 건수), summary(엔진 지표)
+    """
+    client = create_client()
+
+    print("\n분석 대상 리뷰 조회...")
+    work_queue = WorkQueue(SQLiteQueueBackend(WORK_QUEUE_PATH, queue_name))
+    pending, added = enqueue_pending(repo, work_queue, pending_sql, key_column, params, page_size)
+    print(f"  미분석 리뷰: {pending:,}건")
+    print(f"  작업 큐 등록 (신규 + 실패/삭제 건 재등록): {added:,}건 (워커 {work_queue.worker_id})")
+    print_queue_stats(work_queue.backend.stats())
+
+    print("\n분석 시작...")
+    cache = ResponseCache(CACHE_PATH)
+    analyzer = create_analyzer(client, cache, dead_letter_path, dedup_audit_path, telemetry_path, workers=workers,
+                               rate_per_sec=rate_per_sec, batch_size=batch_size, dedup_threshold=dedup_threshold)
+    # 시퀀스 블록 / 태그 비트는 배치(트랜잭션)가 바뀌어도 이어서 사용 (롤백되면 DbSink가 비움)
+    id_allocator = repo.id_allocator(block_size=batch_size * 4)
+    db_sink = DbSink(repo.engine, insert_batch_fn=partial(insert_outcomes, repo, id_allocator, review_id_fn),
+                     commit_every=commit_every, commit_interval=commit_interval,
+                     caches=[id_allocator, repo.tag_bits])
+    try:
+        run_with_queue(analyzer, work_queue, [db_sink], lease_size=lease_size, desc="GPT 분석 + DB 적재")
+    except KeyboardInterrupt:
+        print("\n\n중단됨. 받은 결과까지 커밋되고 남은 리스는 반납됩니다.")
+    finally:
+        cache.close()
+
+    summary = analyzer.summary()
+    print("\n" + "=" * 70)
+    print("분석 완료!")
+    print("=" * 70)
+    print(f"  적재: {db_sink.count:,}건 (커밋 {db_sink.commits:,}회, 적재 실패 {db_sink.failed:,}건)")
+    print_metrics(summary)
+    print_queue_stats(work_queue.backend.stats())
+    print(f"  dead-letter: {dead_letter_path}")
+    return {'pending': pending, 'added': added, 'loaded': db_sink.count, 'summary': summary}
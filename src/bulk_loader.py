@@ -0,0 +1,174 @@
+"""
+GPT 분석 결과 일괄 적재 (배열 바인드)
+
+리뷰 1건마다 부모 INSERT → CURRVAL 조회 → pain/positive/tag 1건씩 INSERT 하던 방식은
+리뷰당 5~20번 DB 왕복이 필요했음
+
+- 테이블별로 행을 버퍼에 모았다가 batch_size건마다 executemany 1번으로 적재 (배열 바인드)
+- PK는 시퀀스 값을 블록 단위로 미리 할당 (SELECT SEQ.NEXTVAL FROM DUAL CONNECT BY LEVEL <= n)
+  → CURRVAL 왕복 없이 자식 행에 부모 ANALYSIS_ID를 바로 채움
+- 부모 → 자식 순서로 flush (FK 순서 보장)
+
+5만 건 적재 시 왕복 횟수: 리뷰당 5~20회 → 배치당 4회 + 시퀀스 블록당 1회
+"""
+
+from sqlalchemy import text
+
+
+# 테이블별 (시퀀스, INSERT 문)
+ANALYSIS_TABLE = 'TB_REVIEW_GPT_ANALYSIS'
+PAIN_TABLE = 'TB_REVIEW_PAIN_POINTS'
+POSITIVE_TABLE = 'TB_REVIEW_POSITIVE_POINTS'
+TAG_TABLE = 'TB_REVIEW_TAGS'
+
+SEQUENCES = {
+    ANALYSIS_TABLE: 'SEQ_GPT_ANALYSIS',
+    PAIN_TABLE: 'SEQ_PAIN_POINTS',
+    POSITIVE_TABLE: 'SEQ_POSITIVE_POINTS',
+    TAG_TABLE: 'SEQ_TAGS',
+}
+
+INSERT_SQL = {
+    ANALYSIS_TABLE: """
+        INSERT INTO TB_REVIEW_GPT_ANALYSIS (ANALYSIS_ID, REVIEW_ID, REVIEW_RATING, SENTIMENT, TOKENS_INPUT, TOKENS_OUTPUT)
+        VALUES (:id, :review_id, :rating, :sentiment, :tokens_in, :tokens_out)
+    """,
+    PAIN_TABLE: """
+        INSERT INTO TB_REVIEW_PAIN_POINTS (ID, ANALYSIS_ID, POINT_TEXT, CATEGORY)
+        VALUES (:id, :aid, :pt, :cat)
+    """,
+    POSITIVE_TABLE: """
+        INSERT INTO TB_REVIEW_POSITIVE_POINTS (ID, ANALYSIS_ID, POINT_TEXT, CATEGORY)
+        VALUES (:id, :aid, :pt, :cat)
+    """,
+    TAG_TABLE: """
+        INSERT INTO TB_REVIEW_TAGS (ID, ANALYSIS_ID, TAG_TYPE, TAG_VALUE)
+        VALUES (:id, :aid, :ttype, :tval)
+    """,
+}
+
+# packed 방식: 태그를 분석 행의 마스크 컬럼에 함께 적재 (TB_REVIEW_TAGS 행 없음)
+PACKED_ANALYSIS_SQL = """
+    INSERT INTO TB_REVIEW_GPT_ANALYSIS (ANALYSIS_ID, REVIEW_ID, REVIEW_RATING, SENTIMENT, TOKENS_INPUT, TOKENS_OUTPUT,
+                                        BENEFIT_MASK, TEXTURE_MASK, USAGE_MASK, VALUE_MASK)
+    VALUES (:id, :review_id, :rating, :sentiment, :tokens_in, :tokens_out,
+            :BENEFIT, :TEXTURE, :USAGE, :VALUE)
+"""
+
+# 결과 필드 → TAG_TYPE
+TAG_FIELDS = {
+    'BENEFIT': 'benefit_tags',
+    'TEXTURE': 'texture_tags',
+    'USAGE': 'usage_tags',
+    'VALUE': 'value_tags',
+}
+
+
+def oracle_sequence_allocator(conn, sequence, n):
+    """Oracle 시퀀스에서 n개 값을 한 번에 할당 (동시 사용 시 연속이 아닐 수 있음)"""
+    rows = conn.execute(text(f"SELECT {sequence}.NEXTVAL FROM DUAL CONNECT BY LEVEL <= :n"), {'n': n}).fetchall()
+    return [r[0] for r in rows]
+
+
+class IdAllocator:
+    """
+    시퀀스별 ID 블록 캐시 (트랜잭션이 바뀌어도 남은 블록을 계속 사용)
+
+    Args:
+        allocate_fn: allocate_fn(conn, sequence, n) → ID 목록 (기본: Oracle 시퀀스)
+        block_size: 한 번에 할당하는 ID 수 (쓰지 않고 끝난 값은 시퀀스 공백으로 남음)
+    """
+
+    def __init__(self, allocate_fn=oracle_sequence_allocator, block_size=1000):
+        self.allocate_fn = allocate_fn
+        self.block_size = block_size
+        self._blocks = {}
+
+    def next_id(self, conn, sequence):
+        block = self._blocks.get(sequence)
+        if not block:
+            block = list(reversed(self.allocate_fn(conn, sequence, self.block_size)))
+            self._blocks[sequence] = block
+        return block.pop()
+
+    def reset(self):
+        """받아 둔 블록 폐기 (시퀀스 할당이 롤백됐을 수 있을 때 - 남은 값은 공백으로)"""
+        self._blocks = {}
+
+
+class BulkAnalysisLoader:
+    """
+    분석 결과 일괄 적재기 (같은 연결/트랜잭션 안에서 사용)
+
+    사용 예:
+        with engine.begin() as conn, BulkAnalysisLoader(conn) as loader:
+            for rec in records:
+                loader.add(rec['review_id'], rec['rating'], rec['sentiment'], tin, tout, rec)
+
+    Args:
+        conn: DB 연결 (커밋은 호출한 쪽에서)
+        batch_size: 부모 행 기준 flush 단위
+        ids: 공유할 IdAllocator (None이면 새로 생성 - 트랜잭션마다 로더를 만들 때 재사용)
+        allocate_fn, id_block_size: 새 IdAllocator 설정 (id_block_size None이면 batch_size)
+        tag_bits: src.tag_bits.TagBitmap (지정하면 태그를 분석 행의 마스크 컬럼으로 적재 - packed 방식)
+    """
+
+    def __init__(self, conn, batch_size=1000, ids=None, allocate_fn=oracle_sequence_allocator, id_block_size=None,
+                 tag_bits=None):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.ids = ids or IdAllocator(allocate_fn, id_block_size or batch_size)
+        self.tag_bits = tag_bits
+        self._buffers = {table: [] for table in INSERT_SQL}
+        self.counts = {table: 0 for table in INSERT_SQL}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def _row(self, table, **values):
+        values['id'] = self.ids.next_id(self.conn, SEQUENCES[table])
+        self._buffers[table].append(values)
+        return values['id']
+
+    def add(self, review_id, rating, sentiment, tokens_in, tokens_out, result):
+        """
+        분석 결과 1건 버퍼에 추가 → 할당된 ANALYSIS_ID
+
+        result: pain_points / positive_points / *_tags (+ pain_categories / positive_categories) 포함 dict
+        """
+        masks = {}
+        if self.tag_bits is not None:
+            masks = {tag_type: self.tag_bits.encode(self.conn, tag_type, [v[:50] for v in result.get(field) or []])
+                     for tag_type, field in TAG_FIELDS.items()}
+        aid = self._row(ANALYSIS_TABLE, review_id=review_id, rating=rating, sentiment=sentiment,
+                        tokens_in=tokens_in, tokens_out=tokens_out, **masks)
+
+        for table, points_key, cat_key in ((PAIN_TABLE, 'pain_points', 'pain_categories'),
+                                           (POSITIVE_TABLE, 'positive_points', 'positive_categories')):
+            categories = result.get(cat_key) or []
+            for i, pt in enumerate(result.get(points_key) or []):
+                self._row(table, aid=aid, pt=pt[:200], cat=categories[i] if i < len(categories) else None)
+
+        if self.tag_bits is None:
+            for tag_type, field in TAG_FIELDS.items():
+                for tag_val in result.get(field) or []:
+                    self._row(TAG_TABLE, aid=aid, ttype=tag_type, tval=tag_val[:50])
+
+        if len(self._buffers[ANALYSIS_TABLE]) >= self.batch_size:
+            self.flush()
+        return aid
+
+    def flush(self):
+        """버퍼를 테이블별 executemany 1번씩으로 적재 (부모 먼저)"""
+        for table, sql in INSERT_SQL.items():
+            if table == ANALYSIS_TABLE and self.tag_bits is not None:
+                sql = PACKED_ANALYSIS_SQL
+            rows = self._buffers[table]
+            if rows:
+                self.conn.execute(text(sql), rows)
+                self.counts[table] += len(rows)
+                self._buffers[table] = []
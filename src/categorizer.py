@@ -0,0 +1,192 @@
+"""
+분석 결과 JSON 일괄 재분류 (1번 읽고, 모든 매핑을 한 번에 적용하고, 1번 씀)
+
+categorize_points → recategorize_pain_points → recategorize_positive_points → recategorize_usage 순서로 돌리면
+스크립트마다 gpt_analysis_categorized.json 전체를 json.load → json.dump(indent=2) 해서 4번 파싱/직렬화했음
+
+- 매핑은 필드별 dict 조회 1번으로 합쳐 둠 (같은 필드에 매핑이 여러 개면 앞 매핑 결과에 다음 매핑을 이어 적용)
+- 항목마다 필드를 1번만 훑어 매핑 → 제외 값 제거 → 순서 유지 중복 제거
+- pain_categories / positive_categories는 재분류된 points에서 다시 만듦 (categorize_points와 같은 규칙)
+- 저장은 export_db_to_json과 같은 형식 (JSON 배열, 1줄 1항목, 들여쓰기 없음) → 증분 내보내기의 이어 쓰기와 호환
+- 매핑별 적중 수 / 한 번도 쓰이지 않은 매핑 항목 / 매핑되지 않은 값(롱테일) 집계
+- matcher(src.point_normalizer.StemMatcher)를 주면 정확히 일치하지 않는 값도 정규화 줄기로 매핑
+  (값별 결과를 캐시 → 같은 표현은 1번만 계산)
+"""
+
+import json
+import os
+from collections import Counter
+
+
+# 재분류된 points → 카테고리 필드
+CATEGORY_FIELDS = {'pain_points': 'pain_categories', 'positive_points': 'positive_categories'}
+
+
+class CategoryMapping:
+    """
+    필드 1개에 적용할 매핑
+
+    Args:
+        name: 보고용 이름 (PAIN / POSITIVE / USAGE ...)
+        field: 적용할 리스트 필드 (pain_points, usage_tags ...)
+        mapping: {표현: 대표값}
+        drop_values: 이 값으로 매핑되면 제거 (예: '기타')
+        matcher: 정확히 일치하지 않을 때 쓸 StemMatcher (None이면 정확 일치만)
+    """
+
+    def __init__(self, name, field, mapping, drop_values=(), matcher=None):
+        self.name = name
+        self.field = field
+        self.mapping = dict(mapping)
+        self.drop_values = set(drop_values)
+        self.targets = set(self.mapping.values())
+        self.matcher = matcher
+
+    def lookup(self, value):
+        """값 → (대표값 또는 None, 줄기 매칭 여부)"""
+        if value in self.mapping:
+            return self.mapping[value], False
+        if self.matcher is not None:
+            target = self.matcher.match(value)
+            if target is not None:
+                return target, True
+        return None, False
+
+
+class CategorizationEngine:
+    """
+    여러 매핑을 필드별 조회 테이블 1개로 합쳐 한 번에 적용
+
+    Args:
+        mappings: CategoryMapping 목록 (같은 필드는 목록 순서대로 이어 적용)
+        sync_categories: True면 CATEGORY_FIELDS를 재분류된 points로 다시 만듦
+    """
+
+    def __init__(self, mappings, sync_categories=True):
+        self.mappings = list(mappings)
+        self.sync_categories = sync_categories
+        self._chains = {}    # 필드 → 적용할 매핑 목록
+        self._lookups = {}   # 필드 → {원래 값: (최종 값, 적중 (매핑 이름, 줄기 매칭 여부) 목록)}
+        self._known = {}     # 필드 → 매핑 키 또는 대표값 (롱테일 판정용)
+        for m in self.mappings:
+            self._chains.setdefault(m.field, []).append(m)
+            self._known.setdefault(m.field, set()).update(m.mapping, m.targets)
+        self._fuzzy = {field for field, chain in self._chains.items() if any(m.matcher for m in chain)}
+        for field, chain in self._chains.items():
+            self._lookups[field] = {source: self._resolve(field, source)
+                                    for source in set().union(*(m.mapping for m in chain))}
+        self.hits = {m.name: Counter() for m in self.mappings}
+        self.stem_matches = {m.name: {} for m in self.mappings}  # 줄기로 매핑된 값 → 대표값
+        self.unmapped = {field: Counter() for field in self._lookups}
+        self.items = 0
+
+    def _resolve(self, field, source):
+        """필드의 매핑들을 차례로 적용한 (최종 값, 적중 목록) (최종 값이 None이면 제거)"""
+        value, names = source, []
+        for m in self._chains[field]:
+            mapped, by_stem = m.lookup(value)
+            if mapped is None:
+                continue
+            names.append((m.name, by_stem))
+            if mapped in m.drop_values:
+                return None, tuple(names)
+            value = mapped
+        return value, tuple(names)
+
+    def apply(self, item):
+        """항목 1건 재분류 (제자리 변경) → item"""
+        self.items += 1
+        for field, lookup in self._lookups.items():
+            values = item.get(field)
+            if not values:
+                continue
+            known, unmapped = self._known[field], self.unmapped[field]
+            out = []
+            for value in values:
+                hit = lookup.get(value)
+                if hit is None and field in self._fuzzy:
+                    hit = lookup[value] = self._resolve(field, value)
+                if hit is None or not hit[1]:
+                    if value not in known:
+                        unmapped[value] += 1
+                    out.append(value)
+                    continue
+                mapped, names = hit
+                for name, by_stem in names:
+                    self.hits[name][value] += 1
+                    if by_stem:
+                        self.stem_matches[name][value] = mapped
+                if mapped is not None:
+                    out.append(mapped)
+            item[field] = list(dict.fromkeys(out))
+        if self.sync_categories:
+            for points_field, category_field in CATEGORY_FIELDS.items():
+                if points_field in item:
+                    item[category_field] = list(dict.fromkeys(p for p in item[points_field] or [] if p))
+        return item
+
+    def report(self, top=20):
+        """
+        매핑별 적중 / 롱테일 요약
+
+        Returns:
+            dict: mappings(이름별 hits, sources_hit, stem_matches, unused), unmapped(필드별 distinct, total, top)
+                  stem_matches: {줄기로 매핑된 표현: {'target': 대표값, 'count': 건수}} (검토용)
+        """
+        mappings = {}
+        for m in self.mappings:
+            hits = self.hits[m.name]
+            mappings[m.name] = {
+                'field': m.field,
+                'hits': sum(hits.values()),
+                'sources_hit': len(hits),
+                'stem_matches': {value: {'target': target, 'count': hits[value]}
+                                 for value, target in self.stem_matches[m.name].items()},
+                'unused': sorted(s for s in m.mapping if s not in hits and s != m.mapping[s]),
+            }
+        unmapped = {field: {'distinct': len(c), 'total': sum(c.values()), 'top': c.most_common(top)}
+                    for field, c in self.unmapped.items()}
+        return {'items': self.items, 'mappings': mappings, 'unmapped': unmapped}
+
+
+def write_compact_json(items, path):
+    """JSON 배열을 1줄 1항목으로 기록 (임시 파일 → 교체, export_db_to_json과 같은 형식)"""
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write('[')
+        for i, item in enumerate(items):
+            f.write(('\n' if i == 0 else ',\n') + json.dumps(item, ensure_ascii=False))
+        f.write('\n]\n')
+    os.replace(path + '.tmp', path)
+
+
+def categorize_file(engine, in_path, out_path=None):
+    """
+    JSON 파일 1번 읽기 → 전체 재분류 → 1번 쓰기
+
+    Args:
+        engine: CategorizationEngine
+        in_path: 분석 결과 JSON 배열 (gpt_analysis_categorized.json)
+        out_path: 저장 경로 (None이면 in_path 덮어쓰기)
+
+    Returns:
+        dict: engine.report()
+    """
+    with open(in_path, 'r', encoding='utf-8') as f:
+        items = json.load(f)
+    for item in items:
+        engine.apply(item)
+    write_compact_json(items, out_path or in_path)
+    return engine.report()
+
+
+def print_report(report, top=10):
+    print(f"\n총 {report['items']:,}건 재분류")
+    print("\n[매핑별 적중]")
+    for name, r in report['mappings'].items():
+        print(f"  {name:10s} ({r['field']}): {r['hits']:,}건 | 적중 표현 {r['sources_hit']:,}개 | "
+              f"줄기 매칭 표현 {len(r['stem_matches']):,}개 | 쓰이지 않은 표현 {len(r['unused']):,}개")
+    print("\n[매핑되지 않은 값 (롱테일)]")
+    for field, r in report['unmapped'].items():
+        print(f"  {field}: 고유 {r['distinct']:,}개 / {r['total']:,}건")
+        for value, count in r['top'][:top]:
+            print(f"    {value}: {count:,}건")
@@ -0,0 +1,187 @@
+"""
+Append-only JSONL 체크포인트 저널
+
+리뷰 1건 분석이 끝날 때마다 JSON 1줄을 덧붙여 기록
+- 중간 저장 비용이 진행률과 무관하게 건당 1줄로 일정
+- 재개 시 리뷰 ID 기준으로 완료 여부 판단 (목록 길이 X)
+- 크래시 시 손실은 처리 중이던 요청뿐 (마지막 잘린 줄은 자동 복구)
+- compact_journal()로 최종 결과 목록 생성
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+
+# fsync 정책
+#   always   : 매 줄마다 fsync (전원 장애에도 안전, 기본값)
+#   interval : fsync_every건 또는 fsync_seconds초마다 fsync
+#   never    : OS 버퍼에 맡김 (프로세스 크래시에는 안전, 전원 장애 시 손실 가능)
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+
+def _repair_tail(path):
+    """
+    크래시로 잘린 마지막 줄 제거
+
+    마지막 바이트가 개행이 아니면 직전 개행까지 잘라냄
+    (잘린 줄 뒤에 새 레코드가 붙어 두 줄이 모두 깨지는 것 방지)
+    """
+    if not path.exists() or path.stat().st_size == 0:
+        return
+
+    with open(path, 'rb+') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b'\n':
+            return
+
+        size = f.tell()
+        pos = size
+        chunk = 4096
+        while pos > 0:
+            step = min(chunk, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step)
+            nl = buf.rfind(b'\n')
+            if nl != -1:
+                f.truncate(pos + nl + 1)
+                return
+        f.truncate(0)
+
+
+class CheckpointJournal:
+    """
+    Append-only 체크포인트 저널
+
+    사용 예:
+        with CheckpointJournal('output/results.jsonl') as journal:
+            journal.append({'review_id': 1, 'sentiment': 'POS'})
+    """
+
+    def __init__(self, path, fsync_policy='always', fsync_every=50, fsync_seconds=5.0):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"지원하지 않는 fsync 정책: {fsync_policy} (가능: {', '.join(FSYNC_POLICIES)})")
+
+        self.path = Path(path)
+        self.fsync_policy = fsync_policy
+        self.fsync_every = fsync_every
+        self.fsync_seconds = fsync_seconds
+
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _repair_tail(self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        return self
+
+    def close(self):
+        if self._file is None:
+            return
+        self.sync()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def append(self, record):
+        """레코드 1건 기록 (한 줄 단위로 write + flush)"""
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        self._file.write(line + '\n')
+        self._file.flush()
+        self._pending += 1
+
+        if self.fsync_policy == 'always':
+            self.sync()
+        elif self.fsync_policy == 'interval':
+            elapsed = time.monotonic() - self._last_sync
+            if self._pending >= self.fsync_every or elapsed >= self.fsync_seconds:
+                self.sync()
+
+    def sync(self):
+        """버퍼를 디스크까지 반영"""
+        if self._file is None or self._pending == 0:
+            return
+        self._file.flush()
+        if self.fsync_policy != 'never':
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+
+def read_journal(path):
+    """
+    저널 레코드 순회
+
+    파싱할 수 없는 줄(크래시로 잘린 마지막 줄 등)은 건너뜀
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def load_completed_ids(path, key='review_id'):
+    """저널에서 완료된 ID 집합 로드"""
+    return {rec[key] for rec in read_journal(path) if key in rec}
+
+
+def compact_journal(path, key='review_id', sort_key='idx'):
+    """
+    저널 압축: 같은 ID는 마지막 레코드만 남기고 정렬된 목록 반환
+
+    Args:
+        path: 저널 경로
+        key: 레코드 식별 키
+        sort_key: 정렬 기준 키 (없으면 기록 순서 유지)
+
+    Returns:
+        list: 최종 결과 레코드 목록
+    """
+    latest = {}
+    for rec in read_journal(path):
+        if key in rec:
+            latest[rec[key]] = rec
+
+    records = list(latest.values())
+    if sort_key and all(sort_key in rec for rec in records):
+        records.sort(key=lambda rec: rec[sort_key])
+    return records
+
+
+def seed_journal(path, records):
+    """
+    기존 JSON 결과를 저널로 옮겨 담기 (저널 도입 이전 결과 이어서 처리용)
+
+    저널이 이미 있으면 아무것도 하지 않음
+
+    Returns:
+        int: 옮겨 담은 레코드 수
+    """
+    path = Path(path)
+    if path.exists() and path.stat().st_size > 0:
+        return 0
+
+    seeded = 0
+    with CheckpointJournal(path, fsync_policy='interval') as journal:
+        for rec in records:
+            journal.append(rec)
+            seeded += 1
+    return seeded
@@ -0,0 +1,157 @@
+"""
+공유 DB 연결 (처음 사용할 때 생성, 프로세스 안에서 풀 1개 공유)
+
+스크립트마다 import 시점에 DB_connector.txt를 exec해서 엔진을 만들던 방식 대체
+- import만 해서는 엔진/연결을 만들지 않음 (테스트, normalize_product_name 재사용 등)
+- get_engine() / get_repository() 첫 호출 때 1번만 생성
+  → 분석기, 적재기, 내보내기가 한 프로세스에서 돌면 같은 풀을 사용
+- 풀 크기, pre-ping, recycle, 문장 캐시는 환경변수로 조정
+
+환경변수:
+    REVIEW_DB_URL: SQLAlchemy URL (sqlite:///... 이면 SQLite, oracle+oracledb://... 이면 직접 연결)
+        sqlite:///:memory: 는 연결 1개를 모든 스레드가 공유 (StaticPool, 풀 크기 설정 미사용)
+    DB_CONNECTOR: REVIEW_DB_URL이 없을 때 실행할 Oracle 엔진 생성 코드 파일
+        파일이 정의한 engine(의 url), connect_args, creator만 사용해 풀 설정을 적용한 엔진을 새로 만듦
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+    DB_STMT_CACHE_SIZE (드라이버 문장 캐시), DB_QUERY_CACHE_SIZE (SQLAlchemy 컴파일 캐시)
+"""
+
+import os
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from src.storage import OracleRepository, SQLiteRepository
+
+
+DEFAULT_CONNECTOR_PATH = r'C:\Users\USER\Pythons\reportSystem\DB_connector\DB_connector.txt'
+
+# 환경변수 → 기본값
+POOL_DEFAULTS = {
+    'DB_POOL_SIZE': 5,           # 유지할 연결 수 (분석기 writer + 조회 + 내보내기)
+    'DB_MAX_OVERFLOW': 10,       # 풀이 모자랄 때 추가로 여는 연결 수
+    'DB_POOL_TIMEOUT': 30,       # 연결 대기 최대 시간(초)
+    'DB_POOL_RECYCLE': 1800,     # 이 시간(초)보다 오래된 연결은 다시 연결 (방화벽/DB idle timeout 대비)
+    'DB_POOL_PRE_PING': 1,       # 빌려줄 때 연결 확인 (끊긴 연결로 몇 시간짜리 실행이 죽지 않도록)
+    'DB_STMT_CACHE_SIZE': 50,    # oracledb 연결별 문장 캐시 (같은 INSERT/SELECT 재파싱 방지)
+    'DB_QUERY_CACHE_SIZE': 500,  # SQLAlchemy text() 컴파일 캐시
+}
+
+_lock = threading.Lock()
+_engine = None
+_repository = None
+
+
+def _setting(name):
+    return int(os.getenv(name, POOL_DEFAULTS[name]))
+
+
+def _enable_statement_cache(engine):
+    """연결마다 드라이버 문장 캐시 크기 설정 (지원하는 드라이버만)"""
+    size = _setting('DB_STMT_CACHE_SIZE')
+
+    @event.listens_for(engine, 'connect')
+    def _set_stmt_cache(dbapi_connection, connection_record):
+        if hasattr(dbapi_connection, 'stmtcachesize'):
+            dbapi_connection.stmtcachesize = size
+
+
+def _pool_options(url):
+    """
+    방언이 쓰는 풀에 맞는 create_engine 인자
+
+    - QueuePool (Oracle, SQLite 파일): 풀 크기 / overflow / 대기 시간
+    - SQLite 메모리 DB: StaticPool (연결 1개 공유 - 스레드마다 다른 빈 DB가 생기지 않도록)
+    - 그 밖의 풀: 크기 인자를 받지 않으므로 recycle / pre-ping만
+    """
+    url = make_url(url)
+    options = {'pool_recycle': _setting('DB_POOL_RECYCLE'), 'pool_pre_ping': bool(_setting('DB_POOL_PRE_PING'))}
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        options.update(poolclass=StaticPool, connect_args={'check_same_thread': False})
+    elif issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+        options.update(pool_size=_setting('DB_POOL_SIZE'), max_overflow=_setting('DB_MAX_OVERFLOW'),
+                       pool_timeout=_setting('DB_POOL_TIMEOUT'))
+    return options
+
+
+def create_pooled_engine(url, **kwargs):
+    """
+    URL로 풀 설정이 적용된 엔진 생성 (연결은 첫 사용 때)
+
+    Args:
+        url: SQLAlchemy URL (문자열 또는 URL 객체)
+        kwargs: create_engine 추가 인자 (connect_args, creator 등 - 풀 설정보다 우선)
+    """
+    options = _pool_options(url)
+    if 'connect_args' in kwargs and 'connect_args' in options:
+        kwargs['connect_args'] = dict(options.pop('connect_args'), **kwargs['connect_args'])
+    options.update(kwargs)
+    engine = create_engine(url, query_cache_size=_setting('DB_QUERY_CACHE_SIZE'), **options)
+    _enable_statement_cache(engine)
+    return engine
+
+
+def load_connector_engine(connector_path=None):
+    """
+    DB_CONNECTOR 파일(엔진 생성 코드)을 실행해 접속 설정을 읽고 풀 설정을 적용한 엔진 생성
+
+    파일의 공개 설정만 사용 (파일이 만든 엔진은 연결 전에 폐기):
+        engine: 접속 URL (engine.url - 비밀번호 포함)
+        connect_args: 드라이버 접속 인자 (선택, 파일에서 create_engine에 넘긴 것과 같은 dict)
+        creator: DBAPI 연결을 만드는 함수 (선택, 있으면 URL 대신 사용)
+    """
+    connector_path = connector_path or os.getenv('DB_CONNECTOR', DEFAULT_CONNECTOR_PATH)
+    _ns = {}
+    with open(connector_path, 'r', encoding='utf-8') as f:
+        exec(f.read(), _ns)
+    connector_engine = _ns.get('engine')
+
+    if _ns.get('creator') is not None:
+        url = connector_engine.url if connector_engine is not None else 'oracle+oracledb://'
+        engine = create_pooled_engine(url, creator=_ns['creator'])
+    else:
+        engine = create_pooled_engine(connector_engine.url, connect_args=_ns.get('connect_args') or {})
+    if connector_engine is not None:
+        connector_engine.dispose()
+    return engine
+
+
+def repository_for(engine):
+    """엔진 방언에 맞는 저장소"""
+    if engine.dialect.name == 'sqlite':
+        return SQLiteRepository(engine)
+    return OracleRepository(engine)
+
+
+def get_engine():
+    """공유 엔진 (첫 호출 때 REVIEW_DB_URL 또는 DB_CONNECTOR로 생성)"""
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                url = os.getenv('REVIEW_DB_URL')
+                _engine = create_pooled_engine(url) if url else load_connector_engine()
+    return _engine
+
+
+def get_repository():
+    """공유 엔진을 쓰는 저장소 (프로세스 안에서 1개)"""
+    global _repository
+    if _repository is None:
+        engine = get_engine()
+        with _lock:
+            if _repository is None:
+                _repository = repository_for(engine)
+    return _repository
+
+
+def dispose():
+    """공유 풀의 연결을 모두 닫고 다음 사용 때 다시 생성 (fork 후, 설정 변경 후)"""
+    global _engine, _repository
+    with _lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = None
+        _repository = None
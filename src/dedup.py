@@ -0,0 +1,218 @@
+"""
+근사 중복 리뷰 클러스터링 (MinHash + LSH)
+
+"촉촉하고 좋아요", "촉촉해요 좋아요" 처럼 거의 같은 리뷰를 묶어
+클러스터 대표 1건만 GPT로 분석하고 결과를 나머지 멤버에 전파
+
+- 정규화: 공백/기호 제거, 반복 문자 축약 (ㅎㅎㅎㅎ → ㅎㅎ)
+- 음절 n-gram shingle → MinHash 서명 → LSH 밴딩으로 후보쌍 탐색
+- 대표 기준 tight 클러스터: 모든 멤버가 대표와 추정 유사도 >= threshold
+- 전파 내역은 감사(audit) 파일로 남김
+"""
+
+import json
+import re
+import zlib
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+
+# ===== 기본 설정 =====
+DEFAULT_THRESHOLD = 0.85   # 대표와의 최소 추정 Jaccard 유사도
+DEFAULT_NUM_PERM = 64      # MinHash 순열 수
+DEFAULT_BANDS = 16         # LSH 밴드 수 (밴드당 num_perm / bands 행)
+DEFAULT_SHINGLE_SIZE = 2   # 음절 n-gram 크기
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_RE_NON_WORD = re.compile(r'[^0-9A-Za-z가-힣ㄱ-ㅎㅏ-ㅣ]+')
+_RE_REPEAT = re.compile(r'(.)\1{2,}')
+
+
+def normalize_text(text):
+    """비교용 정규화: 소문자화, 공백/기호 제거, 3회 이상 반복 문자 2회로 축약"""
+    s = str(text).lower() if text is not None else ''
+    s = _RE_NON_WORD.sub('', s)
+    return _RE_REPEAT.sub(r'\1\1', s)
+
+
+def _shingles(text, k):
+    """정규화된 텍스트 → shingle 해시 배열 (uint64)"""
+    if len(text) <= k:
+        grams = {text}
+    else:
+        grams = {text[i:i + k] for i in range(len(text) - k + 1)}
+    return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def _permutations(num_perm, seed=42):
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+    b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+    return a, b
+
+
+def minhash_signatures(texts, num_perm=DEFAULT_NUM_PERM, shingle_size=DEFAULT_SHINGLE_SIZE, seed=42):
+    """
+    텍스트 목록 → MinHash 서명 행렬
+
+    Returns:
+        ndarray: (len(texts), num_perm) uint64
+    """
+    a, b = _permutations(num_perm, seed)
+    sigs = np.empty((len(texts), num_perm), dtype=np.uint64)
+    for i, text in enumerate(texts):
+        hv = _shingles(text, shingle_size)
+        # (a * x + b) mod p, 하위 32비트 사용
+        phv = ((np.outer(hv, a) + b) % _MERSENNE_PRIME) & _MAX_HASH
+        sigs[i] = phv.min(axis=0)
+    return sigs
+
+
+def cluster_near_duplicates(texts, threshold=DEFAULT_THRESHOLD, groups=None,
+                            num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS,
+                            shingle_size=DEFAULT_SHINGLE_SIZE):
+    """
+    근사 중복 클러스터링
+
+    입력 순서상 먼저 나온 리뷰가 대표가 되며, 아직 배정되지 않은 후보 중
+    대표와 추정 유사도가 threshold 이상인 리뷰만 멤버로 편입 (체인 확장 없음)
+
+    Args:
+        texts: 리뷰 텍스트 목록
+        threshold: 대표와의 최소 추정 Jaccard 유사도 (None이면 클러스터링 없이 각자 대표)
+        groups: 같은 그룹 안에서만 묶을 키 목록 (예: 별점, 프롬프트에 별점이 들어가는 경우)
+        num_perm: MinHash 순열 수
+        bands: LSH 밴드 수 (num_perm의 약수)
+        shingle_size: 음절 n-gram 크기
+
+    Returns:
+        tuple: (rep_index, similarity)
+            rep_index[i]  - i번째 리뷰의 대표 위치 (대표 자신은 i)
+            similarity[i] - 대표와의 추정 유사도 (대표 자신은 1.0)
+    """
+    if num_perm % bands != 0:
+        raise ValueError(f"num_perm({num_perm})은 bands({bands})의 배수여야 합니다.")
+
+    n = len(texts)
+    rep_index = np.arange(n)
+    similarity = np.ones(n)
+    if threshold is None or n == 0:
+        return rep_index, similarity
+
+    normalized = [normalize_text(t) for t in texts]
+
+    # 1) 정규화 결과가 완전히 같은 리뷰는 서명 계산 없이 바로 묶음
+    first_seen = {}
+    unique_pos = []
+    for i in range(n):
+        key = (groups[i] if groups is not None else None, normalized[i])
+        if key in first_seen:
+            rep_index[i] = first_seen[key]
+        else:
+            first_seen[key] = i
+            unique_pos.append(i)
+
+    # 2) 고유 텍스트만 MinHash + LSH
+    sigs = minhash_signatures([normalized[i] for i in unique_pos], num_perm, shingle_size)
+    rows = num_perm // bands
+
+    buckets = defaultdict(list)
+    bucket_keys = []
+    for u, i in enumerate(unique_pos):
+        group = groups[i] if groups is not None else None
+        keys = [(group, band, sigs[u, band * rows:(band + 1) * rows].tobytes()) for band in range(bands)]
+        for key in keys:
+            buckets[key].append(u)
+        bucket_keys.append(keys)
+
+    # 3) 대표 기준 tight 클러스터 (먼저 나온 리뷰가 대표)
+    assigned = np.zeros(len(unique_pos), dtype=bool)
+    for u in range(len(unique_pos)):
+        if assigned[u]:
+            continue
+        assigned[u] = True
+        cands = set()
+        for key in bucket_keys[u]:
+            bucket = buckets[key]
+            if len(bucket) > 1:
+                cands.update(bucket)
+        cands = np.array(sorted(v for v in cands if v > u and not assigned[v]), dtype=int)
+        if len(cands) == 0:
+            continue
+        sims = (sigs[cands] == sigs[u]).mean(axis=1)
+        for v, sim in zip(cands[sims >= threshold], sims[sims >= threshold]):
+            rep_index[unique_pos[v]] = unique_pos[u]
+            similarity[unique_pos[v]] = sim
+            assigned[v] = True
+
+    # 4) 완전 중복 멤버는 자기 대표의 대표를 따라감
+    for i in range(n):
+        rep = rep_index[i]
+        if rep != i and rep_index[rep] != rep:
+            similarity[i] = similarity[rep]
+            rep_index[i] = rep_index[rep]
+
+    return rep_index, similarity
+
+
+def cluster_members(rep_index):
+    """대표 위치 → 멤버 위치 목록 (대표 자신 제외)"""
+    members = defaultdict(list)
+    for i, rep in enumerate(rep_index):
+        if rep != i:
+            members[int(rep)].append(i)
+    return members
+
+
+def summarize_clusters(rep_index):
+    """클러스터링 요약 (API 호출 절감량)"""
+    n = len(rep_index)
+    reps = int((rep_index == np.arange(n)).sum()) if n else 0
+    return {
+        'total': n,
+        'representatives': reps,
+        'propagated': n - reps,
+        'reduction_rate': (n - reps) / n if n else 0.0,
+    }
+
+
+def write_propagation_audit(path, run_id, propagations):
+    """
+    전파 감사 파일에 이어 쓰기 (JSONL, 실제로 결과가 전파된 멤버 1건 = 1줄)
+
+    대표 텍스트와 멤버 텍스트, 추정 유사도를 함께 남겨 사후 검수 가능하게 함
+    여러 실행 / 여러 리스가 같은 파일에 누적되므로 run_id로 구분
+
+    Args:
+        run_id: 실행 식별자 (LLMAnalyzer는 텔레메트리 run_id 사용)
+        propagations: [(멤버 ID, 멤버 텍스트, 대표 ID, 대표 텍스트, 유사도), ...]
+
+    Returns:
+        int: 기록한 멤버 수
+    """
+    if not propagations:
+        return 0
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for member_id, member_text, rep_id, rep_text, similarity in propagations:
+            f.write(json.dumps({
+                'run_id': run_id,
+                'member_id': member_id,
+                'representative_id': rep_id,
+                'similarity': round(float(similarity), 4),
+                'member_text': str(member_text)[:200],
+                'representative_text': str(rep_text)[:200],
+            }, ensure_ascii=False, default=str) + '\n')
+    return len(propagations)
+
+
+def print_cluster_summary(rep_index, label="근사 중복 제거"):
+    summary = summarize_clusters(rep_index)
+    print(f"\n  [{label}] 전체 {summary['total']:,}건 → 대표 {summary['representatives']:,}건 "
+          f"(전파 {summary['propagated']:,}건, {summary['reduction_rate'] * 100:.1f}% 절감)")
+    return summary
@@ -0,0 +1,781 @@
+"""
+통합 LLM 리뷰 분석 엔진
+
+ai_enhancer / gpt_analyzer / gpt_analyzer_full / gpt_analyzer_manual / gpt_analyzer_sample이
+각자 갖고 있던 "프롬프트 → 호출 → 파싱 → 재시도 → 저장" 루프를 하나로 통합
+
+- 소스: DataFrame, JSON 내보내기 파일, DB 쿼리, JSONL  →  item dict 목록
+- 싱크: DataFrame 덮어쓰기, JSON, JSONL 저널, DB 테이블  (여러 개 동시 사용 가능)
+- 공통: 동시 호출 + rate limit(src.pipeline), 재시도/서킷 브레이커/dead-letter(src.resilience),
+        근사 중복 전파(src.dedup), 응답 캐시, 지표(토큰/비용/지연), 호출 텔레메트리(src.telemetry)
+
+item 형식:
+    {'id': 리뷰 ID, 'key': 원본 위치(DataFrame 인덱스 등), 'text': 리뷰 본문, 'rating': 별점, 'row': 원본 레코드}
+
+outcome 형식:
+    {'result': 파싱된 dict, 'tokens_in', 'tokens_out', 'cached': bool, 'propagated_from': 대표 ID 또는 None}
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from src.checkpoint import CheckpointJournal, load_completed_ids, read_journal
+from src.dedup import cluster_members, cluster_near_duplicates, print_cluster_summary, write_propagation_audit
+from src.pipeline import RateLimiter, run_pipeline
+from src.resilience import (
+    ERROR_PARSE, CircuitOpenError, DeadLetterWriter, LLMCallError, RetryPolicy, call_with_retry, classify_error
+)
+from src.response_parser import ResponseParseError, build_field_prompt, parse_response, validate
+from src.telemetry import CallTelemetry, print_telemetry
+from src.token_estimator import MODEL_NAME, estimate_cost
+
+
+# 실패 필드 재요청 응답 길이 상한
+FIELD_RETRY_MAX_TOKENS = 100
+
+
+# ===== 프롬프트 =====
+class PromptSpec:
+    """
+    분석 프롬프트 정의
+
+    Args:
+        user: 사용자 메시지 템플릿 ({review}, {rating} 치환) 또는 item → 문자열 함수
+        system: 시스템 메시지 (선택)
+        model, temperature, max_tokens: chat.completions 파라미터
+        max_chars: 리뷰 본문 최대 길이 (None이면 전체)
+        uses_rating: 프롬프트에 별점이 들어가는지 (None이면 템플릿에서 판단)
+                     - 별점이 들어가면 근사 중복 전파를 같은 별점끼리로 제한
+        schema: 응답 스키마 (src.response_parser, None이면 JSON 추출만)
+                - 검증 실패 필드는 해당 필드만 재요청
+    """
+
+    def __init__(self, user, system=None, model=MODEL_NAME, temperature=0.1, max_tokens=300,
+                 max_chars=None, uses_rating=None, schema=None):
+        self.user = user
+        self.schema = schema
+        self.system = system
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.max_chars = max_chars
+        if uses_rating is None:
+            uses_rating = isinstance(user, str) and '{rating}' in user
+        self.uses_rating = uses_rating
+
+    def review_text(self, item):
+        return item['text'][:self.max_chars] if self.max_chars else item['text']
+
+    def build_messages(self, item, content=None):
+        """item → chat 메시지 (content를 주면 사용자 메시지로 그대로 사용)"""
+        if content is None:
+            text = self.review_text(item)
+            if callable(self.user):
+                content = self.user(dict(item, text=text))
+            else:
+                content = self.user.format(review=text, rating=item['rating'])
+
+        messages = []
+        if self.system:
+            messages.append({"role": "system", "content": self.system})
+        messages.append({"role": "user", "content": content})
+        return messages
+
+
+# ===== 소스 =====
+def _clean_text(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    return str(value)
+
+
+def _clean_rating(value, default=3):
+    try:
+        return int(value) if value is not None and not pd.isna(value) else default
+    except (TypeError, ValueError):
+        return default
+
+
+def dataframe_source(df, id_col='REVIEW_ID', text_col='REVIEW_CONTENT', rating_col='REVIEW_RATING'):
+    """DataFrame → item 목록 (key = DataFrame 인덱스)"""
+    ids = df[id_col].tolist() if id_col in df else list(df.index)
+    ratings = df[rating_col].tolist() if rating_col in df else [None] * len(df)
+    rows = df.to_dict('records')
+    return [
+        {'id': rid, 'key': key, 'text': _clean_text(text), 'rating': _clean_rating(rating), 'row': row}
+        for rid, key, text, rating, row in zip(ids, df.index, df[text_col].tolist(), ratings, rows)
+    ]
+
+
+def load_json_export(path):
+    """JSON 내보내기 파일({쿼리: [레코드]} 또는 [레코드]) → DataFrame"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data[list(data.keys())[0]]
+    return pd.DataFrame(data)
+
+
+def json_export_source(path, **kwargs):
+    """JSON 내보내기 파일 → item 목록 (key = 행 위치)"""
+    return dataframe_source(load_json_export(path), **kwargs)
+
+
+def db_query_source(conn, sql, params=None):
+    """
+    DB 쿼리 → item 목록
+
+    쿼리는 (REVIEW_ID, REVIEW_CONTENT, REVIEW_RATING) 순서로 조회해야 함
+    """
+    from sqlalchemy import text
+
+    return db_rows_to_items(conn.execute(text(sql), params or {}).fetchall())
+
+
+def db_rows_to_items(rows):
+    """(REVIEW_ID, REVIEW_CONTENT, REVIEW_RATING, ...) 행 목록 → item 목록 (페이지 단위 조회용)"""
+    return [
+        {'id': r[0], 'key': r[0], 'text': _clean_text(r[1]), 'rating': _clean_rating(r[2]), 'row': tuple(r)}
+        for r in rows
+    ]
+
+
+def jsonl_source(path, id_field='review_id', text_field='review_text', rating_field='rating'):
+    """
+    JSONL → item 목록 (dead-letter 재처리 등)
+
+    레코드에 payload가 있으면 그 안의 필드도 함께 확인
+    """
+    items = []
+    for rec in read_journal(path):
+        fields = dict(rec.get('payload') or {}, **rec)
+        rid = fields.get(id_field, fields.get('item_id'))
+        if rid is None:
+            continue
+        items.append({
+            'id': rid, 'key': rid, 'text': _clean_text(fields.get(text_field)),
+            'rating': _clean_rating(fields.get(rating_field)), 'row': rec,
+        })
+    return items
+
+
+# ===== 싱크 =====
+class Sink:
+    """결과 저장소 기본 클래스 (write는 DB writer 스레드에서만 호출됨)"""
+
+    def completed_ids(self):
+        """이미 저장된 리뷰 ID (재개 시 건너뜀)"""
+        return set()
+
+    def write(self, records):
+        """records: [(item, outcome), ...]"""
+        raise NotImplementedError
+
+    def write_failures(self, failures):
+        """failures: [(item, LLMCallError), ...] - dead-letter로 간 건 (기본: 무시)"""
+        pass
+
+    def close(self):
+        pass
+
+
+class DataFrameSink(Sink):
+    """분석 결과로 DataFrame 컬럼 덮어쓰기 (item['key'] = 인덱스, 종료 시 컬럼 단위로 한 번에 반영)"""
+
+    def __init__(self, df, fields):
+        self.df = df
+        self.fields = list(fields)
+        self.results = {}
+
+    def write(self, records):
+        for item, outcome in records:
+            self.results[item['key']] = outcome['result']
+
+    def close(self):
+        if not self.results:
+            return
+        updates = pd.DataFrame.from_dict(self.results, orient='index')
+        for field in self.fields:
+            if field not in updates:
+                continue
+            # 결과에 없는 필드(NaN)는 기존 값 유지
+            values = updates[field].dropna()
+            self.df.loc[values.index, field] = values
+
+
+class JsonlSink(Sink):
+    """
+    JSONL 체크포인트 저널 (1건 = 1줄, 재개 지원)
+
+    Args:
+        record_fn: (item, outcome) → 저장할 dict
+        key: 완료 여부 판단 필드
+    """
+
+    def __init__(self, path, record_fn, key='review_id', fsync_policy='always'):
+        self.path = path
+        self.record_fn = record_fn
+        self.key = key
+        self._journal = CheckpointJournal(path, fsync_policy=fsync_policy).open()
+
+    def completed_ids(self):
+        return load_completed_ids(self.path, key=self.key)
+
+    def write(self, records):
+        for item, outcome in records:
+            self._journal.append(self.record_fn(item, outcome))
+
+    def close(self):
+        self._journal.close()
+
+
+class JsonSink(Sink):
+    """
+    결과 목록을 모아 종료 시 JSON 1개로 저장
+
+    Args:
+        record_fn: (item, outcome) → 저장할 dict
+        wrap: 결과 목록 → 저장할 객체 (None이면 목록 그대로)
+    """
+
+    def __init__(self, path, record_fn, wrap=None):
+        self.path = Path(path)
+        self.record_fn = record_fn
+        self.wrap = wrap
+        self.records = []
+
+    def write(self, records):
+        self.records.extend(self.record_fn(item, outcome) for item, outcome in records)
+
+    def close(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = self.wrap(self.records) if self.wrap else self.records
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+
+
+class DbSink(Sink):
+    """
+    DB 테이블 적재 (여러 배치를 트랜잭션 1개로 묶어 commit_every건 또는 commit_interval초마다 커밋)
+
+    - 배치는 세이브포인트 안에서 적재 → 실패하면 그 배치만 되돌리고 1건씩 다시 적재해 문제 리뷰만 실패 처리
+    - 커밋된 건만 after_commit 싱크(작업 큐 완료 처리 등)에 전달
+      → 커밋 전에 죽으면 큐에 완료로 남는 건이 없으므로 다음 실행이 정확히 이어서 처리
+    - close 시 남은 건 커밋 (중단되어도 이미 받은 결과는 보존)
+
+    Args:
+        engine: SQLAlchemy 엔진
+        insert_fn: insert_fn(conn, item, outcome) - 1건 적재
+        insert_batch_fn: insert_batch_fn(conn, records) - 배치 전체 적재 (지정 시 insert_fn 대신 사용)
+        commit_every: 커밋 단위 리뷰 수 (트랜잭션 크기 상한)
+        commit_interval: 커밋 최대 간격(초)
+        caches: 롤백 시 reset()할 캐시 목록 (IdAllocator, TagBitmap - 롤백된 시퀀스 블록/태그 비트를 버려야 함)
+    """
+
+    def __init__(self, engine, insert_fn=None, insert_batch_fn=None, commit_every=500, commit_interval=30.0,
+                 caches=()):
+        if insert_fn is None and insert_batch_fn is None:
+            raise ValueError("insert_fn 또는 insert_batch_fn이 필요합니다.")
+        self.engine = engine
+        self.insert_fn = insert_fn
+        self.insert_batch_fn = insert_batch_fn
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.caches = list(caches)
+        self.after_commit = []   # 커밋 후 결과를 넘길 싱크
+        self.count = 0           # 커밋된 건수
+        self.failed = 0          # DB 적재 실패 건수 (세이브포인트로 격리된 리뷰)
+        self.commits = 0
+        self._conn = None
+        self._tx = None
+        self._opened_at = None
+        self._pending = []
+        self._pending_failures = []
+
+    def _insert(self, records):
+        if self.insert_batch_fn is not None:
+            self.insert_batch_fn(self._conn, records)
+        else:
+            for item, outcome in records:
+                self.insert_fn(self._conn, item, outcome)
+
+    def _reset_caches(self):
+        for cache in self.caches:
+            cache.reset()
+
+    def _try_insert(self, records):
+        """세이브포인트 안에서 적재 → 실패하면 그 부분만 되돌리고 예외 반환 (되돌리지도 못하면 그대로 전파)"""
+        savepoint = self._conn.begin_nested()
+        try:
+            self._insert(records)
+        except Exception as e:
+            savepoint.rollback()
+            self._reset_caches()
+            return e
+        savepoint.commit()
+        return None
+
+    def write(self, records):
+        if not records:
+            return
+        if self._tx is None:
+            self._conn = self.engine.connect()
+            self._tx = self._conn.begin()
+            self._opened_at = time.monotonic()
+
+        if self._try_insert(records) is None:
+            self._pending.extend(records)
+        else:
+            for record in records:
+                error = self._try_insert([record])
+                if error is None:
+                    self._pending.append(record)
+                else:
+                    self._pending_failures.append((record[0], error))
+                    self.failed += 1
+
+        if (len(self._pending) >= self.commit_every
+                or time.monotonic() - self._opened_at >= self.commit_interval):
+            self.commit()
+
+    def write_failures(self, failures):
+        # 분석 실패 건도 커밋 시점에 함께 전달 (완료/실패 처리 순서 유지)
+        if self.after_commit:
+            self._pending_failures.extend(failures)
+
+    def commit(self):
+        """열린 트랜잭션 커밋 → 커밋된 건을 after_commit 싱크에 전달"""
+        if self._tx is not None:
+            self._tx.commit()
+            self._conn.close()
+            self._conn = self._tx = None
+            self.commits += 1
+        records, failures = self._pending, self._pending_failures
+        self._pending, self._pending_failures = [], []
+        self.count += len(records)
+        for sink in self.after_commit:
+            if records:
+                sink.write(records)
+            if failures:
+                sink.write_failures(failures)
+
+    def rollback(self):
+        """열린 트랜잭션 롤백 (커밋되지 않은 건은 완료 처리되지 않으므로 다음 리스에서 다시 처리)"""
+        if self._tx is not None:
+            try:
+                self._tx.rollback()
+                self._conn.close()
+            finally:
+                self._conn = self._tx = None
+                self._reset_caches()
+        self._pending, self._pending_failures = [], []
+
+    def close(self):
+        try:
+            self.commit()
+        except Exception:
+            self.rollback()
+            raise
+
+
+# ===== 캐시 =====
+class ResponseCache:
+    """
+    프롬프트 → 파싱된 응답 캐시 (JSONL, 실행 간 유지)
+
+    같은 모델/파라미터/메시지의 요청은 다시 과금하지 않음 (재실행, 분석기 간 공유)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {rec['key']: rec['result'] for rec in read_journal(path) if 'key' in rec}
+        self._journal = CheckpointJournal(path, fsync_policy='interval').open()
+
+    @staticmethod
+    def make_key(prompt, messages):
+        raw = json.dumps([prompt.model, prompt.temperature, prompt.max_tokens, messages], ensure_ascii=False)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key, result):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = result
+            self._journal.append({'key': key, 'result': result})
+
+    def __len__(self):
+        return len(self._entries)
+
+    def close(self):
+        self._journal.close()
+
+
+# ===== 지표 =====
+class EngineMetrics:
+    """호출 수, 캐시 적중, 토큰, 비용, 지연 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = []          # 과금된 API 호출 1건 = 1개 (재시도 포함)
+        self.cache_hits = 0
+        self.errors = 0
+        self.propagated = 0
+        self.field_repairs = 0   # 실패 필드만 재요청한 횟수
+        self.dropped = Counter()  # 허용값이 아니라 버린 값 (필드별, 별칭 보완용)
+        self.started_at = time.monotonic()
+
+    def record_call(self, item_id, tokens_in, tokens_out, latency):
+        with self._lock:
+            self.calls.append({
+                'review_id': item_id,
+                'input_tokens': tokens_in,
+                'output_tokens': tokens_out,
+                'total_tokens': tokens_in + tokens_out,
+                'latency_sec': round(latency, 3),
+                'timestamp': datetime.now().isoformat(),
+            })
+
+    def record_cache_hit(self):
+        with self._lock:
+            self.cache_hits += 1
+
+    def record_field_repair(self):
+        with self._lock:
+            self.field_repairs += 1
+
+    def record_dropped(self, dropped):
+        """dropped: response_parser.validate가 버린 값 {필드: [값]}"""
+        if not dropped:
+            return
+        with self._lock:
+            for name, values in dropped.items():
+                self.dropped[name] += len(values)
+
+    def summary(self):
+        with self._lock:
+            tokens_in = sum(c['input_tokens'] for c in self.calls)
+            tokens_out = sum(c['output_tokens'] for c in self.calls)
+            latencies = [c['latency_sec'] for c in self.calls]
+            elapsed = time.monotonic() - self.started_at
+            return {
+                'api_calls': len(self.calls),
+                'cache_hits': self.cache_hits,
+                'propagated': self.propagated,
+                'field_repairs': self.field_repairs,
+                'dropped_values': dict(self.dropped),
+                'errors': self.errors,
+                'tokens_in': tokens_in,
+                'tokens_out': tokens_out,
+                'total_tokens': tokens_in + tokens_out,
+                'cost_usd': round(estimate_cost(tokens_in, tokens_out), 4),
+                'avg_latency_sec': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+                'elapsed_sec': round(elapsed, 1),
+            }
+
+
+def print_metrics(summary, label="LLM 분석"):
+    print(f"\n  [{label}] API 호출 {summary['api_calls']:,}건 | 캐시 {summary['cache_hits']:,}건 | "
+          f"전파 {summary['propagated']:,}건 | 필드 재요청 {summary['field_repairs']:,}건 | 에러 {summary['errors']:,}건")
+    print(f"    - 토큰: 입력 {summary['tokens_in']:,} / 출력 {summary['tokens_out']:,} → ${summary['cost_usd']:.4f}")
+    print(f"    - 평균 지연 {summary['avg_latency_sec']:.2f}초, 총 {summary['elapsed_sec'] / 60:.1f}분")
+    if summary['dropped_values']:
+        print(f"    - 허용값이 아니라 버린 값: {summary['dropped_values']}")
+    if 'telemetry' in summary:
+        print_telemetry(summary['telemetry'])
+
+
+def _new_trace():
+    """리뷰 1건의 호출 추적 (src.telemetry 기록용)"""
+    return {
+        'started_at': time.monotonic(), 'finished_at': None, 'queue_wait': 0.0, 'latency': 0.0,
+        'api_calls': 0, 'retry_classes': [], 'error_class': None,
+        'tokens_in': 0, 'tokens_out': 0, 'cache_hit': False, 'attempts': [],
+    }
+
+
+# ===== 엔진 =====
+class LLMAnalyzer:
+    """
+    통합 분석 엔진
+
+    사용 예:
+        analyzer = LLMAnalyzer(client, PromptSpec(ANALYSIS_PROMPT), dead_letter_path='output/dlq.jsonl')
+        analyzer.run(dataframe_source(df), [JsonlSink(...), DbSink(engine, insert_fn)])
+
+    Args:
+        client: OpenAI 클라이언트 (max_retries=0 권장 - 재시도는 엔진에서 처리)
+        prompt: PromptSpec
+        policy: RetryPolicy (None이면 기본값)
+        breaker: CircuitBreaker (None이면 사용 안 함)
+        cache: ResponseCache (None이면 사용 안 함)
+        workers: 동시 API 호출 수
+        rate_per_sec: 초당 최대 요청 수 (None이면 제한 없음)
+                      - 재시도/필드 재요청도 포함, 캐시 적중은 제외
+        batch_size: 싱크 적재 단위
+        dead_letter_path: 최종 실패 건 기록 파일 (None이면 기록 안 함)
+        dedup_threshold: 근사 중복 유사도 기준 (None이면 비활성화)
+        dedup_audit_path: 전파 감사 파일 (이어 쓰기, 텔레메트리 run_id로 실행 구분 - 스크립트마다 다른 경로)
+        telemetry_path: 호출 텔레메트리 JSONL (None이면 메모리에서만 요약)
+    """
+
+    def __init__(self, client, prompt, policy=None, breaker=None, cache=None, workers=4, rate_per_sec=None,
+                 batch_size=50, dead_letter_path=None, dedup_threshold=None, dedup_audit_path=None,
+                 telemetry_path=None):
+        self.client = client
+        self.prompt = prompt
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker
+        self.cache = cache
+        self.workers = workers
+        self.rate_per_sec = rate_per_sec
+        self.batch_size = batch_size
+        self.dead_letter_path = dead_letter_path
+        self.dedup_threshold = dedup_threshold
+        self.dedup_audit_path = dedup_audit_path
+        self.metrics = EngineMetrics()
+        self.telemetry = CallTelemetry(telemetry_path)
+        self._limiter = RateLimiter(rate_per_sec) if rate_per_sec else None
+
+    def summary(self):
+        """지표 요약 + 텔레메트리 요약"""
+        summary = self.metrics.summary()
+        summary['telemetry'] = self.telemetry.summary()
+        return summary
+
+    def _complete(self, item, messages, max_tokens, trace, call='full'):
+        """
+        chat.completions 1회 호출 → (본문, 입력 토큰, 출력 토큰, max_tokens로 잘렸는지)
+
+        호출 1회마다 trace['attempts']에 시도 기록 추가 (텔레메트리의 호출 단위 행)
+
+        Args:
+            call: 'full' (전체 프롬프트) / 'field' (실패 필드 재요청)
+        """
+        wait = 0.0
+        if self._limiter is not None:
+            wait_start = time.monotonic()
+            self._limiter.acquire()
+            wait = time.monotonic() - wait_start
+            trace['queue_wait'] += wait
+
+        attempt = {'attempt': len(trace['attempts']) + 1, 'call': call, 'queue_wait': wait, 'latency': 0.0,
+                   'error_class': None, 'tokens_in': 0, 'tokens_out': 0, 'timestamp': datetime.now().isoformat()}
+        trace['attempts'].append(attempt)
+        start = time.monotonic()
+        try:
+            response = self.client.chat.completions.create(
+                model=self.prompt.model,
+                messages=messages,
+                temperature=self.prompt.temperature,
+                max_tokens=max_tokens,
+            )
+        except Exception as e:
+            attempt['error_class'] = classify_error(e)
+            raise
+        finally:
+            latency = time.monotonic() - start
+            attempt['latency'] = latency
+            trace['latency'] += latency
+            trace['api_calls'] += 1
+        usage = response.usage
+        # 파싱 실패로 재시도되더라도 과금된 호출은 모두 기록
+        self.metrics.record_call(item['id'], usage.prompt_tokens, usage.completion_tokens, latency)
+        attempt['tokens_in'] = usage.prompt_tokens
+        attempt['tokens_out'] = usage.completion_tokens
+        trace['tokens_in'] += usage.prompt_tokens
+        trace['tokens_out'] += usage.completion_tokens
+        choice = response.choices[0]
+        truncated = getattr(choice, 'finish_reason', None) == 'length'
+        return choice.message.content, usage.prompt_tokens, usage.completion_tokens, truncated
+
+    def _request(self, item, messages, trace):
+        """API 호출 + 파싱/검증 (파싱 실패도 재시도 대상이 되도록 함께 수행)"""
+        content, tokens_in, tokens_out, truncated = self._complete(item, messages, self.prompt.max_tokens, trace)
+        try:
+            result, failed, dropped = parse_response(content, self.prompt.schema, truncated=truncated)
+            self.metrics.record_dropped(dropped)
+            if failed:
+                result, extra_in, extra_out = self._request_fields(item, result, failed, trace)
+                tokens_in += extra_in
+                tokens_out += extra_out
+        except ResponseParseError:
+            # 응답은 받았지만 파싱/검증 실패 → 마지막 호출의 에러로 기록
+            trace['attempts'][-1]['error_class'] = ERROR_PARSE
+            raise
+        return result, tokens_in, tokens_out
+
+    def _request_fields(self, item, partial, failed, trace):
+        """
+        검증 실패 필드만 짧은 프롬프트로 재요청 (전체 재호출 대신)
+
+        Raises:
+            ResponseParseError: 재요청 후에도 실패 → 재시도 정책에 따라 전체 재호출
+        """
+        schema = {name: self.prompt.schema[name] for name in failed}
+        prompt = build_field_prompt(self.prompt.review_text(item), list(failed), self.prompt.schema)
+        content, tokens_in, tokens_out, truncated = self._complete(
+            item, self.prompt.build_messages(item, content=prompt), FIELD_RETRY_MAX_TOKENS, trace, call='field'
+        )
+        fixed, still_failed, dropped = parse_response(content, schema, truncated=truncated)
+        self.metrics.record_dropped(dropped)
+        if still_failed:
+            raise ResponseParseError(f"필드 검증 실패: {still_failed}", content=content,
+                                     failed=still_failed, partial=partial)
+        self.metrics.record_field_repair()
+        partial.update({name: fixed[name] for name in schema})
+        return partial, tokens_in, tokens_out
+
+    def analyze(self, item):
+        """
+        item 1건 분석
+
+        Returns:
+            dict: outcome (실패 시 result=None, error=LLMCallError, trace=호출 추적)
+
+        Raises:
+            CircuitOpenError: 연속 실패로 서킷 브레이커가 열림
+        """
+        trace = _new_trace()
+        messages = self.prompt.build_messages(item)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ResponseCache.make_key(self.prompt, messages)
+            cached = self.cache.get(cache_key)
+            if cached is not None and self.prompt.schema is not None:
+                # 스키마 도입 이전에 저장된 응답도 같은 기준으로 검증 (실패하면 다시 호출)
+                cached, failed, _ = validate(cached, self.prompt.schema)
+                cached = None if failed else cached
+            if cached is not None:
+                self.metrics.record_cache_hit()
+                trace['cache_hit'] = True
+                trace['finished_at'] = time.monotonic()
+                return {'result': cached, 'tokens_in': 0, 'tokens_out': 0, 'cached': True,
+                        'propagated_from': None, 'error': None, 'trace': trace}
+
+        try:
+            result, tokens_in, tokens_out = call_with_retry(
+                lambda: self._request(item, messages, trace), policy=self.policy, breaker=self.breaker,
+                on_retry=lambda category, attempt, delay: trace['retry_classes'].append(category)
+            )
+        except LLMCallError as e:
+            trace['error_class'] = e.category
+            trace['finished_at'] = time.monotonic()
+            return {'result': None, 'tokens_in': 0, 'tokens_out': 0, 'cached': False,
+                    'propagated_from': None, 'error': e, 'trace': trace}
+
+        trace['finished_at'] = time.monotonic()
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return {'result': result, 'tokens_in': tokens_in, 'tokens_out': tokens_out, 'cached': False,
+                'propagated_from': None, 'error': None, 'trace': trace}
+
+    def _cluster(self, items):
+        """근사 중복 클러스터링 → (대표 위치 목록, 대표 → 멤버 위치, 위치별 추정 유사도)"""
+        if self.dedup_threshold is None or not items:
+            return list(range(len(items))), {}, None
+
+        groups = [item['rating'] for item in items] if self.prompt.uses_rating else None
+        rep_index, similarity = cluster_near_duplicates(
+            [item['text'] for item in items], threshold=self.dedup_threshold, groups=groups
+        )
+        print_cluster_summary(rep_index)
+        reps = [pos for pos in range(len(items)) if rep_index[pos] == pos]
+        return reps, cluster_members(rep_index), similarity
+
+    def run(self, items, sinks, desc="LLM 분석"):
+        """
+        items 분석 후 모든 싱크에 저장
+
+        - 싱크에 이미 저장된 ID는 건너뜀 (재개)
+        - 실패 건은 싱크에 저장하지 않고 dead-letter로 기록 → 다음 실행에서 재처리
+        - 서킷 브레이커가 열리면 새 호출을 멈추고 진행 중이던 결과까지 저장
+
+        Returns:
+            dict: 지표 요약 (+ telemetry, stopped: 서킷 브레이커로 중단됐는지)
+        """
+        completed = set()
+        for sink in sinks:
+            completed |= sink.completed_ids()
+        items = [item for item in items if item['id'] not in completed]
+        if completed:
+            print(f"  기존 결과 {len(completed):,}건 건너뜀")
+
+        reps, members, similarity = self._cluster(items)
+        pbar = tqdm(total=len(reps), desc=desc)
+        dead_letter = DeadLetterWriter(self.dead_letter_path) if self.dead_letter_path else None
+        self.telemetry.start()
+
+        def write_batch(batch):
+            records = []
+            failures = []
+            propagations = []
+            for pos, outcome in batch:
+                item = items[pos]
+                self.telemetry.record(item['id'], outcome['trace'], len(batch))
+                if outcome['result'] is None:
+                    self.metrics.errors += 1
+                    if dead_letter is not None:
+                        dead_letter.write(item['id'], outcome['error'], payload={
+                            'review_text': item['text'][:500], 'rating': item['rating']
+                        })
+                    failures.append((item, outcome['error']))
+                    continue
+                records.append((item, outcome))
+                # 클러스터 멤버에 결과 전파 (토큰 0)
+                for member_pos in members.get(pos, []):
+                    records.append((items[member_pos], dict(
+                        outcome, tokens_in=0, tokens_out=0, propagated_from=item['id']
+                    )))
+                    propagations.append((items[member_pos]['id'], items[member_pos]['text'], item['id'], item['text'],
+                                         similarity[member_pos]))
+                    self.metrics.propagated += 1
+                self.telemetry.record_propagated(len(members.get(pos, [])))
+            # 감사 파일에는 결과가 실제로 전파된 멤버만 (대표가 실패한 멤버는 전파되지 않음)
+            if self.dedup_audit_path:
+                write_propagation_audit(self.dedup_audit_path, self.telemetry.run_id, propagations)
+            for sink in sinks:
+                sink.write(records)
+                if failures:
+                    sink.write_failures(failures)
+            pbar.update(len(batch))
+            pbar.set_postfix(self.telemetry.live(), refresh=False)
+
+        stopped = False
+        try:
+            if dead_letter is not None:
+                dead_letter.__enter__()
+            stats = run_pipeline(
+                reps, lambda pos: self.analyze(items[pos]), write_batch,
+                workers=self.workers, batch_size=self.batch_size  # rate limit은 API 호출 시점에 적용
+            )
+            if isinstance(stats['stop_error'], CircuitOpenError):
+                tqdm.write(f"\n서킷 브레이커 열림 - 남은 {len(reps) - stats['processed']:,}건 건너뜀: "
+                           f"{stats['stop_error']}")
+                stopped = True
+            elif stats['stop_error'] is not None:
+                raise stats['stop_error']
+        finally:
+            pbar.close()
+            if dead_letter is not None:
+                dead_letter.__exit__(None, None, None)
+            self.telemetry.close()
+            for sink in sinks:
+                sink.close()
+
+        summary = self.summary()
+        summary['stopped'] = stopped
+        return summary
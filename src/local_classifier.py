@@ -0,0 +1,503 @@
+"""
+로컬 경량 분류기 (NumPy 전용)
+
+기존 GPT 라벨로 학습하여 감성 + 4개 태그 계열(benefit/texture/usage/value)을 예측
+확신도가 낮은 리뷰만 API로 보내 호출량 절감
+
+- 특징: 음절 1~3-gram 해싱 (2^18 차원, 이진 특징, 전부 NumPy 벡터 연산)
+- 모델: 다항 나이브 베이즈 (감성 3클래스) + 태그별 이진 나이브 베이즈
+- 보정: 감성은 temperature scaling, 태그는 Platt scaling (보정용 분할에서 학습)
+- 10만 건 학습/추론이 CPU에서 수 초
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+SENTIMENT_CLASSES = ['POS', 'NEU', 'NEG']
+TAG_FAMILIES = ['benefit_tags', 'texture_tags', 'usage_tags', 'value_tags']
+
+# ===== 기본 설정 =====
+DEFAULT_N_FEATURES = 2 ** 18
+DEFAULT_NGRAM_RANGE = (1, 3)
+DEFAULT_ALPHA = 0.5            # 라플라스 스무딩
+DEFAULT_MIN_TAG_COUNT = 20     # 이 횟수 미만 등장한 태그는 예측 대상에서 제외
+DEFAULT_CONFIDENCE = 0.8       # 이 확신도 미만이면 API로 라우팅
+
+_HASH_MULT = np.uint64(0x9E3779B97F4A7C15)
+_NGRAM_BASE = np.uint64(0x100000001B3)
+
+
+# ===== 특징 추출 =====
+def hash_features(texts, n_features=DEFAULT_N_FEATURES, ngram_range=DEFAULT_NGRAM_RANGE):
+    """
+    텍스트 목록 → 희소 이진 특징 (문서 번호, 특징 번호) 배열
+
+    전체 텍스트를 구분자(\\x00)로 이어붙인 코드포인트 배열에서
+    n-gram 윈도우 해시를 한 번에 계산 (파이썬 루프 없음)
+
+    Returns:
+        tuple: (rows, cols) - 같은 (문서, 특징) 쌍은 한 번만 포함
+    """
+    texts = [' '.join(str(t).split()) if t is not None else '' for t in texts]
+    n = len(texts)
+    if n == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    joined = '\x00'.join(texts) + '\x00'
+    codes = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    lengths = np.array([len(t) + 1 for t in texts])
+    doc_of = np.repeat(np.arange(n), lengths)
+
+    rows_all = []
+    cols_all = []
+    for k in range(ngram_range[0], ngram_range[1] + 1):
+        m = len(codes) - k + 1
+        if m <= 0:
+            continue
+        h = np.full(m, np.uint64(k))
+        valid = np.ones(m, dtype=bool)
+        for j in range(k):
+            window = codes[j:j + m]
+            h = h * _NGRAM_BASE + window
+            valid &= window != 0
+        h = (h * _HASH_MULT) >> np.uint64(64 - 32)
+        rows_all.append(doc_of[:m][valid])
+        cols_all.append((h[valid] % np.uint64(n_features)).astype(np.int64))
+
+    rows = np.concatenate(rows_all)
+    cols = np.concatenate(cols_all)
+    keys = np.unique(rows.astype(np.int64) * n_features + cols)
+    return keys // n_features, keys % n_features
+
+
+def _class_log_probs(rows, cols, mask_docs, n_features, alpha):
+    """주어진 문서 집합의 특징 로그 확률 벡터 (다항 NB)"""
+    counts = np.bincount(cols[mask_docs[rows]], minlength=n_features).astype(np.float64)
+    return np.log(counts + alpha) - np.log(counts.sum() + alpha * n_features)
+
+
+def _score(rows, cols, n_docs, log_probs):
+    """문서별 sum(log p(f|c)) 계산"""
+    return np.bincount(rows, weights=log_probs[cols], minlength=n_docs)
+
+
+def _softmax(z):
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def _sigmoid(z):
+    return 1 / (1 + np.exp(-np.clip(z, -50, 50)))
+
+
+def _fit_temperature(logits, y):
+    """temperature scaling: NLL 최소가 되는 T (그리드 탐색)"""
+    best_t, best_nll = 1.0, np.inf
+    for t in np.exp(np.linspace(np.log(0.05), np.log(50), 80)):
+        p = _softmax(logits / t)
+        nll = -np.log(p[np.arange(len(y)), y] + 1e-12).mean()
+        if nll < best_nll:
+            best_t, best_nll = t, nll
+    return best_t
+
+
+def _fit_platt(z, y, iterations=50):
+    """Platt scaling: p = sigmoid(a*z + b), 뉴턴법"""
+    a, b = 1.0, 0.0
+    if y.min() == y.max():
+        return 0.0, float(np.log((y.mean() + 1e-3) / (1 - y.mean() + 1e-3)))
+    z = z / (np.abs(z).max() + 1e-12)
+    for _ in range(iterations):
+        p = _sigmoid(a * z + b)
+        w = p * (1 - p) + 1e-9
+        g = np.array([((p - y) * z).sum(), (p - y).sum()])
+        h = np.array([[(w * z * z).sum(), (w * z).sum()], [(w * z).sum(), w.sum()]])
+        h += np.eye(2) * 1e-6
+        step = np.linalg.solve(h, g)
+        a, b = a - step[0], b - step[1]
+        if np.abs(step).max() < 1e-6:
+            break
+    return a, b
+
+
+class LocalReviewClassifier:
+    """
+    해싱 n-gram + 나이브 베이즈 리뷰 분류기
+
+    사용 예:
+        model = LocalReviewClassifier().fit(texts, labels_df)
+        pred = model.predict(texts)
+    """
+
+    def __init__(self, n_features=DEFAULT_N_FEATURES, ngram_range=DEFAULT_NGRAM_RANGE,
+                 alpha=DEFAULT_ALPHA, min_tag_count=DEFAULT_MIN_TAG_COUNT):
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.alpha = alpha
+        self.min_tag_count = min_tag_count
+
+        self.sentiment_classes = []
+        self.sentiment_log_prior = None
+        self.sentiment_log_probs = None
+        self.temperature = 1.0
+
+        self.tags = []                 # [(family, value), ...]
+        self.tag_log_odds_prior = None
+        self.tag_log_ratio = None      # (n_tags, n_features)
+        self.tag_platt = None          # (n_tags, 3) - a, b, z 정규화 스케일
+
+    # ----- 학습 -----
+    def fit(self, texts, labels, calibration_size=0.2, seed=42):
+        """
+        Args:
+            texts: 리뷰 텍스트 목록
+            labels: DataFrame (sentiment + TAG_FAMILIES 리스트 컬럼)
+            calibration_size: 확률 보정용으로 떼어둘 비율
+        """
+        labels = labels.reset_index(drop=True)
+        n = len(labels)
+        rng = np.random.RandomState(seed)
+        is_calib = rng.rand(n) < calibration_size
+        if is_calib.all() or not is_calib.any():
+            is_calib[:] = False
+
+        rows, cols = hash_features(texts, self.n_features, self.ngram_range)
+        train_docs = ~is_calib
+
+        # 감성 (다항 NB)
+        y = labels['sentiment'].map({c: i for i, c in enumerate(SENTIMENT_CLASSES)})
+        known = y.notna().to_numpy()
+        y = y.fillna(-1).astype(int).to_numpy()
+        self.sentiment_classes = list(SENTIMENT_CLASSES)
+        priors = []
+        log_probs = []
+        for ci in range(len(SENTIMENT_CLASSES)):
+            docs = train_docs & known & (y == ci)
+            priors.append(docs.sum() + 1)
+            log_probs.append(_class_log_probs(rows, cols, docs, self.n_features, self.alpha))
+        priors = np.array(priors, dtype=np.float64)
+        self.sentiment_log_prior = np.log(priors / priors.sum())
+        self.sentiment_log_probs = np.vstack(log_probs)
+
+        # 태그 (태그별 이진 NB: 포함 문서 vs 미포함 문서)
+        tag_counts = {}
+        for family in TAG_FAMILIES:
+            for values in labels[family]:
+                for v in set(_as_list(values)):
+                    tag_counts[(family, v)] = tag_counts.get((family, v), 0) + 1
+        self.tags = sorted(k for k, c in tag_counts.items() if c >= self.min_tag_count)
+
+        presence = self._tag_presence(labels)
+        ratios = []
+        prior_odds = []
+        for ti in range(len(self.tags)):
+            pos = train_docs & presence[:, ti]
+            neg = train_docs & ~presence[:, ti]
+            lp_pos = _class_log_probs(rows, cols, pos, self.n_features, self.alpha)
+            lp_neg = _class_log_probs(rows, cols, neg, self.n_features, self.alpha)
+            ratios.append((lp_pos - lp_neg).astype(np.float32))
+            prior_odds.append(np.log((pos.sum() + 1) / (neg.sum() + 1)))
+        self.tag_log_ratio = np.vstack(ratios) if ratios else np.zeros((0, self.n_features), dtype=np.float32)
+        self.tag_log_odds_prior = np.array(prior_odds)
+
+        # 확률 보정
+        self.temperature = 1.0
+        self.tag_platt = np.tile([1.0, 0.0, 1.0], (len(self.tags), 1))
+        if is_calib.any():
+            sent_logits, tag_logits = self._raw_scores(rows, cols, n)
+            mask = is_calib & known
+            if mask.any():
+                self.temperature = _fit_temperature(sent_logits[mask], y[mask])
+            for ti in range(len(self.tags)):
+                z = tag_logits[is_calib, ti]
+                scale = np.abs(z).max() + 1e-12
+                a, b = _fit_platt(z, presence[is_calib, ti].astype(float))
+                self.tag_platt[ti] = [a, b, scale]
+
+        return self
+
+    def _tag_presence(self, labels):
+        presence = np.zeros((len(labels), len(self.tags)), dtype=bool)
+        index = {t: i for i, t in enumerate(self.tags)}
+        for family in TAG_FAMILIES:
+            for row, values in enumerate(labels[family]):
+                for v in _as_list(values):
+                    ti = index.get((family, v))
+                    if ti is not None:
+                        presence[row, ti] = True
+        return presence
+
+    def _raw_scores(self, rows, cols, n_docs):
+        sent = np.column_stack([
+            _score(rows, cols, n_docs, self.sentiment_log_probs[ci]) + self.sentiment_log_prior[ci]
+            for ci in range(len(self.sentiment_classes))
+        ])
+        if len(self.tags):
+            tag = np.column_stack([
+                _score(rows, cols, n_docs, self.tag_log_ratio[ti]) + self.tag_log_odds_prior[ti]
+                for ti in range(len(self.tags))
+            ])
+        else:
+            tag = np.zeros((n_docs, 0))
+        return sent, tag
+
+    # ----- 추론 -----
+    def predict_proba(self, texts):
+        """
+        Returns:
+            tuple: (감성 확률 (n, 3), 태그 확률 (n, n_tags))
+        """
+        n = len(texts)
+        rows, cols = hash_features(texts, self.n_features, self.ngram_range)
+        sent_logits, tag_logits = self._raw_scores(rows, cols, n)
+        sent_proba = _softmax(sent_logits / self.temperature)
+        if len(self.tags):
+            a, b, scale = self.tag_platt[:, 0], self.tag_platt[:, 1], self.tag_platt[:, 2]
+            tag_proba = _sigmoid(a * (tag_logits / scale) + b)
+        else:
+            tag_proba = np.zeros((n, 0))
+        return sent_proba, tag_proba
+
+    def predict(self, texts, index=None):
+        """
+        Returns:
+            DataFrame: sentiment, sentiment_confidence, TAG_FAMILIES(리스트), tag_confidence, confidence
+                confidence = min(감성 확신도, 태그별 max(p, 1-p)의 최솟값)
+        """
+        sent_proba, tag_proba = self.predict_proba(texts)
+        sent_idx = sent_proba.argmax(axis=1)
+        sent_conf = sent_proba.max(axis=1)
+        tag_on = tag_proba >= 0.5
+        tag_conf = np.maximum(tag_proba, 1 - tag_proba).min(axis=1) if len(self.tags) else np.ones(len(texts))
+
+        pred = pd.DataFrame({
+            'sentiment': np.array(self.sentiment_classes)[sent_idx],
+            'sentiment_confidence': sent_conf,
+        }, index=index)
+        for family in TAG_FAMILIES:
+            cols = [ti for ti, (f, _) in enumerate(self.tags) if f == family]
+            values = [self.tags[ti][1] for ti in cols]
+            pred[family] = [[values[j] for j in np.flatnonzero(row)] for row in tag_on[:, cols]] if cols else [[] for _ in range(len(texts))]
+        pred['tag_confidence'] = tag_conf
+        pred['confidence'] = np.minimum(sent_conf, tag_conf)
+        return pred
+
+    # ----- 저장/로드 -----
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            'n_features': self.n_features,
+            'ngram_range': list(self.ngram_range),
+            'alpha': self.alpha,
+            'min_tag_count': self.min_tag_count,
+            'sentiment_classes': self.sentiment_classes,
+            'temperature': self.temperature,
+            'tags': [list(t) for t in self.tags],
+        }
+        np.savez_compressed(
+            path,
+            meta=np.array(json.dumps(meta, ensure_ascii=False)),
+            sentiment_log_prior=self.sentiment_log_prior,
+            sentiment_log_probs=self.sentiment_log_probs,
+            tag_log_odds_prior=self.tag_log_odds_prior,
+            tag_log_ratio=self.tag_log_ratio,
+            tag_platt=self.tag_platt,
+        )
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path, allow_pickle=False)
+        meta = json.loads(str(data['meta']))
+        model = cls(meta['n_features'], meta['ngram_range'], meta['alpha'], meta['min_tag_count'])
+        model.sentiment_classes = meta['sentiment_classes']
+        model.temperature = meta['temperature']
+        model.tags = [tuple(t) for t in meta['tags']]
+        model.sentiment_log_prior = data['sentiment_log_prior']
+        model.sentiment_log_probs = data['sentiment_log_probs']
+        model.tag_log_odds_prior = data['tag_log_odds_prior']
+        model.tag_log_ratio = data['tag_log_ratio']
+        model.tag_platt = data['tag_platt']
+        return model
+
+
+def _as_list(values):
+    if isinstance(values, (list, tuple, np.ndarray)):
+        return [v for v in values if isinstance(v, str) and v]
+    return []
+
+
+# ===== 라벨 로드 =====
+def load_labels_from_json(labels_path, reviews_df, text_col='REVIEW_CONTENT'):
+    """
+    GPT 결과 JSON(gpt_analysis_roundlab.json, gpt_analysis_categorized.json 등) + 리뷰 원본 결합
+
+    Args:
+        labels_path: GPT 결과 JSON 경로 (리스트 또는 {'results': [...]})
+        reviews_df: idx(행 위치)로 대응되는 리뷰 원본 DataFrame
+
+    Returns:
+        DataFrame: text, sentiment, TAG_FAMILIES
+    """
+    with open(labels_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('results', [])
+
+    records = []
+    for item in data:
+        idx = item.get('idx')
+        if idx is None or idx >= len(reviews_df) or item.get('error'):
+            continue
+        text = reviews_df.iloc[idx][text_col]
+        if not isinstance(text, str) or not text.strip():
+            continue
+        rec = {'text': text, 'sentiment': item.get('sentiment')}
+        for family in TAG_FAMILIES:
+            rec[family] = _as_list(item.get(family, []))
+        records.append(rec)
+
+    return pd.DataFrame(records, columns=['text', 'sentiment'] + TAG_FAMILIES)
+
+
+def load_labels_from_db(conn, tag_source='TB_REVIEW_TAGS'):
+    """
+    TB_REVIEW_GPT_ANALYSIS + TB_REVIEW_TAGS + TB_CRAWLING_REVIEW에서 라벨 로드
+
+    Args:
+        tag_source: 태그 조회 대상 (packed 방식이면 AnalysisRepository.tag_source())
+
+    Returns:
+        DataFrame: text, sentiment, TAG_FAMILIES
+    """
+    from sqlalchemy import text
+
+    rows = conn.execute(text("""
+        SELECT a.ANALYSIS_ID, cr.REVIEW_CONTENT, a.SENTIMENT
+        FROM TB_REVIEW_GPT_ANALYSIS a
+        JOIN TB_CRAWLING_REVIEW cr ON a.REVIEW_ID = cr.REVIEW_ID
+        WHERE cr.REVIEW_CONTENT IS NOT NULL
+    """)).fetchall()
+    tag_rows = conn.execute(text(f"SELECT ANALYSIS_ID, TAG_TYPE, TAG_VALUE FROM {tag_source} t")).fetchall()
+
+    family_of = {'BENEFIT': 'benefit_tags', 'TEXTURE': 'texture_tags', 'USAGE': 'usage_tags', 'VALUE': 'value_tags'}
+    tags = {}
+    for aid, ttype, tval in tag_rows:
+        family = family_of.get(ttype)
+        if family:
+            tags.setdefault(aid, {}).setdefault(family, []).append(tval)
+
+    records = []
+    for aid, content, sentiment in rows:
+        rec = {'text': str(content), 'sentiment': sentiment}
+        for family in TAG_FAMILIES:
+            rec[family] = tags.get(aid, {}).get(family, [])
+        records.append(rec)
+    return pd.DataFrame(records, columns=['text', 'sentiment'] + TAG_FAMILIES)
+
+
+def split_holdout(labels, test_size=0.2, seed=42):
+    """학습/평가 분할"""
+    rng = np.random.RandomState(seed)
+    is_test = rng.rand(len(labels)) < test_size
+    return labels[~is_test].reset_index(drop=True), labels[is_test].reset_index(drop=True)
+
+
+# ===== 평가 =====
+def _f1(tp, fp, fn):
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def _expected_calibration_error(confidence, correct, bins=10):
+    edges = np.linspace(0, 1, bins + 1)
+    ece = 0.0
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        mask = (confidence > lo) & (confidence <= hi)
+        if mask.any():
+            ece += mask.mean() * abs(correct[mask].mean() - confidence[mask].mean())
+    return ece
+
+
+def evaluate(model, test_labels, threshold=DEFAULT_CONFIDENCE):
+    """
+    GPT 라벨 대비 평가 리포트
+
+    Returns:
+        dict: 감성 정확도/매크로 F1/ECE, 태그별 F1, 확신도 기준 로컬 처리 비율과 그 정확도
+    """
+    pred = model.predict(test_labels['text'].tolist())
+    truth = test_labels['sentiment'].to_numpy()
+    correct = pred['sentiment'].to_numpy() == truth
+
+    per_class = {}
+    for c in model.sentiment_classes:
+        tp = int(((pred['sentiment'] == c) & (truth == c)).sum())
+        fp = int(((pred['sentiment'] == c) & (truth != c)).sum())
+        fn = int(((pred['sentiment'] != c) & (truth == c)).sum())
+        p, r, f = _f1(tp, fp, fn)
+        per_class[c] = {'precision': round(p, 4), 'recall': round(r, 4), 'f1': round(f, 4), 'support': tp + fn}
+
+    tags = {}
+    for family, value in model.tags:
+        has_pred = pred[family].apply(lambda vs: value in vs).to_numpy()
+        has_true = test_labels[family].apply(lambda vs: value in _as_list(vs)).to_numpy()
+        tp = int((has_pred & has_true).sum())
+        fp = int((has_pred & ~has_true).sum())
+        fn = int((~has_pred & has_true).sum())
+        p, r, f = _f1(tp, fp, fn)
+        tags[f"{family}:{value}"] = {'precision': round(p, 4), 'recall': round(r, 4), 'f1': round(f, 4), 'support': tp + fn}
+
+    confident = pred['confidence'].to_numpy() >= threshold
+    supported = [v['f1'] for v in per_class.values() if v['support'] > 0]
+
+    return {
+        'test_size': len(test_labels),
+        'sentiment': {
+            'accuracy': round(float(correct.mean()), 4) if len(correct) else None,
+            'macro_f1': round(float(np.mean(supported)), 4) if supported else None,
+            'ece': round(float(_expected_calibration_error(pred['sentiment_confidence'].to_numpy(), correct)), 4),
+            'per_class': per_class,
+        },
+        'tags': tags,
+        'routing': {
+            'threshold': threshold,
+            'local_rate': round(float(confident.mean()), 4) if len(confident) else None,
+            'local_sentiment_accuracy': round(float(correct[confident].mean()), 4) if confident.any() else None,
+            'api_rate': round(float(1 - confident.mean()), 4) if len(confident) else None,
+        },
+    }
+
+
+def print_evaluation(report):
+    s = report['sentiment']
+    r = report['routing']
+    print(f"\n[로컬 분류기 평가] 평가셋 {report['test_size']:,}건")
+    print(f"  감성 정확도: {s['accuracy']}, 매크로 F1: {s['macro_f1']}, ECE: {s['ece']}")
+    for c, m in s['per_class'].items():
+        print(f"    {c}: P={m['precision']:.3f} R={m['recall']:.3f} F1={m['f1']:.3f} (n={m['support']})")
+    print(f"  태그 ({len(report['tags'])}개):")
+    for name, m in sorted(report['tags'].items(), key=lambda x: -x[1]['support']):
+        print(f"    {name}: F1={m['f1']:.3f} (n={m['support']})")
+    print(f"  라우팅 (확신도 >= {r['threshold']}): 로컬 {r['local_rate']}, API {r['api_rate']}, "
+          f"로컬 처리분 감성 정확도 {r['local_sentiment_accuracy']}")
+
+
+# ===== 라우팅 =====
+def route_by_confidence(model, texts, index=None, threshold=DEFAULT_CONFIDENCE):
+    """
+    확신도 기준 분기
+
+    Returns:
+        tuple: (로컬 예측 DataFrame (확신도 >= threshold), API로 보낼 인덱스)
+    """
+    pred = model.predict(list(texts), index=index)
+    confident = pred['confidence'] >= threshold
+    return pred[confident], pred.index[~confident]
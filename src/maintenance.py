@@ -0,0 +1,407 @@
+"""
+분석 결과 테이블 유지보수 (집합 단위 삭제 / 재분류)
+
+분석 1건마다 DELETE 4번을 반복하던 cleanup_empty 방식은 N건 삭제에 4×N번 DB 왕복이 필요했음
+
+- 대상 ANALYSIS_ID는 조건 쿼리 1번으로 확정 (자식 삭제 중 조건 결과가 바뀌지 않도록 먼저 고정)
+- chunk_size건씩 DELETE ... WHERE ANALYSIS_ID IN (...) 테이블별 1문장, 자식 → 부모 순서
+- 청크마다 커밋 (undo/lock 크기 제한, 중단되어도 청크 단위로 일관성 유지)
+- dry_run: 삭제/변경 없이 테이블별 대상 행 수만 집계 (IN (조건 쿼리) COUNT)
+- 재분류: 매핑을 대표값별로 묶어 UPDATE ... WHERE POINT_TEXT IN (...) (대표값 수만큼만 실행)
+  변경된 분석은 UPDATE 후 CHANGED_AT을 갱신해 증분 내보내기 / 요약 갱신이 다시 가져가도록 함 (ANALYZED_AT은 그대로)
+- 태그 packed 방식: 마스크 컬럼에서 원래 값 비트를 빼고 대표값 비트를 더하는 UPDATE 1문장 (중복 태그 없음)
+- 매핑 테이블: Python 매핑을 TB_CATEGORY_MAP에 버전과 함께 저장하고 Point 테이블을 UPDATE 1문장으로 재분류
+  마지막 적용 이후 바뀐 매핑 항목, 마지막 적용 이후 적재된 분석의 행만 변경
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from src.bulk_loader import TAG_FIELDS
+from src.storage import PAIN_TABLE, POSITIVE_TABLE, RESULT_TABLES, TAG_TABLE
+from src.tag_bits import MASK_COLUMNS
+
+
+# Oracle IN 목록 최대 1000개
+MAX_IN_LIST = 1000
+
+# ===== 삭제 대상 조건 (ANALYSIS_ID 1개 컬럼을 조회하는 쿼리) =====
+# 원본 리뷰가 없는 분석 (REVIEW_ID < 0 은 MANUAL 테이블 분석이므로 제외)
+ORPHAN_ANALYSES_SQL = """
+    SELECT a.ANALYSIS_ID FROM TB_REVIEW_GPT_ANALYSIS a
+    WHERE a.REVIEW_ID > 0
+      AND NOT EXISTS (SELECT 'x' FROM TB_CRAWLING_REVIEW cr WHERE cr.REVIEW_ID = a.REVIEW_ID)
+"""
+
+# 같은 리뷰의 중복 분석 (가장 최근 ANALYSIS_ID만 남김)
+DUPLICATE_ANALYSES_SQL = """
+    SELECT a.ANALYSIS_ID FROM TB_REVIEW_GPT_ANALYSIS a
+    WHERE EXISTS (SELECT 'x' FROM TB_REVIEW_GPT_ANALYSIS b
+                  WHERE b.REVIEW_ID = a.REVIEW_ID AND b.ANALYSIS_ID > a.ANALYSIS_ID)
+"""
+
+
+def empty_content_sql(repo):
+    """원본 리뷰 본문이 비어 있는 분석 (DB별 빈 문자열 처리 차이는 저장소가 담당)"""
+    return f"""
+        SELECT a.ANALYSIS_ID FROM TB_REVIEW_GPT_ANALYSIS a
+        JOIN TB_CRAWLING_REVIEW cr ON a.REVIEW_ID = cr.REVIEW_ID
+        WHERE {repo.empty_content_condition('cr.REVIEW_CONTENT')}
+    """
+
+
+def _chunks(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _in_clause(values, prefix='v'):
+    """IN 목록 바인드 → ("(:v0, :v1, ...)", {'v0': .., 'v1': ..})"""
+    binds = {f'{prefix}{i}': v for i, v in enumerate(values)}
+    return '(' + ', '.join(':' + k for k in binds) + ')', binds
+
+
+# ===== 삭제 =====
+def count_analysis_rows(conn, id_sql, params=None):
+    """조건 쿼리에 해당하는 테이블별 행 수 (dry-run)"""
+    counts = {}
+    for table in RESULT_TABLES:
+        counts[table] = conn.execute(
+            text(f"SELECT COUNT(*) FROM {table} WHERE ANALYSIS_ID IN ({id_sql})"), params or {}
+        ).scalar()
+    return counts
+
+
+def delete_analyses_where(repo, id_sql, params=None, chunk_size=MAX_IN_LIST, dry_run=False):
+    """
+    조건 쿼리에 해당하는 분석과 자식 행 삭제
+
+    Args:
+        repo: AnalysisRepository
+        id_sql: ANALYSIS_ID 1개 컬럼을 조회하는 쿼리
+        params: id_sql 바인드 값
+        chunk_size: 한 트랜잭션에서 삭제할 분석 수 (최대 MAX_IN_LIST)
+        dry_run: True면 삭제하지 않고 테이블별 대상 행 수만 반환
+
+    Returns:
+        dict: 테이블별 삭제(dry_run이면 대상) 행 수
+    """
+    with repo.engine.connect() as conn:
+        if dry_run:
+            return count_analysis_rows(conn, id_sql, params)
+        ids = [r[0] for r in conn.execute(text(id_sql), params or {})]
+    with repo.engine.begin() as conn:
+        repo.ensure_delete_log(conn)
+
+    counts = {table: 0 for table in RESULT_TABLES}
+    for chunk in _chunks(sorted(set(ids)), min(chunk_size, MAX_IN_LIST)):
+        with repo.engine.begin() as conn:
+            for table, n in repo.delete_analyses(conn, chunk).items():
+                counts[table] += n
+    return counts
+
+
+# ===== 재분류 =====
+def _group_by_target(mapping):
+    groups = {}
+    for source, target in mapping.items():
+        if source != target:
+            groups.setdefault(target, []).append(source)
+    return groups
+
+
+def _affected_analyses(conn, table, where, binds):
+    """변경될 행의 ANALYSIS_ID (UPDATE / DELETE 전에 확정)"""
+    return {r[0] for r in conn.execute(text(f"SELECT DISTINCT ANALYSIS_ID FROM {table} WHERE {where}"), binds)}
+
+
+def _touch_analyses(conn, analysis_ids):
+    """변경된 분석의 CHANGED_AT 갱신 (증분 내보내기 / 요약 갱신 대상으로 표시, ANALYZED_AT은 그대로)"""
+    for chunk in _chunks(sorted(analysis_ids), MAX_IN_LIST):
+        in_list, binds = _in_clause(chunk, 'a')
+        conn.execute(text(f"UPDATE TB_REVIEW_GPT_ANALYSIS SET CHANGED_AT = CURRENT_TIMESTAMP "
+                          f"WHERE ANALYSIS_ID IN {in_list}"), binds)
+
+
+def recategorize_points(engine, table, mapping, dry_run=False):
+    """
+    Pain/Positive Point 카테고리 재분류 (POINT_TEXT 또는 기존 CATEGORY가 매핑 키인 행 → CATEGORY = 대표값)
+
+    Args:
+        table: PAIN_TABLE / POSITIVE_TABLE
+        mapping: {표현: 대표 카테고리}
+        dry_run: True면 변경 대상 행 수만 집계
+
+    Returns:
+        int: 변경(dry_run이면 대상) 행 수
+    """
+    if table not in (PAIN_TABLE, POSITIVE_TABLE):
+        raise ValueError(f"Point 테이블이 아님: {table}")
+
+    changed, touched = 0, set()
+    with engine.begin() as conn:
+        for target, sources in _group_by_target(mapping).items():
+            for chunk in _chunks(sources, MAX_IN_LIST):
+                in_list, binds = _in_clause(chunk)
+                binds['target'] = target
+                where = (f"(POINT_TEXT IN {in_list} OR CATEGORY IN {in_list}) "
+                         f"AND (CATEGORY IS NULL OR CATEGORY <> :target)")
+                if dry_run:
+                    changed += conn.execute(text(f"SELECT COUNT(*) FROM {table} WHERE {where}"), binds).scalar()
+                    continue
+                touched |= _affected_analyses(conn, table, where, binds)
+                changed += conn.execute(text(f"UPDATE {table} SET CATEGORY = :target WHERE {where}"),
+                                        binds).rowcount
+        _touch_analyses(conn, touched)
+    return changed
+
+
+def recategorize_tags(engine, tag_type, mapping, drop_values=('기타',), dry_run=False, repo=None):
+    """
+    태그 값 재분류 (TAG_VALUE = 대표값, drop_values로 매핑되면 삭제, 같은 분석의 중복 태그 제거)
+
+    Args:
+        tag_type: BENEFIT / TEXTURE / USAGE / VALUE
+        mapping: {태그 값: 대표 값}
+        drop_values: 이 값으로 매핑되는 태그는 삭제
+        dry_run: True면 변경/삭제 대상 행 수만 집계 (deduplicated는 매핑 적용 전 현재 중복 수)
+        repo: AnalysisRepository (packed 방식이면 마스크 컬럼을 갱신)
+
+    Returns:
+        dict: updated, deleted, deduplicated 행 수 (packed 방식은 변경된 분석 수, deduplicated는 항상 0)
+    """
+    if tag_type not in TAG_FIELDS:
+        raise ValueError(f"알 수 없는 TAG_TYPE: {tag_type}")
+    if repo is not None and repo.packed_tags:
+        return _recategorize_packed_tags(repo, tag_type, mapping, drop_values, dry_run)
+
+    result, touched = {'updated': 0, 'deleted': 0, 'deduplicated': 0}, set()
+    with engine.begin() as conn:
+        for target, sources in _group_by_target(mapping).items():
+            for chunk in _chunks(sources, MAX_IN_LIST):
+                in_list, binds = _in_clause(chunk)
+                binds['ttype'] = tag_type
+                where = f"TAG_TYPE = :ttype AND TAG_VALUE IN {in_list}"
+                key = 'deleted' if target in drop_values else 'updated'
+                if dry_run:
+                    result[key] += conn.execute(text(f"SELECT COUNT(*) FROM TB_REVIEW_TAGS WHERE {where}"),
+                                                binds).scalar()
+                    continue
+                touched |= _affected_analyses(conn, TAG_TABLE, where, binds)
+                if key == 'deleted':
+                    stmt = f"DELETE FROM TB_REVIEW_TAGS WHERE {where}"
+                else:
+                    binds['target'] = target
+                    stmt = f"UPDATE TB_REVIEW_TAGS SET TAG_VALUE = :target WHERE {where}"
+                result[key] += conn.execute(text(stmt), binds).rowcount
+        _touch_analyses(conn, touched)
+
+        # 같은 분석에 같은 태그가 여러 개 → 가장 작은 ID만 남김
+        dup_sql = """
+            SELECT t.ID FROM TB_REVIEW_TAGS t
+            WHERE t.TAG_TYPE = :ttype
+              AND t.ID NOT IN (SELECT MIN(d.ID) FROM TB_REVIEW_TAGS d
+                               WHERE d.TAG_TYPE = :ttype GROUP BY d.ANALYSIS_ID, d.TAG_VALUE)
+        """
+        if dry_run:
+            result['deduplicated'] = conn.execute(text(f"SELECT COUNT(*) FROM ({dup_sql}) x"),
+                                                  {'ttype': tag_type}).scalar()
+        else:
+            dup_ids = _affected_analyses(conn, TAG_TABLE, f"ID IN ({dup_sql})", {'ttype': tag_type})
+            result['deduplicated'] = conn.execute(text(f"DELETE FROM TB_REVIEW_TAGS WHERE ID IN ({dup_sql})"),
+                                                  {'ttype': tag_type}).rowcount
+            _touch_analyses(conn, dup_ids - touched)
+    return result
+
+
+def _recategorize_packed_tags(repo, tag_type, mapping, drop_values, dry_run):
+    """packed 방식 재분류: 대표값별 UPDATE 1문장 (원래 값 비트 제거 + 대표값 비트 추가 + CHANGED_AT 갱신)"""
+    column = MASK_COLUMNS[tag_type]
+    result = {'updated': 0, 'deleted': 0, 'deduplicated': 0}
+    with repo.engine.begin() as conn:
+        for target, sources in _group_by_target(mapping).items():
+            src_bits = repo.tag_bits.bit_values(conn, tag_type, sources)
+            if not src_bits:
+                continue  # 적재된 적 없는 값
+            key = 'deleted' if target in drop_values else 'updated'
+            binds = {'src': src_bits}
+            where = f"{repo.bitand(column, ':src')} > 0"
+            if dry_run:
+                result[key] += conn.execute(text(f"SELECT COUNT(*) FROM TB_REVIEW_GPT_ANALYSIS WHERE {where}"),
+                                            binds).scalar()
+                continue
+            value = f"{column} - {repo.bitand(column, ':src')}"
+            if key == 'updated':
+                # 대표값 비트가 이미 켜져 있으면 그대로 (같은 분석에 중복 태그가 생기지 않음)
+                binds['tgt'] = 1 << repo.tag_bits.bit(conn, tag_type, target)
+                value += f" + :tgt - {repo.bitand(column, ':tgt')}"
+            result[key] += conn.execute(text(f"""
+                UPDATE TB_REVIEW_GPT_ANALYSIS SET {column} = {value}, CHANGED_AT = CURRENT_TIMESTAMP
+                WHERE {where}
+            """), binds).rowcount
+    return result
+
+
+# ===== 매핑 테이블 (버전) =====
+def sync_category_map(conn, name, mapping):
+    """
+    Python 매핑 → TB_CATEGORY_MAP (추가/변경된 항목만 새 VERSION으로 저장, 빠진 항목은 삭제)
+
+    Args:
+        name: 매핑 이름 (PAIN / POSITIVE / USAGE ...)
+        mapping: {표현: 대표값} (표현 = 대표값인 항목은 제외)
+
+    Returns:
+        dict: version, applied_version, applied_at, added, changed, removed
+    """
+    row = conn.execute(text("""
+        SELECT VERSION, APPLIED_VERSION, APPLIED_AT FROM TB_CATEGORY_MAP_VERSION WHERE MAP_NAME = :name
+    """), {'name': name}).fetchone()
+    if row is None:
+        conn.execute(text("""
+            INSERT INTO TB_CATEGORY_MAP_VERSION (MAP_NAME, VERSION, APPLIED_VERSION) VALUES (:name, 0, 0)
+        """), {'name': name})
+        row = (0, 0, None)
+    version, applied_version, applied_at = row
+
+    stored = dict(conn.execute(text(
+        "SELECT SOURCE_VALUE, TARGET_VALUE FROM TB_CATEGORY_MAP WHERE MAP_NAME = :name"), {'name': name}).fetchall())
+    mapping = {s: t for s, t in mapping.items() if s and s != t}
+    added = [s for s in mapping if s not in stored]
+    changed = [s for s in mapping if s in stored and stored[s] != mapping[s]]
+    removed = [s for s in stored if s not in mapping]
+
+    if added or changed or removed:
+        version += 1
+
+        def entries(sources):
+            return [{'name': name, 'src': s, 'tgt': mapping[s], 'version': version} for s in sources]
+
+        if changed:
+            conn.execute(text("""
+                UPDATE TB_CATEGORY_MAP SET TARGET_VALUE = :tgt, VERSION = :version
+                WHERE MAP_NAME = :name AND SOURCE_VALUE = :src
+            """), entries(changed))
+        if added:
+            conn.execute(text("""
+                INSERT INTO TB_CATEGORY_MAP (MAP_NAME, SOURCE_VALUE, TARGET_VALUE, VERSION)
+                VALUES (:name, :src, :tgt, :version)
+            """), entries(added))
+        for chunk in _chunks(removed, MAX_IN_LIST):
+            in_list, binds = _in_clause(chunk)
+            binds['name'] = name
+            conn.execute(text(f"DELETE FROM TB_CATEGORY_MAP WHERE MAP_NAME = :name AND SOURCE_VALUE IN {in_list}"),
+                         binds)
+        conn.execute(text("""
+            UPDATE TB_CATEGORY_MAP_VERSION SET VERSION = :version, UPDATED_AT = CURRENT_TIMESTAMP
+            WHERE MAP_NAME = :name
+        """), {'name': name, 'version': version})
+
+    if applied_at is not None and not isinstance(applied_at, datetime):
+        applied_at = datetime.fromisoformat(str(applied_at))  # SQLite는 문자열
+    return {'version': version, 'applied_version': applied_version, 'applied_at': applied_at,
+            'added': len(added), 'changed': len(changed), 'removed': len(removed)}
+
+
+def _last_loaded_at(conn):
+    return conn.execute(text("SELECT MAX(ANALYZED_AT) FROM TB_REVIEW_GPT_ANALYSIS")).scalar()
+
+
+def _mark_applied(conn, name, version, loaded_at):
+    """
+    적용 완료 표시
+
+    loaded_at: 적용 시작 전에 읽은 최신 ANALYZED_AT (_last_loaded_at)
+    → 다음 실행은 그 이후 적재분에만 전체 매핑 (적용 중에 적재된 분석도 포함)
+    """
+    conn.execute(text("""
+        UPDATE TB_CATEGORY_MAP_VERSION SET APPLIED_VERSION = :version, APPLIED_AT = :loaded_at
+        WHERE MAP_NAME = :name
+    """), {'name': name, 'version': version, 'loaded_at': loaded_at})
+
+
+def apply_point_mapping(repo, name, table, mapping, dry_run=False, overlap=timedelta(minutes=10)):
+    """
+    매핑 테이블 기준 Pain/Positive Point 재분류 (UPDATE 1문장)
+
+    - 마지막 적용 이후 바뀐 매핑 항목(VERSION > APPLIED_VERSION)에 해당하는 행
+    - 마지막 적용 이후 적재된 분석(ANALYZED_AT >= APPLIED_AT - overlap)의 행 → 전체 매핑
+    POINT_TEXT 매핑이 CATEGORY 매핑보다 우선, CATEGORY가 이미 대표값인 행은 건드리지 않음
+    변경된 분석은 UPDATE 후 CHANGED_AT 갱신 (ANALYZED_AT은 적재 시각 그대로 → 다음 실행의 전체 매핑 대상에 안 들어감)
+
+    Args:
+        name: 매핑 이름 (TB_CATEGORY_MAP.MAP_NAME)
+        table: PAIN_TABLE / POSITIVE_TABLE
+        mapping: {표현: 대표 카테고리}
+        dry_run: True면 매핑 테이블 갱신 없이 변경 대상 행 수만 집계
+        overlap: ANALYZED_AT 여유 구간 (늦게 커밋된 분석 포함)
+
+    Returns:
+        dict: sync_category_map 결과 + rows(변경 또는 대상 행 수)
+    """
+    if table not in (PAIN_TABLE, POSITIVE_TABLE):
+        raise ValueError(f"Point 테이블이 아님: {table}")
+
+    with repo.engine.connect() as conn, conn.begin() as tx:
+        repo.ensure_category_map(conn)
+        repo.ensure_change_column(conn)
+        loaded_at = _last_loaded_at(conn)
+        sync = sync_category_map(conn, name, mapping)
+        binds = {'name': name, 'applied': sync['applied_version']}
+
+        def lookup(column, changed_only):
+            cond = "AND m.VERSION > :applied " if changed_only else ""
+            return (f"(SELECT m.TARGET_VALUE FROM TB_CATEGORY_MAP m WHERE m.MAP_NAME = :name {cond}"
+                    f"AND m.SOURCE_VALUE = {table}.{column})")
+
+        new = f"COALESCE({lookup('POINT_TEXT', True)}, {lookup('CATEGORY', True)})"
+        if sync['applied_at'] is not None:
+            binds['since'] = sync['applied_at'] - overlap
+            recent = (f"{table}.ANALYSIS_ID IN (SELECT a.ANALYSIS_ID FROM TB_REVIEW_GPT_ANALYSIS a "
+                      f"WHERE a.ANALYZED_AT >= :since)")
+            new = (f"CASE WHEN {recent} THEN COALESCE({lookup('POINT_TEXT', False)}, {lookup('CATEGORY', False)}) "
+                   f"ELSE {new} END")
+        where = f"{new} IS NOT NULL AND ({table}.CATEGORY IS NULL OR {table}.CATEGORY <> {new})"
+
+        if dry_run:
+            rows = conn.execute(text(f"SELECT COUNT(*) FROM {table} WHERE {where}"), binds).scalar()
+            tx.rollback()
+            return dict(sync, rows=rows)
+
+        touched = _affected_analyses(conn, table, where, binds)
+        rows = conn.execute(text(f"UPDATE {table} SET CATEGORY = {new} WHERE {where}"), binds).rowcount
+        _touch_analyses(conn, touched)
+        _mark_applied(conn, name, sync['version'], loaded_at)
+    return dict(sync, rows=rows)
+
+
+def apply_tag_mapping(repo, name, tag_type, mapping, drop_values=('기타',), dry_run=False):
+    """
+    매핑 테이블 기준 태그 재분류 (TB_CATEGORY_MAP에 버전 기록 후 recategorize_tags 적용)
+
+    태그는 (TAG_TYPE, TAG_VALUE) 인덱스 / 마스크 비트로 원래 값이 남은 행만 찾으므로 전체 매핑을 그대로 적용
+
+    Returns:
+        dict: sync_category_map 결과 + recategorize_tags 결과
+    """
+    with repo.engine.connect() as conn, conn.begin() as tx:
+        repo.ensure_category_map(conn)
+        repo.ensure_change_column(conn)
+        loaded_at = _last_loaded_at(conn)
+        sync = sync_category_map(conn, name, mapping)
+        if dry_run:
+            tx.rollback()
+    result = recategorize_tags(repo.engine, tag_type, mapping, drop_values=drop_values, dry_run=dry_run, repo=repo)
+    if not dry_run:
+        with repo.engine.begin() as conn:
+            _mark_applied(conn, name, sync['version'], loaded_at)
+    return dict(sync, **result)
+
+
+def print_counts(counts, label, dry_run=False):
+    suffix = " (dry-run: 대상 행 수)" if dry_run else ""
+    print(f"\n  [{label}]{suffix}")
+    for table, n in counts.items():
+        print(f"    {table}: {n:,}건")
+
@@ -0,0 +1,168 @@
+"""
+API 분석 + DB 적재 파이프라인 (생산자/소비자)
+
+API 호출 → INSERT → sleep 을 1건씩 순차 실행하던 구조를 단계별로 분리
+
+- API 워커 N개가 동시에 호출
+  초당 요청 수 제한(RateLimiter 토큰 버킷)은 process 안에서 API 호출마다 적용
+  (LLMAnalyzer - 재시도, 실패 필드 재요청도 1회씩 제한에 포함되도록 리뷰 단위가 아니라 호출 단위)
+- 결과는 크기 제한 큐로 전달 → DB가 느리면 큐가 차서 워커가 대기 (backpressure)
+- DB writer 1개(호출한 스레드)가 결과를 batch_size건 또는 flush_interval초 단위로 묶어 적재
+
+전체 처리량은 API 지연 + DB 왕복 + sleep의 합이 아니라 API rate limit에 의해 결정됨
+"""
+
+import queue
+import threading
+import time
+
+
+_DONE = object()
+
+
+class RateLimiter:
+    """
+    토큰 버킷 (스레드 안전)
+
+    Args:
+        rate_per_sec: 초당 허용 요청 수
+        burst: 버킷 크기 (순간 최대 동시 요청 수, None이면 rate_per_sec)
+    """
+
+    def __init__(self, rate_per_sec, burst=None):
+        self.rate = float(rate_per_sec)
+        self.capacity = float(burst or max(1.0, rate_per_sec))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop=None):
+        """토큰 1개 획득까지 대기. stop 이벤트가 먼저 설정되면 False"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if stop is None:
+                time.sleep(wait)
+            elif stop.wait(wait):
+                return False
+
+
+def _put(q, item, abort):
+    """abort가 설정되면 포기하는 blocking put (writer가 사라진 뒤 워커가 영원히 막히지 않도록)"""
+    while not abort.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def run_pipeline(items, process, write_batch, workers=4, queue_size=None, batch_size=50, flush_interval=2.0):
+    """
+    items를 API 워커로 병렬 처리하고 결과를 묶어서 적재
+
+    Args:
+        items: 처리 대상 목록
+        process: 워커 스레드에서 호출되는 process(item) → result
+                 예외가 나면 새 작업 배정을 멈춤 (이미 진행 중인 호출 결과는 적재)
+                 - 예: CircuitOpenError
+        write_batch: 호출 스레드에서 호출되는 write_batch([(item, result), ...])
+        workers: API 워커 수
+        queue_size: 결과 큐 크기 (None이면 batch_size * 4)
+        batch_size: 적재 단위 건수
+        flush_interval: batch_size가 차지 않아도 적재하는 최대 간격 (초)
+
+    Returns:
+        dict: processed(처리 건수), written(적재 건수), batches(적재 횟수),
+              stop_error(작업을 중단시킨 예외, 없으면 None)
+
+    Raises:
+        write_batch에서 난 예외, KeyboardInterrupt - 워커를 중단시킨 뒤 그대로 전달
+    """
+    tasks = queue.Queue()
+    for item in items:
+        tasks.put(item)
+    results = queue.Queue(maxsize=queue_size or batch_size * 4)
+
+    stop = threading.Event()    # 새 작업 배정 중단
+    abort = threading.Event()   # writer 종료 → 결과 전달도 중단
+    stats = {'processed': 0, 'written': 0, 'batches': 0, 'stop_error': None}
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            while not stop.is_set():
+                try:
+                    item = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    result = process(item)
+                except Exception as e:
+                    with lock:
+                        if stats['stop_error'] is None:
+                            stats['stop_error'] = e
+                    stop.set()
+                    break
+                with lock:
+                    stats['processed'] += 1
+                if not _put(results, (item, result), abort):
+                    break
+        finally:
+            _put(results, _DONE, abort)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, workers))]
+    for t in threads:
+        t.start()
+
+    def flush(batch):
+        write_batch(batch)
+        stats['written'] += len(batch)
+        stats['batches'] += 1
+
+    batch = []
+    done = 0
+    last_flush = time.monotonic()
+    try:
+        while done < len(threads):
+            timeout = max(0.05, flush_interval - (time.monotonic() - last_flush))
+            try:
+                msg = results.get(timeout=timeout)
+            except queue.Empty:
+                msg = None
+
+            if msg is _DONE:
+                done += 1
+            elif msg is not None:
+                batch.append(msg)
+
+            if not batch:
+                last_flush = time.monotonic()
+            elif (len(batch) >= batch_size or done == len(threads)
+                  or time.monotonic() - last_flush >= flush_interval):
+                flush(batch)
+                batch = []
+                last_flush = time.monotonic()
+    except KeyboardInterrupt:
+        stop.set()
+        abort.set()
+        # 이미 비용을 치른 결과는 적재하고 중단
+        if batch:
+            flush(batch)
+        raise
+    except BaseException:
+        stop.set()
+        abort.set()
+        raise
+    finally:
+        for t in threads:
+            t.join(timeout=1.0)
+
+    return stats
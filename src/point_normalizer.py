@@ -0,0 +1,197 @@
+"""
+Pain / Positive Point 정규화 매칭 (표현 변형 → 대표 카테고리)
+
+PAIN_MAPPING 등은 '건조함', '건조해요', '겨울에 건조함' 처럼 같은 뜻의 표면형을 모두 나열해야 했고
+목록에 없는 새 변형은 정확히 일치하지 않으면 매핑되지 않았음
+
+- normalize_point: 공백/문장부호 제거, 강조 부사(너무, 조금, 약간 ...) 제거, 어미(~함, ~해요, ~음 ...) 제거
+- StemMatcher: 매핑 키를 정규화한 줄기(stem)로 Aho-Corasick 자동자 구성
+  조회 순서: 원문 정확 일치 → 정규화 형태 일치 → 정규화 형태에 포함된 가장 긴 줄기
+  부분 일치는 정규화 형태의 앞이나 끝에 붙어 있고 MIN_COVERAGE 이상을 덮는 줄기만
+  ('각질제거는흠'의 '각질'처럼 짧은 줄기가 다른 뜻의 문구를 끌어오지 않도록)
+  부정 표현('건조하지 않음', '자극 안 됨', '보습 부족')은 부정어까지 포함한 줄기로만 부분 일치
+  (뜻이 뒤집힌 카테고리로 가지 않도록)
+  → 텍스트 길이에 비례하는 시간 (줄기 수와 무관), 같은 값은 호출한 쪽에서 캐시
+- compact_mapping: 더 짧은 줄기가 같은 대표값으로 이미 덮는 항목을 뺀 최소 매핑 (매핑 정리용)
+"""
+
+import re
+import unicodedata
+
+
+# 의미를 바꾸지 않는 강조/완화 부사 (단어 단위 또는 앞에 붙은 경우 제거)
+INTENSIFIERS = (
+    '너무나', '너무', '조금씩', '조금', '약간', '살짝', '매우', '엄청', '진짜', '정말', '많이',
+    '다소', '아주', '꽤', '되게', '완전', '좀', '넘', '넘나', '굉장히', '상당히', '은근',
+)
+
+# 문장 끝 어미 (긴 것부터 비교, 줄기가 2글자 이상 남을 때만 제거)
+ENDINGS = tuple(sorted((
+    '습니다', '합니다', '했어요', '해요', '네요', '어요', '아요', '에요', '예요', '이에요', '입니다',
+    '하다', '했다', '해짐', '한', '함', '임', '음', '요', '다', '해', '됨',
+), key=len, reverse=True))
+
+# 부정어 / 반대 뜻 표현 (부분 일치한 줄기에 없으면 매칭하지 않음)
+NEGATIONS = ('않', '없', '못', '부족', '별로', '안')
+
+# '안'은 단어 경계에서만 부정어 ('자극 안 됨', '냄새 안남', '안좋음' / '안전', '안정'은 아님)
+_NEGATION_AN = re.compile(r'(?:^|[^0-9a-z가-힣])안(?=$|[^0-9a-z가-힣]|[남함됨되돼맞좋나해생느올들먹쓰써])')
+
+MIN_STEM_LEN = 2
+MIN_COVERAGE = 0.7  # 부분 일치 줄기가 덮어야 하는 정규화 형태 비율
+
+_NON_WORD = re.compile(r'[^0-9a-z가-힣]+')
+
+
+def _strip_intensifier(token):
+    for word in INTENSIFIERS:
+        if token == word:
+            return ''
+        if token.startswith(word) and len(token) - len(word) >= MIN_STEM_LEN:
+            return token[len(word):]
+    return token
+
+
+def _prepare(text):
+    return unicodedata.normalize('NFKC', str(text)).lower()
+
+
+def negations(text):
+    """표현에 들어 있는 부정어 (NEGATIONS 중)"""
+    if not text:
+        return set()
+    text = _prepare(text)
+    found = {neg for neg in NEGATIONS if neg != '안' and neg in text}
+    if _NEGATION_AN.search(text):
+        found.add('안')
+    return found
+
+
+def normalize_point(text):
+    """표현 → 비교용 정규 형태 ('너무 건조해요!' → '건조', '겨울에 건조함' → '겨울에건조')"""
+    if not text:
+        return ''
+    text = _prepare(text)
+    tokens = [_strip_intensifier(t) for t in _NON_WORD.split(text) if t]
+    norm = ''.join(tokens)
+    stripped = True
+    while stripped:
+        stripped = False
+        for ending in ENDINGS:
+            if norm.endswith(ending) and len(norm) - len(ending) >= MIN_STEM_LEN:
+                norm = norm[:-len(ending)]
+                stripped = True
+                break
+    return norm
+
+
+class StemMatcher:
+    """
+    정규화한 매핑 키(줄기) 자동자
+
+    Args:
+        mapping: {표현: 대표값}
+        min_len: 부분 일치에 쓸 최소 줄기 길이 (짧은 줄기는 정규화 형태가 같을 때만)
+        min_coverage: 부분 일치 줄기가 덮어야 하는 정규화 형태 비율
+
+    Attributes:
+        stems: {줄기: 대표값} (같은 줄기가 다른 대표값이면 먼저 나온 항목 사용 → conflicts에 기록)
+    """
+
+    def __init__(self, mapping, min_len=MIN_STEM_LEN, min_coverage=MIN_COVERAGE):
+        self.mapping = dict(mapping)
+        self.min_coverage = min_coverage
+        self.stems = {}
+        self.conflicts = []
+        for source, target in self.mapping.items():
+            stem = normalize_point(source)
+            if not stem:
+                continue
+            if stem in self.stems and self.stems[stem] != target:
+                self.conflicts.append((source, stem, self.stems[stem], target))
+                continue
+            self.stems[stem] = target
+        self._build([s for s in self.stems if len(s) >= min_len])
+
+    def _build(self, stems):
+        """goto / fail / 노드별 가장 긴 출력 (길이, 대표값, 줄기)"""
+        self._goto = [{}]
+        own = [None]
+        for stem in stems:
+            node = 0
+            for ch in stem:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    own.append(None)
+                node = nxt
+            own[node] = (len(stem), self.stems[stem], stem)
+
+        self._fail = [0] * len(self._goto)
+        self._out = list(own)
+        queue = list(self._goto[0].values())
+        for node in queue:  # BFS (리스트 뒤에 이어 붙이며 순회)
+            for ch, child in self._goto[node].items():
+                if node:
+                    fail = self._fail[node]
+                    while fail and ch not in self._goto[fail]:
+                        fail = self._fail[fail]
+                    self._fail[child] = self._goto[fail].get(ch, 0)
+                # 실패 링크 쪽 출력은 현재 노드 줄기의 접미사라 더 짧음 → 자기 출력이 없을 때만 이어받음
+                if self._out[child] is None:
+                    self._out[child] = self._out[self._fail[child]]
+                queue.append(child)
+
+    def longest_stem(self, norm):
+        """정규 형태에 포함된 가장 긴 줄기의 (길이, 대표값, 줄기, 시작 위치) 또는 None (같은 길이면 앞쪽)"""
+        best = None
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for end, ch in enumerate(norm, 1):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            found = out[node]
+            if found is not None and (best is None or found[0] > best[0]):
+                best = found + (end - found[0],)
+        return best
+
+    def match(self, text):
+        """표현 → 대표값 (매칭 없으면 None)"""
+        target = self.mapping.get(text)
+        if target is not None:
+            return target
+        norm = normalize_point(text)
+        target = self.stems.get(norm)
+        if target is not None:
+            return target
+        found = self.longest_stem(norm)
+        if found is None:
+            return None
+        length, target, stem, start = found
+        if start != 0 and start + length != len(norm):
+            return None  # 문구 가운데에만 걸친 줄기
+        if length < self.min_coverage * len(norm):
+            return None  # 문구의 일부만 설명하는 짧은 줄기
+        if any(neg not in stem for neg in negations(text)):
+            return None
+        return target
+
+
+def compact_mapping(mapping, min_len=MIN_STEM_LEN):
+    """
+    더 짧은 줄기가 같은 대표값으로 덮는 항목을 뺀 매핑 (StemMatcher로 조회하면 원래 매핑과 같은 결과)
+
+    Returns:
+        dict: {표현: 대표값} (줄기 길이 순)
+    """
+    # 짧은 줄기부터 → 나중에 넣는 (더 긴) 줄기는 앞서 뺀 항목의 매칭 결과를 바꾸지 않음
+    entries = sorted(mapping.items(), key=lambda e: (len(normalize_point(e[0])), e[0]))
+    compact = {}
+    for source, target in entries:
+        if compact and StemMatcher(compact, min_len).match(source) == target:
+            continue
+        compact[source] = target
+    return compact
@@ -0,0 +1,148 @@
+"""
+제품명 정규화 엔진
+
+행마다 re.sub 14번(패턴 매번 해석) + PRODUCT_NAME_MAP 선형 탐색을 하던 normalize_product_name 대체
+원본 제품명 종류는 수백 개뿐이고 행은 수백만 개이므로
+
+- 규칙 체인을 미리 컴파일
+- 원본 제품명별 결과 캐시 (같은 이름은 한 번만 계산)
+- 매핑 키 탐색은 Aho-Corasick 오토마톤 (문자열 1회 순회로 모든 키 매칭)
+  → 여러 키가 포함되면 기존처럼 dict 순서상 먼저 나온 키의 값 사용
+- pandas Series는 factorize → 고유값만 정규화 → 코드로 펼침
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# (패턴, 치환) - 위에서부터 순서대로 적용
+DEFAULT_RULES = [
+    (r'\[.*?\]', ''),          # 1) [...] 대괄호 태그
+    (r'\(.*?\)', ''),          # 2) (...) 괄호 정보
+    (r'\d+\s*[mM][lL]', ''),   # 3) 용량: 500ml, 250mL, 20g 등
+    (r'\d+\s*g\b', ''),
+    (r',\s*\d+개', ''),        # 4) 쿠팡 수량: , 1개 / , 7개
+    (r'기획.*', ''),           # 5) 기획/단품
+    (r'단품.*', ''),
+    (r'\b1025\b', ''),         # 6) 숫자 잔여물 (1025, 77, 1+1 등)
+    (r'\b77\b', ''),
+    (r'\d\+\d', ''),
+    (r'어워즈.*', ''),         # 7) 어워즈, 한정, 더블 등 부가 텍스트
+    (r'더블.*', ''),
+    (r'\s+', ' '),             # 8) 공백 정리
+]
+
+
+class SubstringAutomaton:
+    """
+    Aho-Corasick 다중 부분 문자열 탐색
+
+    Args:
+        keys: 찾을 문자열 목록 (순서 = 우선순위)
+    """
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for i, key in enumerate(self.keys):
+            state = 0
+            for ch in key:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(i)
+
+        # BFS로 실패 링크 설정, 출력은 실패 링크 쪽 출력까지 합쳐 최소 인덱스만 보관
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._first = [min(out) if out else None for out in self._out]
+
+    def first_match(self, s):
+        """s에 포함된 키 중 우선순위가 가장 높은(목록에서 먼저 나온) 키의 인덱스 (없으면 None)"""
+        goto, fail, first = self._goto, self._fail, self._first
+        state, best = 0, None
+        for ch in s:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hit = first[state]
+            if hit is not None and (best is None or hit < best):
+                best = hit
+                if best == 0:
+                    break
+        return best
+
+
+class ProductNameNormalizer:
+    """
+    제품명 정규화 (호출 가능 객체, 결과 캐시)
+
+    사용 예:
+        normalize = ProductNameNormalizer(PRODUCT_NAME_MAP)
+        normalize('[어워즈] 라운드랩 독도 토너 500ml 기획')  # → '라운드랩 독도 토너'
+        df['BRAND_NAME'] = normalize.series(df['PRODUCT_NAME'])
+
+    Args:
+        name_map: 정규화된 이름에 포함되면 치환할 {키: 대표 이름} (dict 순서 = 우선순위)
+        rules: (정규식, 치환) 목록
+    """
+
+    def __init__(self, name_map, rules=DEFAULT_RULES):
+        self._rules = [(re.compile(pattern), repl) for pattern, repl in rules]
+        self._values = list(name_map.values())
+        self._automaton = SubstringAutomaton(name_map.keys())
+        self._cache = {}
+
+    def _normalize(self, name):
+        s = str(name)
+        for pattern, repl in self._rules:
+            s = pattern.sub(repl, s)
+        s = s.strip().rstrip(',').strip()
+
+        hit = self._automaton.first_match(s)
+        if hit is not None:
+            return self._values[hit]
+        return s if s else str(name)
+
+    def __call__(self, name):
+        if not name:
+            return name
+        if not isinstance(name, str):
+            return self._normalize(name)
+        result = self._cache.get(name)
+        if result is None:
+            result = self._cache[name] = self._normalize(name)
+        return result
+
+    def series(self, values):
+        """
+        Series/배열 정규화 (factorize → 고유값만 계산 → 코드로 펼침)
+
+        Returns:
+            pd.Series (입력과 같은 index, 결측값은 그대로)
+        """
+        values = pd.Series(values) if not isinstance(values, pd.Series) else values
+        codes, uniques = pd.factorize(values)
+        mapped = np.array([self(u) for u in uniques] + [None], dtype=object)
+        out = mapped[codes]  # 결측(-1)은 마지막 자리
+        missing = codes < 0
+        if missing.any():
+            out[missing] = values.to_numpy(dtype=object)[missing]
+        return pd.Series(out, index=values.index, name=values.name)
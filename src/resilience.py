@@ -0,0 +1,299 @@
+"""
+API 호출 복원력(resilience) 모듈
+
+- 오류 분류: rate_limit / timeout / server / parse / client / unknown
+- 지수 백오프 + full jitter, Retry-After 헤더 준수
+- 서킷 브레이커: 연속 실패가 누적되면 호출 차단 (몇 시간씩 헛도는 실행 방지)
+- Dead-letter 파일: 최종 실패 건을 JSONL로 남겨 나중에 재처리
+"""
+
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from src.checkpoint import CheckpointJournal, read_journal
+from src.response_parser import ResponseParseError
+
+
+# ===== 오류 분류 =====
+ERROR_RATE_LIMIT = 'rate_limit'
+ERROR_TIMEOUT = 'timeout'
+ERROR_SERVER = 'server'
+ERROR_PARSE = 'parse'
+ERROR_CLIENT = 'client'
+ERROR_UNKNOWN = 'unknown'
+
+# 재시도할 가치가 있는 오류 (client 오류는 같은 요청을 다시 보내도 실패)
+RETRYABLE_ERRORS = (ERROR_RATE_LIMIT, ERROR_TIMEOUT, ERROR_SERVER, ERROR_PARSE, ERROR_UNKNOWN)
+
+
+class LLMCallError(Exception):
+    """재시도 후에도 실패한 API 호출"""
+
+    def __init__(self, category, attempts, cause):
+        super().__init__(f"{category} (시도 {attempts}회): {cause}")
+        self.category = category
+        self.attempts = attempts
+        self.cause = cause
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 호출이 차단됨"""
+
+
+def classify_error(exc):
+    """
+    예외를 오류 분류로 변환
+
+    openai 라이브러리에 직접 의존하지 않도록 클래스명과 status_code로 판단
+    parse는 응답 파싱 예외만 (ResponseParseError, json.JSONDecodeError) - 그 밖의 ValueError는 코드 오류일 수 있어 unknown
+    """
+    if isinstance(exc, (ResponseParseError, json.JSONDecodeError)):
+        return ERROR_PARSE
+
+    name = type(exc).__name__
+    if name == 'RateLimitError':
+        return ERROR_RATE_LIMIT
+    if name in ('APITimeoutError', 'Timeout', 'ReadTimeout', 'ConnectTimeout') or isinstance(exc, TimeoutError):
+        return ERROR_TIMEOUT
+    if name in ('APIConnectionError', 'InternalServerError', 'ServiceUnavailableError'):
+        return ERROR_SERVER
+
+    status = getattr(exc, 'status_code', None)
+    if status is not None:
+        if status == 429:
+            return ERROR_RATE_LIMIT
+        if status == 408:
+            return ERROR_TIMEOUT
+        if status >= 500:
+            return ERROR_SERVER
+        if 400 <= status < 500:
+            return ERROR_CLIENT
+
+    return ERROR_UNKNOWN
+
+
+def get_retry_after(exc):
+    """
+    예외 응답 헤더에서 Retry-After(초) 추출
+
+    retry-after-ms, retry-after(초 또는 HTTP 날짜) 순으로 확인. 없으면 None
+    """
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    재시도 정책
+
+    Args:
+        max_retries: 최대 재시도 횟수 (첫 시도 제외)
+        base_delay: 백오프 기준 대기 (초)
+        max_delay: 백오프 상한 (초)
+        max_parse_retries: JSON 파싱 실패 재시도 횟수 (유료 재호출이므로 별도 제한)
+    """
+
+    def __init__(self, max_retries=5, base_delay=1.0, max_delay=60.0, max_parse_retries=1):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_parse_retries = max_parse_retries
+
+    def should_retry(self, category, attempt, parse_failures):
+        if category not in RETRYABLE_ERRORS:
+            return False
+        if category == ERROR_PARSE and parse_failures > self.max_parse_retries:
+            return False
+        return attempt <= self.max_retries
+
+    def compute_delay(self, category, attempt, retry_after=None):
+        """
+        다음 시도까지 대기 시간
+
+        full jitter: uniform(0, min(max_delay, base * 2^(attempt-1)))
+        Retry-After가 있으면 그보다 짧게 기다리지 않음
+        """
+        if category == ERROR_PARSE:
+            return 0.0
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = random.uniform(0, cap)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    서킷 브레이커
+
+    closed    : 정상 호출
+    open      : failure_threshold회 연속 실패 → recovery_timeout초 동안 호출 차단
+    half_open : 대기 후 1건 시험 호출, 성공하면 closed / 실패하면 다시 open
+                시험 호출은 1개만 (시작한 스레드의 재시도만 통과, 다른 스레드는 차단)
+                시험 호출이 recovery_timeout 안에 끝나지 않으면 다른 스레드가 새로 시험 호출
+
+    여러 API 워커 스레드가 공유할 수 있도록 상태 변경은 lock으로 보호
+    """
+
+    def __init__(self, failure_threshold=10, recovery_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_owner = None
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            now = time.monotonic()
+            if self.state == 'open':
+                if now - self.opened_at < self.recovery_timeout:
+                    return False
+                self.state = 'half_open'
+            elif self._probe_owner == threading.get_ident():
+                return True
+            elif now - self._probe_started < self.recovery_timeout:
+                return False
+            self._probe_owner, self._probe_started = threading.get_ident(), now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probe_owner = self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self._probe_owner = self._probe_started = None
+
+
+def call_with_retry(fn, policy=None, breaker=None, on_retry=None):
+    """
+    재시도/백오프/서킷 브레이커를 적용해 fn() 호출
+
+    Args:
+        fn: 인자 없는 호출 함수 (응답 파싱까지 포함해야 parse 오류도 재시도됨)
+        policy: RetryPolicy (None이면 기본값)
+        breaker: CircuitBreaker (None이면 사용 안 함)
+        on_retry: 재시도 직전 콜백 on_retry(category, attempt, delay)
+
+    Returns:
+        fn()의 반환값
+
+    Raises:
+        CircuitOpenError: 브레이커가 열려 있음
+        LLMCallError: 재시도 후에도 실패
+    """
+    policy = policy or RetryPolicy()
+    attempt = 0
+    parse_failures = 0
+
+    while True:
+        if breaker is not None and not breaker.allow_request():
+            raise CircuitOpenError(
+                f"연속 {breaker.consecutive_failures}회 실패로 호출 차단 중 "
+                f"({breaker.recovery_timeout:.0f}초 후 재시도)"
+            )
+
+        attempt += 1
+        try:
+            result = fn()
+        except Exception as e:
+            category = classify_error(e)
+            if category == ERROR_PARSE:
+                parse_failures += 1
+
+            if not policy.should_retry(category, attempt, parse_failures):
+                # 파싱 실패도 누적 (계속 깨진 응답을 돌려주면 과금만 되므로 차단)
+                if breaker is not None:
+                    breaker.record_failure()
+                raise LLMCallError(category, attempt, e) from e
+
+            delay = policy.compute_delay(category, attempt, get_retry_after(e))
+            if on_retry is not None:
+                on_retry(category, attempt, delay)
+            if delay > 0:
+                time.sleep(delay)
+            continue
+
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+class DeadLetterWriter:
+    """
+    최종 실패 건 기록 (JSONL, append-only)
+
+    사용 예:
+        with DeadLetterWriter('output/dead_letter.jsonl') as dlq:
+            dlq.write(review_id, error)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._journal = CheckpointJournal(path, fsync_policy='always')
+
+    def __enter__(self):
+        self._journal.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._journal.close()
+
+    def write(self, item_id, error, payload=None):
+        category = getattr(error, 'category', None) or classify_error(error)
+        self._journal.append({
+            'item_id': item_id,
+            'error_class': category,
+            'attempts': getattr(error, 'attempts', None),
+            'message': str(error)[:500],
+            'payload': payload,
+            'failed_at': datetime.now().isoformat(),
+        })
+        self.count += 1
+
+
+def load_dead_letters(path):
+    """Dead-letter 파일에서 실패 항목 로드 (같은 ID는 마지막 기록만)"""
+    latest = {}
+    for rec in read_journal(path):
+        latest[rec['item_id']] = rec
+    return list(latest.values())
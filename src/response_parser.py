@@ -0,0 +1,333 @@
+"""
+모델 응답 파싱 + 스키마 검증
+
+```json 코드 블록 제거 후 json.loads 하던 방식 대신
+- 응답 어디에 있든 첫 번째 JSON 객체/배열 추출 (앞뒤 설명 문장 허용)
+- 흔한 형식 오류 복구: 후행 쉼표, 작은따옴표, 스마트 따옴표, True/False/None, max_tokens로 잘린 응답
+- 필드별 타입/허용값 검증 (감성/강도 enum, 태그 enum 목록, 포인트 문자열 목록)
+- 검증 실패 필드만 골라 재요청할 수 있도록 실패 필드 목록 반환
+  응답에 없는 키와 잘린 응답의 마지막 키도 실패 필드로 취급
+  (잘린 답을 "해당 없음"으로 채워 캐시에 남기지 않도록)
+- 허용되지 않아 버린 값은 따로 반환 (지표에 집계해 별칭 보완)
+
+파싱 불가 응답은 ResponseParseError(ValueError)로 알림 → src.resilience에서 parse 오류로 분류
+"""
+
+import json
+import re
+
+
+class ResponseParseError(ValueError):
+    """JSON 추출 실패 또는 필수 필드 검증 실패"""
+
+    def __init__(self, message, content=None, failed=None, partial=None):
+        super().__init__(message)
+        self.content = content
+        self.failed = failed or {}
+        self.partial = partial
+
+
+# ===== 허용값 =====
+SENTIMENTS = ('POS', 'NEU', 'NEG')
+STRENGTHS = ('STRONG', 'MID', 'WEAK')
+BENEFIT_TAGS = ('진정', '보습', '장벽', '결', '피지')
+TEXTURE_TAGS = ('물같음', '쫀쫀', '끈적', '흡수')
+USAGE_TAGS = ('닦토', '스킨팩', '레이어링', '바디')
+VALUE_TAGS = ('가성비', '무난', '애매', '인생템')
+REASON_BUY = ('가성비', '진정', '보습', '대용량', '기타')
+
+# 모델이 풀어 쓴 값 → 표준값
+ENUM_ALIASES = {
+    'POSITIVE': 'POS', 'NEGATIVE': 'NEG', 'NEUTRAL': 'NEU',
+    '긍정': 'POS', '부정': 'NEG', '중립': 'NEU',
+    'MEDIUM': 'MID', 'MIDDLE': 'MID',
+}
+
+
+class Field:
+    """
+    응답 필드 정의
+
+    Args:
+        kind: 'enum' (허용값 중 하나), 'enum_list' (허용값 목록), 'list' (문자열 목록), 'text'
+        choices: 허용값 (enum, enum_list)
+        required: 없거나 잘못되면 실패 처리 (False면 빈 값으로 채움)
+        max_len: 문자열 최대 길이
+    """
+
+    def __init__(self, kind, choices=None, required=True, max_len=None):
+        self.kind = kind
+        self.choices = tuple(choices) if choices else None
+        self.required = required
+        self.max_len = max_len
+
+    def empty(self):
+        return [] if self.kind in ('list', 'enum_list') else None
+
+    def describe(self):
+        """필드 재요청 프롬프트용 설명"""
+        if self.kind == 'enum':
+            return ' / '.join(f'"{c}"' for c in self.choices) + ' 중 하나'
+        if self.kind == 'enum_list':
+            return '[' + ', '.join(f'"{c}"' for c in self.choices) + '] 중 해당하는 것만 배열 (없으면 [])'
+        if self.kind == 'list':
+            return '문자열 배열 (없으면 [])'
+        return '문자열'
+
+    def _enum_value(self, value):
+        if not isinstance(value, str):
+            return None
+        v = value.strip().strip('"\'')
+        if v in self.choices:
+            return v
+        v = ENUM_ALIASES.get(v.upper(), v.upper())
+        return v if v in self.choices else None
+
+    def coerce(self, value):
+        """
+        값 정규화
+
+        Returns:
+            tuple: (정규화된 값, 실패 사유 또는 None, 버린 값 목록)
+        """
+        if self.kind == 'enum':
+            v = self._enum_value(value)
+            return (v, None, []) if v is not None else (None, f'허용되지 않은 값: {value!r}', [])
+
+        if self.kind == 'text':
+            if not isinstance(value, (str, int, float)):
+                return None, f'문자열 아님: {type(value).__name__}', []
+            v = str(value).strip()
+            return v[:self.max_len] if self.max_len else v, None, []
+
+        # 목록: "보습, 진정" 처럼 문자열로 온 경우도 허용
+        if isinstance(value, str):
+            value = [v for v in re.split(r'[,/·]', value) if v.strip()]
+        if not isinstance(value, list):
+            return None, f'배열 아님: {type(value).__name__}', []
+
+        out, dropped = [], []
+        for v in value:
+            if not isinstance(v, str) or not v.strip():
+                dropped.append(v)
+                continue
+            if self.kind == 'enum_list':
+                raw, v = v, self._enum_value(v)
+                if v is None:
+                    dropped.append(raw)
+                    continue
+            else:
+                v = v.strip()[:self.max_len] if self.max_len else v.strip()
+            if v not in out:
+                out.append(v)
+        return out, None, dropped
+
+
+# ===== 분석기별 응답 스키마 =====
+POINTS_SCHEMA = {
+    'sentiment': Field('enum', SENTIMENTS),
+    'pain_points': Field('list', required=False, max_len=200),
+    'positive_points': Field('list', required=False, max_len=200),
+}
+
+FULL_SCHEMA = dict(POINTS_SCHEMA, **{
+    'benefit_tags': Field('enum_list', BENEFIT_TAGS, required=False),
+    'texture_tags': Field('enum_list', TEXTURE_TAGS, required=False),
+    'usage_tags': Field('enum_list', USAGE_TAGS, required=False),
+    'value_tags': Field('enum_list', VALUE_TAGS, required=False),
+})
+
+ENHANCER_SCHEMA = {
+    'sentiment': Field('enum', SENTIMENTS),
+    'strength': Field('enum', STRENGTHS),
+    'benefit_tags': Field('enum_list', BENEFIT_TAGS, required=False),
+    'texture_tags': Field('enum_list', TEXTURE_TAGS, required=False),
+    'usage_tags': Field('enum_list', USAGE_TAGS, required=False),
+    'reason_buy': Field('enum', REASON_BUY, required=False),
+}
+
+
+# ===== JSON 추출/복구 =====
+_RE_FENCE = re.compile(r'```(?:json|JSON)?')
+_RE_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+_RE_SINGLE_QUOTED = re.compile(r"(?<=[{\[,:])(\s*)'([^'\"\\]*)'")
+_RE_PY_LITERAL = re.compile(r'(?<=[:\[,\s])(True|False|None)(?=\s*[,}\]])')
+_PY_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+_SMART_QUOTES = str.maketrans({'“': '"', '”': '"', '‘': "'", '’': "'"})
+
+_DECODER = json.JSONDecoder()
+
+# extract_json 복구 방식
+REPAIR_FIXED = 'fixed'          # 형식 오류만 복구
+REPAIR_TRUNCATED = 'truncated'  # 닫히지 않은 괄호를 닫음 (응답이 잘림)
+
+
+def _scan(text, start):
+    """
+    start의 {/[ 부터 괄호 균형 검사
+
+    Returns:
+        tuple: (끝 위치 또는 None, 닫히지 않은 괄호 스택, 문자열 안에서 끝났는지)
+    """
+    stack = []
+    in_str = False
+    escape = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_str:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_str = False
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+        elif ch in '}]':
+            if not stack or stack[-1] != ch:
+                return None, stack, False
+            stack.pop()
+            if not stack:
+                return i + 1, [], False
+    return None, stack, in_str
+
+
+def _close_truncated(fragment, stack, in_str):
+    """max_tokens로 잘린 응답 닫기 (미완성 키/값은 버림)"""
+    if in_str:
+        fragment += '"'
+    fragment = fragment.rstrip()
+    if stack[-1] == '}':
+        # 객체 안에서 값 없이 끝난 키("key" 또는 "key":) 제거
+        fragment = re.sub(r'([{,])\s*"[^"]*"\s*:?\s*$', r'\1', fragment)
+    fragment = fragment.rstrip().rstrip(',')
+    return fragment + ''.join(reversed(stack))
+
+
+def repair_json(text):
+    """흔한 형식 오류 복구 (스마트 따옴표, 작은따옴표, 파이썬 리터럴, 후행 쉼표)"""
+    text = text.translate(_SMART_QUOTES)
+    text = _RE_SINGLE_QUOTED.sub(lambda m: m.group(1) + json.dumps(m.group(2), ensure_ascii=False), text)
+    text = _RE_PY_LITERAL.sub(lambda m: _PY_LITERALS[m.group(1)], text)
+    return _RE_TRAILING_COMMA.sub(r'\1', text)
+
+
+def extract_json(content, expect=dict):
+    """
+    응답에서 첫 번째 유효한 JSON 추출
+
+    Args:
+        content: 모델 응답 본문
+        expect: 기대 타입 (dict/list, None이면 아무거나)
+
+    Returns:
+        tuple: (파싱 결과, 복구 방식 - None / REPAIR_FIXED / REPAIR_TRUNCATED)
+
+    Raises:
+        ResponseParseError: JSON을 찾지 못함
+    """
+    text = _RE_FENCE.sub('', content or '')
+    for m in re.finditer(r'[{\[]', text):
+        start = m.start()
+        try:
+            obj, _ = _DECODER.raw_decode(text, start)
+            if expect is None or isinstance(obj, expect):
+                return obj, None
+            continue
+        except ValueError:
+            pass
+
+        end, stack, in_str = _scan(text, start)
+        if end is not None:
+            candidate, repair = text[start:end], REPAIR_FIXED
+        elif stack:
+            candidate, repair = _close_truncated(text[start:], stack, in_str), REPAIR_TRUNCATED
+        else:
+            continue
+        try:
+            obj = json.loads(repair_json(candidate))
+        except ValueError:
+            continue
+        if expect is None or isinstance(obj, expect):
+            return obj, repair
+
+    raise ResponseParseError('응답에서 JSON을 찾을 수 없음', content=content)
+
+
+def validate(data, schema, truncated=False):
+    """
+    스키마 검증 + 정규화
+
+    - 응답에 키가 없으면 required 여부와 관계없이 실패 (모든 프롬프트가 전체 키를 요구하므로 잘린 응답)
+    - 값이 null이거나 형식이 틀린 비필수 필드는 빈 값으로 채움
+
+    Args:
+        truncated: 응답이 잘렸는지 (마지막 키의 값도 중간에 끊겼을 수 있으므로 실패 처리)
+
+    Returns:
+        tuple: (정규화된 결과, 실패 필드 {필드: 사유}, 버린 값 {필드: [값]})
+               스키마에 없는 키는 그대로 유지
+    """
+    result = dict(data)
+    failed = {}
+    dropped = {}
+    present = [name for name in data if name in schema]
+    if truncated and present:
+        failed[present[-1]] = '잘림'
+    for name, field in schema.items():
+        if name not in data:
+            failed[name] = '누락'
+            result[name] = field.empty()
+            continue
+        value = data[name]
+        if value is None:
+            if field.required:
+                failed[name] = '누락'
+            result[name] = field.empty()
+            continue
+
+        value, error, drop = field.coerce(value)
+        if error is not None:
+            if field.required:
+                failed[name] = error
+            value = field.empty()
+        if drop:
+            dropped[name] = drop
+        result[name] = value
+    return result, failed, dropped
+
+
+def parse_response(content, schema=None, truncated=False):
+    """
+    응답 본문 → (결과 dict, 실패 필드, 버린 값)
+
+    schema가 None이면 JSON 추출만 수행
+
+    Args:
+        truncated: API가 max_tokens로 응답을 끊었는지 (finish_reason == 'length')
+                   - 괄호를 닫아 복구한 경우도 잘린 응답으로 취급
+
+    Raises:
+        ResponseParseError: JSON 객체를 찾지 못함
+    """
+    data, repair = extract_json(content, expect=dict)
+    if schema is None:
+        return data, {}, {}
+    return validate(data, schema, truncated=truncated or repair == REPAIR_TRUNCATED)
+
+
+def build_field_prompt(review_text, fields, schema):
+    """검증 실패 필드만 다시 묻는 짧은 프롬프트"""
+    lines = '\n'.join(f'    "{name}": {schema[name].describe()}' for name in fields)
+    return f"""다음 화장품 리뷰에서 아래 항목만 분석해 JSON으로 응답하세요.
+
+리뷰: "{review_text}"
+
+{{
+{lines}
+}}
+
+JSON만 응답하세요."""
@@ -0,0 +1,143 @@
+"""
+비용 인지형 AI 보정 대상 선별 (토큰/비용 예산 기반)
+
+리뷰별 예상 토큰(입력/출력)과 애매함 신호로부터 "보정될 확률"을 추정하고,
+예산 안에서 기대 보정 건수가 최대가 되도록 선택 (확률/비용 비율 그리디)
+API 호출 전에 예상 비용과 소요 시간을 출력
+"""
+
+import pandas as pd
+
+from src.token_estimator import estimate_cost, estimate_tokens_series
+
+
+# ===== 애매함 신호별 보정 확률 사전값 =====
+# GPT 재분석 시 1차 규칙 기반 결과가 실제로 바뀔 확률 (경험치)
+CORRECTION_PRIORS = {
+    'is_neu': 0.45,          # NEU 판정
+    'rating_mismatch': 0.35,  # 별점-내용 불일치
+    'no_tags_long': 0.25,     # 긴 리뷰인데 태그 미추출
+}
+
+# ===== 출력 토큰 추정 =====
+# JSON 응답 골격 + 리뷰 길이에 비례한 태그 증가분 (max_tokens 상한)
+OUTPUT_BASE_TOKENS = 60
+OUTPUT_TOKENS_PER_INPUT = 0.05
+OUTPUT_MAX_TOKENS = 300
+
+# 호출 1건 평균 지연 (초) - 소요 시간 추정용
+DEFAULT_LATENCY_SEC = 1.2
+
+
+def estimate_review_costs(texts, prompt_tokens):
+    """
+    리뷰별 예상 입력/출력 토큰과 비용
+
+    Args:
+        texts: 리뷰 텍스트 Series
+        prompt_tokens: 리뷰를 제외한 프롬프트(시스템 메시지 포함) 토큰 수
+
+    Returns:
+        DataFrame: tokens_in, tokens_out, cost_usd
+    """
+    review_tokens = estimate_tokens_series(texts)
+    tokens_out = (OUTPUT_BASE_TOKENS + review_tokens * OUTPUT_TOKENS_PER_INPUT).clip(upper=OUTPUT_MAX_TOKENS).round().astype(int)
+    tokens_in = review_tokens + prompt_tokens
+
+    return pd.DataFrame({
+        'tokens_in': tokens_in,
+        'tokens_out': tokens_out,
+        'cost_usd': estimate_cost(tokens_in, tokens_out),
+    }, index=texts.index)
+
+
+def correction_probability(features, priors=None):
+    """
+    애매함 신호 → 보정 확률 (신호 독립 가정: 1 - Π(1 - p))
+
+    Args:
+        features: 불리언 신호 컬럼 DataFrame (CORRECTION_PRIORS의 키)
+        priors: 신호별 보정 확률 (None이면 CORRECTION_PRIORS)
+
+    Returns:
+        Series: 리뷰별 보정 확률
+    """
+    priors = priors or CORRECTION_PRIORS
+    keep = pd.Series(1.0, index=features.index)
+    for col, p in priors.items():
+        if col in features:
+            keep = keep * (1 - p * features[col].astype(float))
+    return 1 - keep
+
+
+def plan_selection(texts, features, prompt_tokens, budget_usd=None, budget_tokens=None,
+                   max_samples=None, priors=None):
+    """
+    예산 내 기대 보정 건수 최대화 선택
+
+    보정 확률 / 비용 비율이 높은 순으로 예산이 찰 때까지 선택
+    (리뷰 1건 비용이 예산에 비해 매우 작으므로 그리디가 최적해에 근접)
+
+    Args:
+        texts: 리뷰 텍스트 Series
+        features: 애매함 신호 DataFrame (texts와 같은 인덱스)
+        prompt_tokens: 리뷰를 제외한 프롬프트 토큰 수
+        budget_usd: 비용 예산 (USD)
+        budget_tokens: 토큰 예산 (입력+출력)
+        max_samples: 최대 선택 건수
+
+    Returns:
+        DataFrame: 선택된 리뷰의 tokens_in, tokens_out, cost_usd, p_correct (우선순위 순)
+    """
+    plan = estimate_review_costs(texts, prompt_tokens)
+    plan['p_correct'] = correction_probability(features, priors)
+    plan = plan[plan['p_correct'] > 0]
+
+    if budget_tokens is not None:
+        weight = plan['tokens_in'] + plan['tokens_out']
+        budget = budget_tokens
+    else:
+        weight = plan['cost_usd']
+        budget = budget_usd
+
+    plan = plan.assign(_ratio=plan['p_correct'] / weight, _weight=weight)
+    plan = plan.sort_values('_ratio', ascending=False, kind='stable')
+
+    if budget is not None:
+        plan = plan[plan['_weight'].cumsum() <= budget]
+    if max_samples is not None:
+        plan = plan.head(max_samples)
+
+    return plan.drop(columns=['_ratio', '_weight'])
+
+
+def summarize_plan(plan, latency_sec=DEFAULT_LATENCY_SEC, delay=0.0, concurrency=1):
+    """
+    선택 결과 → 예상 비용/시간 요약 dict
+
+    rate limit(delay)은 전체 워커가 공유하는 버킷 1개 → 동시 호출 수를 늘려도 초당 1/delay건을 넘지 않음
+    예상 시간 = 건수 × max(요청 간격, 지연 / 동시 호출 수)
+    """
+    n = len(plan)
+    runtime_sec = n * max(delay, latency_sec / max(concurrency, 1))
+    return {
+        'count': n,
+        'tokens_in': int(plan['tokens_in'].sum()),
+        'tokens_out': int(plan['tokens_out'].sum()),
+        'cost_usd': float(plan['cost_usd'].sum()),
+        'expected_corrections': float(plan['p_correct'].sum()) if 'p_correct' in plan else None,
+        'runtime_sec': runtime_sec,
+    }
+
+
+def print_plan_summary(plan, latency_sec=DEFAULT_LATENCY_SEC, delay=0.0, concurrency=1):
+    """API 호출 전 예상 비용/시간 출력"""
+    summary = summarize_plan(plan, latency_sec, delay, concurrency)
+    print(f"\n  [AI 보정] 실행 계획 (호출 전 추정):")
+    print(f"    - 대상: {summary['count']:,}건")
+    print(f"    - 예상 토큰: 입력 {summary['tokens_in']:,} / 출력 {summary['tokens_out']:,}")
+    print(f"    - 예상 비용: ${summary['cost_usd']:.4f}")
+    if summary['expected_corrections'] is not None:
+        print(f"    - 기대 보정 건수: {summary['expected_corrections']:,.0f}건")
+    print(f"    - 예상 소요 시간: {summary['runtime_sec'] / 60:.1f}분")
+    return summary
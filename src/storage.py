@@ -0,0 +1,815 @@
+"""
+GPT 분석 결과 저장소 (Oracle / SQLite)
+
+insert_to_db / gpt_analyzer_full / gpt_analyzer_manual / cleanup_empty / export_db_to_json에
+흩어져 있던 Oracle 전용 SQL(시퀀스, DUAL, CASCADE CONSTRAINTS, 빈 문자열=NULL 등)을 한곳에 모음
+
+- OracleRepository: 운영 DB (DB_CONNECTOR 또는 REVIEW_DB_URL로 만든 엔진)
+- SQLiteRepository: 같은 테이블 구조의 내장 DB (원본 리뷰 테이블 포함)
+  → 노트북에서 적재/내보내기 성능 개발, 벤치마크, 회귀 확인용
+
+선택: 환경변수 REVIEW_DB_URL이 sqlite:/// 로 시작하면 SQLite, 없으면 Oracle
+엔진/풀 생성은 src/db.py (open_repository()는 처음 호출할 때 공유 엔진을 만듦)
+
+태그 저장 방식: 환경변수 TAG_LAYOUT
+    rows (기본): TB_REVIEW_TAGS에 태그 1개당 1행
+    packed: TB_REVIEW_GPT_ANALYSIS의 *_MASK 컬럼 비트마스크 (src/tag_bits.py, 기존 DB는 migrate_tag_layout.py로 전환)
+
+변경 시각: ANALYZED_AT은 분석(적재) 시각 그대로 두고, 재분류로 바뀐 분석은 CHANGED_AT에 기록
+    증분 내보내기 / 요약 갱신은 ANALYZED_AT, CHANGED_AT 둘 다 워터마크로 사용 (latest_change)
+    기존 DB는 ensure_change_column이 컬럼 / 인덱스 추가
+"""
+
+import os
+from datetime import datetime
+
+from sqlalchemy import create_engine, event, text
+
+from src.bulk_loader import (
+    ANALYSIS_TABLE, PAIN_TABLE, POSITIVE_TABLE, TAG_TABLE, SEQUENCES, TAG_FIELDS,
+    BulkAnalysisLoader, IdAllocator, oracle_sequence_allocator,
+)
+from src.tag_bits import MASK_COLUMNS, TAG_BITS_TABLE, TagBitmap, mask_case
+
+# 자식 → 부모 순서 (삭제 순서)
+CHILD_TABLES = [TAG_TABLE, POSITIVE_TABLE, PAIN_TABLE]
+RESULT_TABLES = CHILD_TABLES + [ANALYSIS_TABLE]
+
+# 요약 테이블 (src/summary.py가 ANALYZED_AT / CHANGED_AT 워터마크로 갱신)
+SENTIMENT_SUMMARY_TABLE = 'TB_SUMMARY_SENTIMENT'
+TAG_SUMMARY_TABLE = 'TB_SUMMARY_TAGS'
+PAIN_SUMMARY_TABLE = 'TB_SUMMARY_PAIN'
+SUMMARY_SLICE_TABLE = 'TB_SUMMARY_SLICE'  # 분석 → (제품, 플랫폼, 월) (구간별 재집계를 인덱스로)
+SUMMARY_TABLES = [SENTIMENT_SUMMARY_TABLE, TAG_SUMMARY_TABLE, PAIN_SUMMARY_TABLE, SUMMARY_SLICE_TABLE,
+                  'TB_SUMMARY_DIRTY', 'TB_SUMMARY_STATE']
+
+# 삭제된 분석 기록 (delete_analyses가 남김 → 요약 갱신이 삭제된 분석의 구간만 다시 집계)
+DELETE_LOG_TABLE = 'TB_ANALYSIS_DELETE_LOG'
+
+# 태그 저장 방식
+TAG_LAYOUT_ROWS = 'rows'
+TAG_LAYOUT_PACKED = 'packed'
+
+
+class AnalysisRepository:
+    """
+    분석 결과 테이블 접근 (DB별 차이만 하위 클래스에서 구현)
+
+    Args:
+        engine: SQLAlchemy 엔진
+        tag_layout: rows / packed (None이면 환경변수 TAG_LAYOUT, 없으면 rows)
+    """
+
+    name = None
+
+    def __init__(self, engine, tag_layout=None):
+        self.engine = engine
+        self.tag_layout = tag_layout or os.getenv('TAG_LAYOUT', TAG_LAYOUT_ROWS)
+        if self.tag_layout not in (TAG_LAYOUT_ROWS, TAG_LAYOUT_PACKED):
+            raise ValueError(f"알 수 없는 TAG_LAYOUT: {self.tag_layout}")
+        # 새 태그 비트는 별도 연결에서 바로 커밋 (SQLite는 DB 단위 쓰기 잠금이라 적재 트랜잭션 안에서 할당)
+        self.tag_bits = TagBitmap(engine if engine.dialect.name != 'sqlite' else None)
+
+    @property
+    def packed_tags(self):
+        return self.tag_layout == TAG_LAYOUT_PACKED
+
+    # ===== 스키마 =====
+    def create_schema(self, drop=False):
+        """분석 결과 테이블 생성 (drop=True면 기존 테이블 삭제 후 재생성)"""
+        raise NotImplementedError
+
+    # ===== ID 할당 / 적재 =====
+    def allocate_ids(self, conn, sequence, n):
+        """시퀀스 값 n개 할당 → ID 목록"""
+        raise NotImplementedError
+
+    def id_allocator(self, block_size=1000):
+        return IdAllocator(self.allocate_ids, block_size)
+
+    def bulk_loader(self, conn, batch_size=1000, ids=None):
+        """이 DB용 ID 할당을 쓰는 BulkAnalysisLoader (packed면 태그를 마스크로 적재)"""
+        return BulkAnalysisLoader(conn, batch_size=batch_size, ids=ids or self.id_allocator(batch_size),
+                                  tag_bits=self.tag_bits if self.packed_tags else None)
+
+    # ===== 유지보수 =====
+    def ensure_change_column(self, conn):
+        """TB_REVIEW_GPT_ANALYSIS.CHANGED_AT 컬럼 / 인덱스 (없을 때만 추가)"""
+        raise NotImplementedError
+
+    def ensure_delete_log(self, conn):
+        """TB_ANALYSIS_DELETE_LOG 생성 (없을 때만)"""
+        raise NotImplementedError
+
+    def disable_review_fk(self, conn):
+        """REVIEW_ID → TB_CRAWLING_REVIEW FK 비활성화 (MANUAL 테이블의 음수 ID 적재용)"""
+        raise NotImplementedError
+
+    def empty_content_condition(self, column):
+        """본문이 비어 있는지 판단하는 조건식"""
+        raise NotImplementedError
+
+    def empty_content_analysis_ids(self, conn):
+        """원본 리뷰 본문이 비어 있는 분석 건의 ANALYSIS_ID"""
+        rows = conn.execute(text(f"""
+            SELECT a.ANALYSIS_ID
+            FROM TB_REVIEW_GPT_ANALYSIS a
+            JOIN TB_CRAWLING_REVIEW cr ON a.REVIEW_ID = cr.REVIEW_ID
+            WHERE {self.empty_content_condition('cr.REVIEW_CONTENT')}
+        """)).fetchall()
+        return [r[0] for r in rows]
+
+    def delete_analyses(self, conn, analysis_ids):
+        """
+        분석 건과 자식 행 삭제 (자식 → 부모 순서, 테이블별 DELETE ... IN 1문장)
+
+        analysis_ids는 1000개 이하 (Oracle IN 목록 한도, 많으면 src.maintenance.delete_analyses_where 사용)
+        삭제한 ANALYSIS_ID는 TB_ANALYSIS_DELETE_LOG에 남김 (테이블은 ensure_delete_log로 먼저 생성)
+
+        Returns:
+            dict: 테이블별 삭제 행 수
+        """
+        binds = {f'a{i}': aid for i, aid in enumerate(analysis_ids)}
+        counts = {table: 0 for table in RESULT_TABLES}
+        if not binds:
+            return counts
+        in_list = ', '.join(':' + k for k in binds)
+        conn.execute(text(f"""
+            INSERT INTO {DELETE_LOG_TABLE} (ANALYSIS_ID, DELETED_AT)
+            SELECT ANALYSIS_ID, CURRENT_TIMESTAMP FROM {ANALYSIS_TABLE} WHERE ANALYSIS_ID IN ({in_list})
+        """), binds)
+        for table in RESULT_TABLES:
+            counts[table] = conn.execute(text(f"DELETE FROM {table} WHERE ANALYSIS_ID IN ({in_list})"), binds).rowcount
+        return counts
+
+    def table_counts(self, conn):
+        return {table: conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+                for table in [ANALYSIS_TABLE, PAIN_TABLE, POSITIVE_TABLE, TAG_TABLE]}
+
+    # ===== 페이지 조회 =====
+    def limit_clause(self):
+        """:page_size 바인드를 쓰는 행 수 제한 구문"""
+        raise NotImplementedError
+
+    def iter_pages(self, conn, sql, key, params=None, page_size=5000):
+        """
+        키셋 페이지 조회 (OFFSET 없이 마지막 키 이후부터 → 페이지마다 인덱스 범위 탐색)
+
+        Args:
+            sql: WHERE 절 끝에 {after} 자리가 있고 ORDER BY key로 끝나는 쿼리 (첫 열이 key 값)
+            key: 정렬/페이지 기준 컬럼 (예: cr.REVIEW_ID)
+            page_size: 페이지 크기
+
+        Returns:
+            generator of 행 목록
+        """
+        after = None
+        while True:
+            page_params = dict(params or {}, page_size=page_size)
+            if after is None:
+                cond = ''
+            else:
+                cond = f"AND {key} > :after"
+                page_params['after'] = after
+            rows = conn.execute(text(sql.format(after=cond) + ' ' + self.limit_clause()), page_params).fetchall()
+            if not rows:
+                return
+            yield rows
+            if len(rows) < page_size:
+                return
+            after = rows[-1][0]
+
+    # ===== ID 매핑 (문자열 REVIEW_ID → 숫자 REVIEW_ID) =====
+    def ensure_id_map(self, conn):
+        """TB_REVIEW_ID_MAP 생성 (없을 때만)"""
+        raise NotImplementedError
+
+    # ===== 재분류 매핑 테이블 =====
+    def ensure_category_map(self, conn):
+        """TB_CATEGORY_MAP / TB_CATEGORY_MAP_VERSION 생성 (없을 때만)"""
+        raise NotImplementedError
+
+    # ===== 요약 테이블 =====
+    def ensure_summary_schema(self, conn):
+        """요약 테이블 생성 (없을 때만 - create_schema 없이 기존 DB에 추가)"""
+        raise NotImplementedError
+
+    def month_expr(self, column):
+        """날짜 컬럼 → 'YYYY-MM' 문자열 식"""
+        raise NotImplementedError
+
+    # ===== 태그 (rows / packed) =====
+    def ensure_tag_masks(self, conn):
+        """마스크 컬럼 + TB_TAG_BITS 생성 (없을 때만 - 기존 DB를 packed로 전환할 때)"""
+        raise NotImplementedError
+
+    def bitand(self, left, right):
+        """비트 AND 식"""
+        raise NotImplementedError
+
+    def tag_join(self, analysis_alias='a', tag_alias='t'):
+        """
+        분석 행 → 태그 JOIN 절 (tag_alias.TAG_TYPE / tag_alias.TAG_VALUE 사용 가능)
+
+        rows: TB_REVIEW_TAGS JOIN / packed: TB_TAG_BITS 중 마스크에 켜진 비트만 JOIN (분석 테이블 1번 스캔)
+        """
+        if not self.packed_tags:
+            return f"JOIN {TAG_TABLE} {tag_alias} ON {tag_alias}.ANALYSIS_ID = {analysis_alias}.ANALYSIS_ID"
+        mask = mask_case(analysis_alias, f'{tag_alias}.TAG_TYPE')
+        return f"JOIN {TAG_BITS_TABLE} {tag_alias} ON {self.bitand(mask, f'{tag_alias}.BIT_VALUE')} > 0"
+
+    def tag_source(self):
+        """TB_REVIEW_TAGS와 같은 컬럼(ANALYSIS_ID, ID, TAG_TYPE, TAG_VALUE)의 FROM 대상 (packed면 ID = BIT_NO)"""
+        if not self.packed_tags:
+            return TAG_TABLE
+        return (f"(SELECT x.ANALYSIS_ID, b.BIT_NO ID, b.TAG_TYPE, b.TAG_VALUE "
+                f"FROM {ANALYSIS_TABLE} x {self.tag_join('x', 'b')})")
+
+    def sync_id_map(self, conn, source_table, to_number, page_size=5000):
+        """
+        source_table의 REVIEW_ID 중 매핑이 없는 것만 변환해 TB_REVIEW_ID_MAP에 추가
+
+        Args:
+            source_table: 문자열 REVIEW_ID를 가진 원본 테이블 (예: TB_CRAWLING_REVIEW_MANUAL)
+            to_number: 문자열 ID → 숫자 ID 함수
+
+        Returns:
+            int: 새로 추가한 매핑 수
+        """
+        self.ensure_id_map(conn)
+        sql = f"""
+            SELECT m.REVIEW_ID FROM {source_table} m
+            WHERE NOT EXISTS (SELECT 'x' FROM TB_REVIEW_ID_MAP x
+                              WHERE x.SOURCE_TABLE = :source AND x.SOURCE_ID = m.REVIEW_ID)
+              {{after}}
+            ORDER BY m.REVIEW_ID
+        """
+        added = 0
+        for rows in self.iter_pages(conn, sql, 'm.REVIEW_ID', {'source': source_table}, page_size):
+            conn.execute(text("""
+                INSERT INTO TB_REVIEW_ID_MAP (SOURCE_TABLE, SOURCE_ID, REVIEW_ID)
+                VALUES (:source, :sid, :rid)
+            """), [{'source': source_table, 'sid': r[0], 'rid': to_number(r[0])} for r in rows])
+            added += len(rows)
+        return added
+
+
+# ===== Oracle =====
+class OracleRepository(AnalysisRepository):
+    name = 'oracle'
+
+    DROP_STATEMENTS = [
+        "DROP TABLE TB_SUMMARY_SENTIMENT",
+        "DROP TABLE TB_SUMMARY_TAGS",
+        "DROP TABLE TB_SUMMARY_PAIN",
+        "DROP TABLE TB_SUMMARY_DIRTY",
+        "DROP TABLE TB_SUMMARY_STATE",
+        "DROP TABLE TB_SUMMARY_SLICE",
+        "DROP TABLE TB_ANALYSIS_DELETE_LOG",
+        "DROP TABLE TB_TAG_BITS",
+        "DROP TABLE TB_REVIEW_TAGS CASCADE CONSTRAINTS",
+        "DROP TABLE TB_REVIEW_POSITIVE_POINTS CASCADE CONSTRAINTS",
+        "DROP TABLE TB_REVIEW_PAIN_POINTS CASCADE CONSTRAINTS",
+        "DROP TABLE TB_REVIEW_GPT_ANALYSIS CASCADE CONSTRAINTS",
+        "DROP SEQUENCE SEQ_GPT_ANALYSIS",
+        "DROP SEQUENCE SEQ_PAIN_POINTS",
+        "DROP SEQUENCE SEQ_POSITIVE_POINTS",
+        "DROP SEQUENCE SEQ_TAGS",
+    ]
+
+    CREATE_STATEMENTS = [
+        "CREATE SEQUENCE SEQ_GPT_ANALYSIS START WITH 1 INCREMENT BY 1",
+        "CREATE SEQUENCE SEQ_PAIN_POINTS START WITH 1 INCREMENT BY 1",
+        "CREATE SEQUENCE SEQ_POSITIVE_POINTS START WITH 1 INCREMENT BY 1",
+        "CREATE SEQUENCE SEQ_TAGS START WITH 1 INCREMENT BY 1",
+        """
+        CREATE TABLE TB_REVIEW_GPT_ANALYSIS (
+            ANALYSIS_ID   NUMBER        PRIMARY KEY,
+            REVIEW_ID     NUMBER        NOT NULL,
+            REVIEW_RATING NUMBER(1)     NOT NULL,
+            SENTIMENT     VARCHAR2(3)   NOT NULL,
+            TOKENS_INPUT  NUMBER,
+            TOKENS_OUTPUT NUMBER,
+            ANALYZED_AT   TIMESTAMP     DEFAULT SYSTIMESTAMP,
+            CHANGED_AT    TIMESTAMP,
+            BENEFIT_MASK  NUMBER(19),
+            TEXTURE_MASK  NUMBER(19),
+            USAGE_MASK    NUMBER(19),
+            VALUE_MASK    NUMBER(19),
+            CONSTRAINT FK_REVIEW FOREIGN KEY (REVIEW_ID)
+                REFERENCES TB_CRAWLING_REVIEW(REVIEW_ID),
+            CONSTRAINT CK_SENTIMENT CHECK (SENTIMENT IN ('POS', 'NEU', 'NEG'))
+        )
+        """,
+        """
+        CREATE TABLE TB_REVIEW_PAIN_POINTS (
+            ID          NUMBER        PRIMARY KEY,
+            ANALYSIS_ID NUMBER        NOT NULL,
+            POINT_TEXT  VARCHAR2(400) NOT NULL,
+            CATEGORY    VARCHAR2(200),
+            CONSTRAINT FK_PAIN_ANALYSIS FOREIGN KEY (ANALYSIS_ID)
+                REFERENCES TB_REVIEW_GPT_ANALYSIS(ANALYSIS_ID)
+        )
+        """,
+        """
+        CREATE TABLE TB_REVIEW_POSITIVE_POINTS (
+            ID          NUMBER        PRIMARY KEY,
+            ANALYSIS_ID NUMBER        NOT NULL,
+            POINT_TEXT  VARCHAR2(400) NOT NULL,
+            CATEGORY    VARCHAR2(200),
+            CONSTRAINT FK_POS_ANALYSIS FOREIGN KEY (ANALYSIS_ID)
+                REFERENCES TB_REVIEW_GPT_ANALYSIS(ANALYSIS_ID)
+        )
+        """,
+        """
+        CREATE TABLE TB_REVIEW_TAGS (
+            ID          NUMBER        PRIMARY KEY,
+            ANALYSIS_ID NUMBER        NOT NULL,
+            TAG_TYPE    VARCHAR2(20)  NOT NULL,
+            TAG_VALUE   VARCHAR2(100) NOT NULL,
+            CONSTRAINT FK_TAG_ANALYSIS FOREIGN KEY (ANALYSIS_ID)
+                REFERENCES TB_REVIEW_GPT_ANALYSIS(ANALYSIS_ID),
+            CONSTRAINT CK_TAG_TYPE CHECK (TAG_TYPE IN ('BENEFIT', 'TEXTURE', 'USAGE', 'VALUE'))
+        )
+        """,
+    ]
+
+    CHANGED_AT_INDEX = "CREATE INDEX IDX_GPT_CHANGED_AT ON TB_REVIEW_GPT_ANALYSIS(CHANGED_AT)"
+
+    INDEX_STATEMENTS = [
+        "CREATE INDEX IDX_GPT_REVIEW_ID ON TB_REVIEW_GPT_ANALYSIS(REVIEW_ID)",
+        "CREATE INDEX IDX_GPT_SENTIMENT ON TB_REVIEW_GPT_ANALYSIS(SENTIMENT)",
+        "CREATE INDEX IDX_PAIN_ANALYSIS ON TB_REVIEW_PAIN_POINTS(ANALYSIS_ID)",
+        "CREATE INDEX IDX_PAIN_CATEGORY ON TB_REVIEW_PAIN_POINTS(CATEGORY)",
+        "CREATE INDEX IDX_POS_ANALYSIS  ON TB_REVIEW_POSITIVE_POINTS(ANALYSIS_ID)",
+        "CREATE INDEX IDX_POS_CATEGORY  ON TB_REVIEW_POSITIVE_POINTS(CATEGORY)",
+        "CREATE INDEX IDX_TAG_ANALYSIS  ON TB_REVIEW_TAGS(ANALYSIS_ID)",
+        "CREATE INDEX IDX_TAG_TYPE      ON TB_REVIEW_TAGS(TAG_TYPE, TAG_VALUE)",
+        "CREATE INDEX IDX_GPT_ANALYZED_AT ON TB_REVIEW_GPT_ANALYSIS(ANALYZED_AT)",
+        CHANGED_AT_INDEX,
+    ]
+
+    # 요약: 제품 × 플랫폼 × 월 단위 (브랜드는 보고서에서 제품명 정규화로 묶음)
+    SUMMARY_STATEMENTS = [
+        """
+        CREATE TABLE TB_SUMMARY_SENTIMENT (
+            PRODUCT_NAME VARCHAR2(1000) NOT NULL,
+            PLATFORM     VARCHAR2(100)  NOT NULL,
+            REVIEW_MONTH VARCHAR2(7)    NOT NULL,
+            SENTIMENT    VARCHAR2(3)    NOT NULL,
+            REVIEW_COUNT NUMBER         NOT NULL,
+            RATING_SUM   NUMBER         NOT NULL,
+            CONSTRAINT PK_SUMMARY_SENTIMENT PRIMARY KEY (PRODUCT_NAME, PLATFORM, REVIEW_MONTH, SENTIMENT)
+        )
+        """,
+        """
+        CREATE TABLE TB_SUMMARY_TAGS (
+            PRODUCT_NAME VARCHAR2(1000) NOT NULL,
+            PLATFORM     VARCHAR2(100)  NOT NULL,
+            REVIEW_MONTH VARCHAR2(7)    NOT NULL,
+            TAG_TYPE     VARCHAR2(20)   NOT NULL,
+            TAG_VALUE    VARCHAR2(100)  NOT NULL,
+            TAG_COUNT    NUMBER         NOT NULL,
+            CONSTRAINT PK_SUMMARY_TAGS PRIMARY KEY (PRODUCT_NAME, PLATFORM, REVIEW_MONTH, TAG_TYPE, TAG_VALUE)
+        )
+        """,
+        """
+        CREATE TABLE TB_SUMMARY_PAIN (
+            PRODUCT_NAME VARCHAR2(1000) NOT NULL,
+            PLATFORM     VARCHAR2(100)  NOT NULL,
+            REVIEW_MONTH VARCHAR2(7)    NOT NULL,
+            CATEGORY     VARCHAR2(200)  NOT NULL,
+            POINT_COUNT  NUMBER         NOT NULL,
+            REVIEW_COUNT NUMBER         NOT NULL,
+            CONSTRAINT PK_SUMMARY_PAIN PRIMARY KEY (PRODUCT_NAME, PLATFORM, REVIEW_MONTH, CATEGORY)
+        )
+        """,
+        """
+        CREATE GLOBAL TEMPORARY TABLE TB_SUMMARY_DIRTY (
+            PRODUCT_NAME VARCHAR2(1000) NOT NULL,
+            PLATFORM     VARCHAR2(100)  NOT NULL,
+            REVIEW_MONTH VARCHAR2(7)    NOT NULL
+        ) ON COMMIT DELETE ROWS
+        """,
+        """
+        CREATE TABLE TB_SUMMARY_STATE (
+            NAME             VARCHAR2(30) PRIMARY KEY,
+            LAST_ANALYSIS_ID NUMBER,
+            LAST_ANALYZED_AT TIMESTAMP,
+            REFRESHED_AT     TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE TB_SUMMARY_SLICE (
+            ANALYSIS_ID  NUMBER         PRIMARY KEY,
+            PRODUCT_NAME VARCHAR2(1000) NOT NULL,
+            PLATFORM     VARCHAR2(100)  NOT NULL,
+            REVIEW_MONTH VARCHAR2(7)    NOT NULL
+        )
+        """,
+    ]
+
+    SUMMARY_INDEX_STATEMENTS = [
+        "CREATE INDEX IDX_SUMMARY_SLICE_KEY ON TB_SUMMARY_SLICE(PRODUCT_NAME, PLATFORM, REVIEW_MONTH)",
+    ]
+
+    DELETE_LOG_STATEMENTS = [
+        """
+        CREATE TABLE TB_ANALYSIS_DELETE_LOG (
+            ANALYSIS_ID NUMBER    NOT NULL,
+            DELETED_AT  TIMESTAMP NOT NULL
+        )
+        """,
+        "CREATE INDEX IDX_DELETE_LOG_AT ON TB_ANALYSIS_DELETE_LOG(DELETED_AT)",
+    ]
+
+    def create_schema(self, drop=False):
+        if drop:
+            with self.engine.begin() as conn:
+                for stmt in self.DROP_STATEMENTS:
+                    try:
+                        conn.execute(text(stmt))
+                    except Exception:
+                        pass  # 없으면 무시
+        with self.engine.begin() as conn:
+            for stmt in self.CREATE_STATEMENTS + self.INDEX_STATEMENTS + self.SUMMARY_STATEMENTS + \
+                    self.SUMMARY_INDEX_STATEMENTS + self.TAG_BITS_STATEMENTS + self.DELETE_LOG_STATEMENTS:
+                conn.execute(text(stmt))
+
+    def allocate_ids(self, conn, sequence, n):
+        return oracle_sequence_allocator(conn, sequence, n)
+
+    ID_MAP_STATEMENTS = [
+        """
+        CREATE TABLE TB_REVIEW_ID_MAP (
+            SOURCE_TABLE VARCHAR2(50)  NOT NULL,
+            SOURCE_ID    VARCHAR2(200) NOT NULL,
+            REVIEW_ID    NUMBER        NOT NULL,
+            CONSTRAINT PK_REVIEW_ID_MAP PRIMARY KEY (SOURCE_TABLE, SOURCE_ID)
+        )
+        """,
+        "CREATE INDEX IDX_ID_MAP_REVIEW_ID ON TB_REVIEW_ID_MAP(REVIEW_ID)",
+    ]
+
+    # 재분류 매핑 (src.maintenance.sync_category_map: 바뀐 항목만 VERSION 증가 → 그 항목에 해당하는 행만 UPDATE)
+    CATEGORY_MAP_STATEMENTS = [
+        """
+        CREATE TABLE TB_CATEGORY_MAP (
+            MAP_NAME     VARCHAR2(30)  NOT NULL,
+            SOURCE_VALUE VARCHAR2(400) NOT NULL,
+            TARGET_VALUE VARCHAR2(200) NOT NULL,
+            VERSION      NUMBER        NOT NULL,
+            CONSTRAINT PK_CATEGORY_MAP PRIMARY KEY (MAP_NAME, SOURCE_VALUE)
+        )
+        """,
+        """
+        CREATE TABLE TB_CATEGORY_MAP_VERSION (
+            MAP_NAME        VARCHAR2(30) PRIMARY KEY,
+            VERSION         NUMBER       NOT NULL,
+            APPLIED_VERSION NUMBER       NOT NULL,
+            UPDATED_AT      TIMESTAMP,
+            APPLIED_AT      TIMESTAMP
+        )
+        """,
+    ]
+
+    # 태그 값 → 비트 (packed 방식, 값이 처음 나올 때 src.tag_bits.TagBitmap이 다음 비트 할당)
+    TAG_BITS_STATEMENTS = [
+        """
+        CREATE TABLE TB_TAG_BITS (
+            TAG_TYPE  VARCHAR2(20)  NOT NULL,
+            TAG_VALUE VARCHAR2(100) NOT NULL,
+            BIT_NO    NUMBER(2)     NOT NULL,
+            BIT_VALUE NUMBER(19)    NOT NULL,
+            CONSTRAINT PK_TAG_BITS PRIMARY KEY (TAG_TYPE, TAG_VALUE),
+            CONSTRAINT UK_TAG_BITS_NO UNIQUE (TAG_TYPE, BIT_NO)
+        )
+        """,
+    ]
+
+    def disable_review_fk(self, conn):
+        conn.execute(text("ALTER TABLE TB_REVIEW_GPT_ANALYSIS DISABLE CONSTRAINT FK_REVIEW"))
+
+    def limit_clause(self):
+        return "FETCH FIRST :page_size ROWS ONLY"
+
+    def _create_missing(self, conn, table, statements):
+        exists = conn.execute(text("SELECT COUNT(*) FROM USER_TABLES WHERE TABLE_NAME = :name"),
+                              {'name': table}).scalar()
+        if not exists:
+            for stmt in statements:
+                conn.execute(text(stmt))
+
+    def ensure_id_map(self, conn):
+        self._create_missing(conn, 'TB_REVIEW_ID_MAP', self.ID_MAP_STATEMENTS)
+
+    def ensure_summary_schema(self, conn):
+        for stmt in self.SUMMARY_STATEMENTS:
+            table = stmt.split('TABLE', 1)[1].split('(', 1)[0].strip()
+            indexes = [s for s in self.SUMMARY_INDEX_STATEMENTS if f" ON {table}(" in s]
+            self._create_missing(conn, table, [stmt] + indexes)
+
+    def ensure_delete_log(self, conn):
+        self._create_missing(conn, DELETE_LOG_TABLE, self.DELETE_LOG_STATEMENTS)
+
+    def ensure_category_map(self, conn):
+        for stmt in self.CATEGORY_MAP_STATEMENTS:
+            table = stmt.split('TABLE', 1)[1].split('(', 1)[0].strip()
+            self._create_missing(conn, table, [stmt])
+
+    def month_expr(self, column):
+        return f"TO_CHAR({column}, 'YYYY-MM')"
+
+    def ensure_tag_masks(self, conn):
+        existing = {r[0] for r in conn.execute(text(
+            "SELECT COLUMN_NAME FROM USER_TAB_COLUMNS WHERE TABLE_NAME = :name"), {'name': ANALYSIS_TABLE})}
+        for column in MASK_COLUMNS.values():
+            if column not in existing:
+                conn.execute(text(f"ALTER TABLE {ANALYSIS_TABLE} ADD ({column} NUMBER(19))"))
+        self._create_missing(conn, TAG_BITS_TABLE, self.TAG_BITS_STATEMENTS)
+
+    def bitand(self, left, right):
+        return f"BITAND({left}, {right})"
+
+    def ensure_change_column(self, conn):
+        exists = conn.execute(text(
+            "SELECT COUNT(*) FROM USER_TAB_COLUMNS WHERE TABLE_NAME = :name AND COLUMN_NAME = 'CHANGED_AT'"
+        ), {'name': ANALYSIS_TABLE}).scalar()
+        if not exists:
+            conn.execute(text(f"ALTER TABLE {ANALYSIS_TABLE} ADD (CHANGED_AT TIMESTAMP)"))
+            conn.execute(text(self.CHANGED_AT_INDEX))
+
+    def empty_content_condition(self, column):
+        # Oracle은 빈 문자열을 NULL로 취급
+        return f"({column} IS NULL OR TRIM({column}) IS NULL)"
+
+
+def _use_explicit_begin(engine):
+    """
+    pysqlite 트랜잭션을 SQLAlchemy가 직접 시작하도록 설정
+
+    pysqlite는 DML 직전에야 BEGIN을 보내서 SAVEPOINT가 트랜잭션 밖에서 시작되고 RELEASE가 곧 커밋이 됨
+    (DbSink 세이브포인트 격리가 깨짐) → 드라이버 자동 BEGIN을 끄고 begin 시점에 BEGIN 실행
+    """
+    if getattr(engine, '_explicit_begin', False):
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _disable_driver_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _begin(conn):
+        conn.exec_driver_sql('BEGIN')
+
+    engine._explicit_begin = True
+
+
+# ===== SQLite =====
+class SQLiteRepository(AnalysisRepository):
+    """
+    Oracle 스키마를 흉내 낸 내장 DB
+
+    - 시퀀스는 TB_SEQUENCES 테이블로 대체 (할당이 트랜잭션에 묶이므로 writer 1개 전제)
+    - 원본 리뷰 테이블(TB_CRAWLING_REVIEW, TB_CRAWLING_REVIEW_MANUAL)과 ID 매핑 테이블도 함께 생성 → load_reviews로 채움
+    - REVIEW_ID FK는 만들지 않음 (Oracle에서도 MANUAL 적재 시 비활성화)
+
+    Args:
+        engine: sqlite 엔진 (None이면 path로 생성)
+        path: DB 파일 경로 (':memory:'면 메모리)
+    """
+
+    name = 'sqlite'
+
+    SOURCE_STATEMENTS = [
+        """
+        CREATE TABLE IF NOT EXISTS TB_CRAWLING_REVIEW (
+            REVIEW_ID       INTEGER PRIMARY KEY,
+            PRODUCT_NAME    TEXT,
+            REVIEW_CONTENT  TEXT,
+            REVIEW_RATING   INTEGER,
+            REVIEW_DATE     TIMESTAMP,
+            REVIEWER_INFO   TEXT,
+            ADDITIONAL_INFO TEXT,
+            TAGS            TEXT,
+            PLATFORM_CODE   TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS TB_CRAWLING_REVIEW_MANUAL (
+            REVIEW_ID      TEXT PRIMARY KEY,
+            REVIEW_CONTENT TEXT,
+            REVIEW_RATING  INTEGER
+        )
+        """,
+        "CREATE TABLE IF NOT EXISTS TB_SEQUENCES (NAME TEXT PRIMARY KEY, LAST_VALUE INTEGER NOT NULL)",
+        """
+        CREATE TABLE IF NOT EXISTS TB_REVIEW_ID_MAP (
+            SOURCE_TABLE TEXT    NOT NULL,
+            SOURCE_ID    TEXT    NOT NULL,
+            REVIEW_ID    INTEGER NOT NULL,
+            PRIMARY KEY (SOURCE_TABLE, SOURCE_ID)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS IDX_ID_MAP_REVIEW_ID ON TB_REVIEW_ID_MAP(REVIEW_ID)",
+    ]
+
+    CREATE_STATEMENTS = [
+        """
+        CREATE TABLE IF NOT EXISTS TB_REVIEW_GPT_ANALYSIS (
+            ANALYSIS_ID   INTEGER PRIMARY KEY,
+            REVIEW_ID     INTEGER NOT NULL,
+            REVIEW_RATING INTEGER NOT NULL,
+            SENTIMENT     TEXT    NOT NULL CHECK (SENTIMENT IN ('POS', 'NEU', 'NEG')),
+            TOKENS_INPUT  INTEGER,
+            TOKENS_OUTPUT INTEGER,
+            ANALYZED_AT   TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            CHANGED_AT    TIMESTAMP,
+            BENEFIT_MASK  INTEGER,
+            TEXTURE_MASK  INTEGER,
+            USAGE_MASK    INTEGER,
+            VALUE_MASK    INTEGER
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS TB_REVIEW_PAIN_POINTS (
+            ID          INTEGER PRIMARY KEY,
+            ANALYSIS_ID INTEGER NOT NULL REFERENCES TB_REVIEW_GPT_ANALYSIS(ANALYSIS_ID),
+            POINT_TEXT  TEXT    NOT NULL,
+            CATEGORY    TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS TB_REVIEW_POSITIVE_POINTS (
+            ID          INTEGER PRIMARY KEY,
+            ANALYSIS_ID INTEGER NOT NULL REFERENCES TB_REVIEW_GPT_ANALYSIS(ANALYSIS_ID),
+            POINT_TEXT  TEXT    NOT NULL,
+            CATEGORY    TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS TB_REVIEW_TAGS (
+            ID          INTEGER PRIMARY KEY,
+            ANALYSIS_ID INTEGER NOT NULL REFERENCES TB_REVIEW_GPT_ANALYSIS(ANALYSIS_ID),
+            TAG_TYPE    TEXT    NOT NULL CHECK (TAG_TYPE IN ('BENEFIT', 'TEXTURE', 'USAGE', 'VALUE')),
+            TAG_VALUE   TEXT    NOT NULL
+        )
+        """,
+    ]
+
+    INDEX_STATEMENTS = [s.replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS')
+                        for s in OracleRepository.INDEX_STATEMENTS]
+    CHANGED_AT_INDEX = OracleRepository.CHANGED_AT_INDEX.replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS')
+
+    SUMMARY_STATEMENTS = [
+        s.replace('CREATE GLOBAL TEMPORARY TABLE', 'CREATE TABLE').replace(' ON COMMIT DELETE ROWS', '')
+         .replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS')
+        for s in OracleRepository.SUMMARY_STATEMENTS
+    ]
+
+    SUMMARY_INDEX_STATEMENTS = [s.replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS')
+                                for s in OracleRepository.SUMMARY_INDEX_STATEMENTS]
+
+    TAG_BITS_STATEMENTS = [s.replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS')
+                           for s in OracleRepository.TAG_BITS_STATEMENTS]
+
+    DELETE_LOG_STATEMENTS = [s.replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS')
+                             .replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS')
+                             for s in OracleRepository.DELETE_LOG_STATEMENTS]
+
+    CATEGORY_MAP_STATEMENTS = [s.replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS')
+                               for s in OracleRepository.CATEGORY_MAP_STATEMENTS]
+
+    def __init__(self, engine=None, path='output/review_analysis.db', tag_layout=None):
+        if engine is None:
+            if path != ':memory:':
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            engine = create_engine(f"sqlite:///{path}")
+        _use_explicit_begin(engine)
+        super().__init__(engine, tag_layout)
+        with self.engine.begin() as conn:
+            for stmt in self.SOURCE_STATEMENTS:
+                conn.execute(text(stmt))
+
+    def create_schema(self, drop=False):
+        with self.engine.begin() as conn:
+            if drop:
+                for table in SUMMARY_TABLES + [TAG_BITS_TABLE, DELETE_LOG_TABLE] + RESULT_TABLES:
+                    conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+                conn.execute(text("DELETE FROM TB_SEQUENCES"))
+            for stmt in self.CREATE_STATEMENTS + self.INDEX_STATEMENTS + self.SUMMARY_STATEMENTS + \
+                    self.SUMMARY_INDEX_STATEMENTS + self.TAG_BITS_STATEMENTS + self.DELETE_LOG_STATEMENTS:
+                conn.execute(text(stmt))
+
+    def allocate_ids(self, conn, sequence, n):
+        conn.execute(text("INSERT OR IGNORE INTO TB_SEQUENCES (NAME, LAST_VALUE) VALUES (:name, 0)"),
+                     {'name': sequence})
+        conn.execute(text("UPDATE TB_SEQUENCES SET LAST_VALUE = LAST_VALUE + :n WHERE NAME = :name"),
+                     {'name': sequence, 'n': n})
+        last = conn.execute(text("SELECT LAST_VALUE FROM TB_SEQUENCES WHERE NAME = :name"),
+                            {'name': sequence}).scalar()
+        return list(range(last - n + 1, last + 1))
+
+    def disable_review_fk(self, conn):
+        pass  # REVIEW_ID FK 없음
+
+    def limit_clause(self):
+        return "LIMIT :page_size"
+
+    def ensure_id_map(self, conn):
+        pass  # 생성 시 함께 만듦
+
+    def ensure_summary_schema(self, conn):
+        for stmt in self.SUMMARY_STATEMENTS + self.SUMMARY_INDEX_STATEMENTS:
+            conn.execute(text(stmt))
+
+    def ensure_delete_log(self, conn):
+        for stmt in self.DELETE_LOG_STATEMENTS:
+            conn.execute(text(stmt))
+
+    def ensure_category_map(self, conn):
+        for stmt in self.CATEGORY_MAP_STATEMENTS:
+            conn.execute(text(stmt))
+
+    def month_expr(self, column):
+        return f"strftime('%Y-%m', {column})"
+
+    def ensure_tag_masks(self, conn):
+        existing = {r[1] for r in conn.execute(text(f"PRAGMA table_info({ANALYSIS_TABLE})"))}
+        for column in MASK_COLUMNS.values():
+            if column not in existing:
+                conn.execute(text(f"ALTER TABLE {ANALYSIS_TABLE} ADD COLUMN {column} INTEGER"))
+        for stmt in self.TAG_BITS_STATEMENTS:
+            conn.execute(text(stmt))
+
+    def bitand(self, left, right):
+        return f"({left} & {right})"
+
+    def ensure_change_column(self, conn):
+        existing = {r[1] for r in conn.execute(text(f"PRAGMA table_info({ANALYSIS_TABLE})"))}
+        if 'CHANGED_AT' not in existing:
+            conn.execute(text(f"ALTER TABLE {ANALYSIS_TABLE} ADD COLUMN CHANGED_AT TIMESTAMP"))
+        conn.execute(text(self.CHANGED_AT_INDEX))
+
+    def empty_content_condition(self, column):
+        return f"({column} IS NULL OR TRIM({column}) = '')"
+
+    def load_reviews(self, df, manual=False):
+        """
+        원본 리뷰 DataFrame → TB_CRAWLING_REVIEW(_MANUAL) 적재 (이미 있는 REVIEW_ID는 덮어씀)
+
+        CSV/JSON 컬럼명(BRAND_NAME, REVIEW_ADDITIONAL_INFO, PURCHASE_TAG)도 허용
+        """
+        if manual:
+            table, columns = 'TB_CRAWLING_REVIEW_MANUAL', ['REVIEW_ID', 'REVIEW_CONTENT', 'REVIEW_RATING']
+        else:
+            table = 'TB_CRAWLING_REVIEW'
+            columns = ['REVIEW_ID', 'PRODUCT_NAME', 'REVIEW_CONTENT', 'REVIEW_RATING', 'REVIEW_DATE',
+                       'REVIEWER_INFO', 'ADDITIONAL_INFO', 'TAGS', 'PLATFORM_CODE']
+        df = df.rename(columns={'BRAND_NAME': 'PRODUCT_NAME', 'REVIEW_ADDITIONAL_INFO': 'ADDITIONAL_INFO',
+                                'PURCHASE_TAG': 'TAGS'})
+        df = df.dropna(subset=['REVIEW_ID']).reindex(columns=columns)
+        rows = df.astype(object).where(df.notna(), None).to_dict('records')
+        placeholders = ', '.join(f':{c}' for c in columns)
+        with self.engine.begin() as conn:
+            conn.execute(text(f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"),
+                         rows)
+        return len(rows)
+
+
+# ===== 변경 시각 =====
+# 워터마크 이후 적재되었거나(ANALYZED_AT) 재분류된(CHANGED_AT) 분석 (별칭 a, 바인드 :since)
+CHANGED_SINCE_CONDITION = "a.ANALYZED_AT >= :since OR a.CHANGED_AT >= :since"
+
+
+def latest_change(conn):
+    """분석 테이블의 마지막 적재 / 변경 시각 (ANALYZED_AT, CHANGED_AT 중 늦은 것, 없으면 None)"""
+    row = conn.execute(text(f"SELECT MAX(ANALYZED_AT), MAX(CHANGED_AT) FROM {ANALYSIS_TABLE}")).fetchone()
+    values = [v for v in row if v is not None]
+    return max(values) if values else None
+
+
+def latest_change_or_delete(conn):
+    """
+    적재 / 재분류 / 삭제 중 가장 늦은 시각 (모두 DB 시계 기준, 없으면 None)
+
+    TB_ANALYSIS_DELETE_LOG로 삭제를 찾는 증분 갱신(요약 테이블, 내보내기)의 워터마크
+    SQLite는 TIMESTAMP를 문자열로 돌려주므로 datetime으로 맞춰 비교
+    """
+    values = [latest_change(conn), conn.execute(text(f"SELECT MAX(DELETED_AT) FROM {DELETE_LOG_TABLE}")).scalar()]
+    values = [v if isinstance(v, datetime) else datetime.fromisoformat(str(v)) for v in values if v is not None]
+    return max(values) if values else None
+
+
+# ===== 선택 =====
+def open_repository(url=None):
+    """
+    저장소 열기
+
+    Args:
+        url: SQLAlchemy URL (None이면 src.db의 공유 엔진/풀 - REVIEW_DB_URL 또는 DB_CONNECTOR로 첫 사용 때 생성)
+    """
+    from src.db import create_pooled_engine, get_repository, repository_for
+    if url is None:
+        return get_repository()
+    return repository_for(create_pooled_engine(url))
@@ -0,0 +1,231 @@
+"""
+요약 테이블 (대시보드 / 보고서용 사전 집계)
+
+대시보드와 보고서가 매번 TB_REVIEW_GPT_ANALYSIS / TB_REVIEW_TAGS / TB_REVIEW_PAIN_POINTS 전체를
+Python으로 읽어 집계하던 것을 DB의 작은 집계 테이블 조회로 대체
+
+- 집계 단위: 제품 × 플랫폼 × 월 (+ 감성 / 태그 / Pain 카테고리)
+  브랜드는 제품명 정규화(ProductNameNormalizer)로 묶이므로 DB에는 원본 제품명 단위로 두고
+  read_summary(brand_fn=...)가 읽을 때 브랜드로 합침 (제품 수백 개 × 월 수준이라 작음)
+- 구간 색인: TB_SUMMARY_SLICE에 분석별 (제품, 플랫폼, 월)을 인덱스 컬럼으로 저장
+  → 재집계는 TB_SUMMARY_DIRTY → TB_SUMMARY_SLICE(인덱스) → 분석 PK 순으로 해당 구간 분석만 읽음
+- 증분 갱신: ANALYSIS_ID > 마지막 ID 또는 ANALYZED_AT / CHANGED_AT >= 마지막 시각 - overlap 인 분석과
+  TB_ANALYSIS_DELETE_LOG에 DELETED_AT >= 마지막 시각 - overlap 으로 남은 삭제 분석을 먼저 모으고,
+  이 분석들의 이전 구간(TB_SUMMARY_SLICE)과 새 구간만 TB_SUMMARY_DIRTY에 모아 해당 행을 지우고 다시 집계
+  (신규 적재, 재분류로 CHANGED_AT이 갱신된 분석, cleanup_empty 등으로 삭제된 분석 모두 반영 - 전체 COUNT 없음)
+- 워터마크는 TB_SUMMARY_STATE에 같은 트랜잭션으로 저장 → 중간에 실패하면 요약도 이전 상태 그대로
+"""
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+from sqlalchemy import text
+
+from src.storage import (
+    CHANGED_SINCE_CONDITION, DELETE_LOG_TABLE, PAIN_SUMMARY_TABLE, SENTIMENT_SUMMARY_TABLE, SUMMARY_SLICE_TABLE,
+    TAG_SUMMARY_TABLE, latest_change_or_delete
+)
+
+
+STATE_NAME = 'SUMMARY_SLICE'  # 구간 색인 도입 전 상태('SUMMARY')는 무시 → 첫 실행은 전체 재집계로 색인 채움
+SLICE_COLUMNS = ['PRODUCT_NAME', 'PLATFORM', 'REVIEW_MONTH']
+
+# 요약 테이블 → (추가 차원 식, 집계 식, 상세 JOIN)
+SUMMARY_SPECS = {
+    SENTIMENT_SUMMARY_TABLE: {
+        'dims': {'SENTIMENT': 'a.SENTIMENT'},
+        'measures': {'REVIEW_COUNT': 'COUNT(*)', 'RATING_SUM': 'SUM(a.REVIEW_RATING)'},
+        'join': '',
+    },
+    TAG_SUMMARY_TABLE: {
+        'dims': {'TAG_TYPE': 't.TAG_TYPE', 'TAG_VALUE': 't.TAG_VALUE'},
+        'measures': {'TAG_COUNT': 'COUNT(*)'},
+        'join': None,  # 저장소의 tag_join (rows: TB_REVIEW_TAGS / packed: 마스크 비트 → 분석 테이블만 스캔)
+    },
+    PAIN_SUMMARY_TABLE: {
+        'dims': {'CATEGORY': "COALESCE(p.CATEGORY, '-')"},
+        'measures': {'POINT_COUNT': 'COUNT(*)', 'REVIEW_COUNT': 'COUNT(DISTINCT a.ANALYSIS_ID)'},
+        'join': 'JOIN TB_REVIEW_PAIN_POINTS p ON p.ANALYSIS_ID = a.ANALYSIS_ID',
+    },
+}
+
+
+def slice_exprs(repo):
+    """(제품, 플랫폼, 월) 식 - 플랫폼은 analysis_export.normalize_platform과 같은 규칙, 값이 없으면 '-'"""
+    return {
+        'PRODUCT_NAME': "COALESCE(cr.PRODUCT_NAME, '-')",
+        'PLATFORM': ("CASE WHEN UPPER(cr.PLATFORM_CODE) LIKE '%OLIVEYOUNG%' THEN 'OLIVEYOUNG' "
+                     "WHEN UPPER(cr.PLATFORM_CODE) LIKE '%COUPANG%' THEN 'COUPANG' "
+                     "ELSE COALESCE(cr.PLATFORM_CODE, '-') END"),
+        'REVIEW_MONTH': f"COALESCE({repo.month_expr('cr.REVIEW_DATE')}, '-')",
+    }
+
+
+def _index_slices(conn, repo, where='', params=None):
+    """분석 → (제품, 플랫폼, 월)을 TB_SUMMARY_SLICE에 기록 (where: 분석 조건, 별칭 a)"""
+    return conn.execute(text(f"""
+        INSERT INTO {SUMMARY_SLICE_TABLE} (ANALYSIS_ID, {', '.join(SLICE_COLUMNS)})
+        SELECT a.ANALYSIS_ID, {', '.join(slice_exprs(repo).values())}
+        FROM TB_REVIEW_GPT_ANALYSIS a
+        JOIN TB_CRAWLING_REVIEW cr ON a.REVIEW_ID = cr.REVIEW_ID
+        {where}
+    """), params or {}).rowcount
+
+
+def _aggregate(conn, repo, table, dirty_only):
+    """구간 색인 + 상세 테이블 → 요약 테이블 INSERT ... SELECT ... GROUP BY (dirty_only면 표시된 구간만)"""
+    spec = SUMMARY_SPECS[table]
+    join = repo.tag_join('a', 't') if spec['join'] is None else spec['join']
+    keys = dict({col: f"s.{col}" for col in SLICE_COLUMNS}, **spec['dims'])
+    columns = list(keys) + list(spec['measures'])
+    select = ', '.join(list(keys.values()) + list(spec['measures'].values()))
+    source = f"{SUMMARY_SLICE_TABLE} s"
+    if dirty_only:
+        matches = ' AND '.join(f"s.{col} = d.{col}" for col in SLICE_COLUMNS)
+        source = f"TB_SUMMARY_DIRTY d JOIN {SUMMARY_SLICE_TABLE} s ON {matches}"
+    return conn.execute(text(f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        SELECT {select}
+        FROM {source}
+        JOIN TB_REVIEW_GPT_ANALYSIS a ON a.ANALYSIS_ID = s.ANALYSIS_ID
+        {join}
+        GROUP BY {', '.join(keys.values())}
+    """)).rowcount
+
+
+def _as_datetime(value):
+    """SQLite는 TIMESTAMP를 문자열로 돌려줌"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def load_summary_state(conn):
+    """마지막 갱신 워터마크 → dict 또는 None"""
+    row = conn.execute(text("""
+        SELECT LAST_ANALYSIS_ID, LAST_ANALYZED_AT, REFRESHED_AT FROM TB_SUMMARY_STATE WHERE NAME = :name
+    """), {'name': STATE_NAME}).fetchone()
+    if row is None:
+        return None
+    return {'last_analysis_id': row[0], 'last_analyzed_at': _as_datetime(row[1]),
+            'refreshed_at': _as_datetime(row[2])}
+
+
+def _save_summary_state(conn, last_id, last_analyzed_at):
+    params = {'name': STATE_NAME, 'last_id': last_id, 'last_at': _as_datetime(last_analyzed_at),
+              'now': datetime.now()}
+    updated = conn.execute(text("""
+        UPDATE TB_SUMMARY_STATE
+        SET LAST_ANALYSIS_ID = :last_id, LAST_ANALYZED_AT = :last_at, REFRESHED_AT = :now
+        WHERE NAME = :name
+    """), params).rowcount
+    if not updated:
+        conn.execute(text("""
+            INSERT INTO TB_SUMMARY_STATE (NAME, LAST_ANALYSIS_ID, LAST_ANALYZED_AT, REFRESHED_AT)
+            VALUES (:name, :last_id, :last_at, :now)
+        """), params)
+
+
+def refresh_summaries(repo, full=False, overlap=timedelta(minutes=10)):
+    """
+    요약 테이블 갱신 (트랜잭션 1개)
+
+    Args:
+        repo: AnalysisRepository
+        full: True면 워터마크를 무시하고 전체 재집계
+        overlap: 시각 워터마크 여유 구간 (늦게 커밋된 분석 포함)
+
+    Returns:
+        dict: mode(full/incremental), slices(다시 집계한 구간 수, 전체면 None), rows(테이블별 요약 행 수)
+    """
+    with repo.engine.begin() as conn:
+        repo.ensure_summary_schema(conn)
+        repo.ensure_change_column(conn)
+        repo.ensure_delete_log(conn)
+        last_id = conn.execute(text("SELECT MAX(ANALYSIS_ID) FROM TB_REVIEW_GPT_ANALYSIS")).scalar()
+        last_at = latest_change_or_delete(conn)
+        state = None if full else load_summary_state(conn)
+
+        if state is not None:
+            mode = 'incremental'
+            slices = _refresh_changed(conn, repo, state, overlap)
+        else:
+            mode, slices = 'full', None
+            conn.execute(text(f"DELETE FROM {SUMMARY_SLICE_TABLE}"))
+            _index_slices(conn, repo)
+            for table in SUMMARY_SPECS:
+                conn.execute(text(f"DELETE FROM {table}"))
+                _aggregate(conn, repo, table, dirty_only=False)
+
+        _save_summary_state(conn, last_id or 0, last_at)
+        rows = {table: conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() for table in SUMMARY_SPECS}
+    return {'mode': mode, 'slices': slices, 'rows': rows}
+
+
+def _refresh_changed(conn, repo, state, overlap):
+    """
+    변경 / 삭제된 분석이 속한 (제품, 플랫폼, 월)만 다시 집계 → 구간 수
+
+    1) 변경 분석(ANALYSIS_ID / ANALYZED_AT / CHANGED_AT 인덱스)과 삭제 기록(DELETED_AT 인덱스)의 ANALYSIS_ID
+    2) 그 분석들의 이전 구간 → DIRTY, 구간 색인에서 제거
+    3) 변경 분석의 새 구간 색인 → DIRTY (구간이 바뀐 분석은 이전 / 새 구간 둘 다 다시 집계)
+    """
+    cond = "a.ANALYSIS_ID > :last_id"
+    params = {'last_id': state['last_analysis_id'] or 0}
+    deleted = f"SELECT ANALYSIS_ID FROM {DELETE_LOG_TABLE}"
+    if state['last_analyzed_at'] is not None:
+        cond += f" OR {CHANGED_SINCE_CONDITION}"
+        deleted += " WHERE DELETED_AT >= :since"
+        params['since'] = state['last_analyzed_at'] - overlap
+    changed = f"SELECT a.ANALYSIS_ID FROM TB_REVIEW_GPT_ANALYSIS a WHERE {cond}"
+    columns = ', '.join(SLICE_COLUMNS)
+    s_columns = ', '.join(f"s.{col}" for col in SLICE_COLUMNS)
+
+    conn.execute(text("DELETE FROM TB_SUMMARY_DIRTY"))
+    n = conn.execute(text(f"""
+        INSERT INTO TB_SUMMARY_DIRTY ({columns})
+        SELECT DISTINCT {s_columns} FROM {SUMMARY_SLICE_TABLE} s
+        WHERE s.ANALYSIS_ID IN ({changed}) OR s.ANALYSIS_ID IN ({deleted})
+    """), params).rowcount
+    conn.execute(text(f"""
+        DELETE FROM {SUMMARY_SLICE_TABLE}
+        WHERE ANALYSIS_ID IN ({changed}) OR ANALYSIS_ID IN ({deleted})
+    """), params)
+    _index_slices(conn, repo, f"WHERE {cond}", params)
+    matches = ' AND '.join(f"d.{col} = s.{col}" for col in SLICE_COLUMNS)
+    n += conn.execute(text(f"""
+        INSERT INTO TB_SUMMARY_DIRTY ({columns})
+        SELECT DISTINCT {s_columns} FROM {SUMMARY_SLICE_TABLE} s
+        WHERE s.ANALYSIS_ID IN ({changed})
+        AND NOT EXISTS (SELECT 'x' FROM TB_SUMMARY_DIRTY d WHERE {matches})
+    """), params).rowcount
+    if n:
+        for table in SUMMARY_SPECS:
+            matches = ' AND '.join(f"d.{col} = {table}.{col}" for col in SLICE_COLUMNS)
+            conn.execute(text(f"DELETE FROM {table} WHERE EXISTS "
+                              f"(SELECT 'x' FROM TB_SUMMARY_DIRTY d WHERE {matches})"))
+            _aggregate(conn, repo, table, dirty_only=True)
+    conn.execute(text("DELETE FROM TB_SUMMARY_DIRTY"))
+    return n
+
+
+def read_summary(conn, table, brand_fn=None):
+    """
+    요약 테이블 조회 (보고서용)
+
+    Args:
+        table: SENTIMENT_SUMMARY_TABLE / TAG_SUMMARY_TABLE / PAIN_SUMMARY_TABLE
+        brand_fn: 제품명 → 브랜드 (지정하면 BRAND_NAME 기준으로 합침)
+
+    Returns:
+        pd.DataFrame
+    """
+    spec = SUMMARY_SPECS[table]
+    df = pd.read_sql(text(f"SELECT * FROM {table}"), conn)
+    df.columns = [c.upper() for c in df.columns]
+    if brand_fn is None:
+        return df
+    df['BRAND_NAME'] = df['PRODUCT_NAME'].map(brand_fn)
+    keys = ['BRAND_NAME', 'PLATFORM', 'REVIEW_MONTH'] + list(spec['dims'])
+    # 리뷰는 제품 1개에만 속하므로 제품 → 브랜드로 더해도 중복 없음
+    return df.groupby(keys, as_index=False)[list(spec['measures'])].sum()
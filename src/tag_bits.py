@@ -0,0 +1,127 @@
+"""
+태그 비트마스크 저장 방식 (TAG_LAYOUT=packed)
+
+TB_REVIEW_TAGS는 (분석, 태그)마다 1행이라 태그 집계마다 리뷰 수의 몇 배 행을 JOIN + GROUP BY 해야 했음
+packed 방식은 TAG_TYPE별 비트마스크 컬럼 4개를 TB_REVIEW_GPT_ANALYSIS에 두고 태그 행은 만들지 않음
+
+- TB_TAG_BITS: (TAG_TYPE, TAG_VALUE) → BIT_NO / BIT_VALUE(2^BIT_NO)
+  재분류로 새 태그 값이 생길 수 있으므로 고정 enum 대신 처음 나올 때 다음 비트를 할당
+- 태그 포함 여부: BITAND(마스크, BIT_VALUE) > 0 (DB별 식은 저장소의 bitand)
+- 한 분석의 같은 태그는 비트 1개 → 중복 태그가 생기지 않음 (목록 순서는 비트 순서)
+- 새 비트는 적재 트랜잭션과 별도의 짧은 트랜잭션에서 할당해 바로 커밋 (TagBitmap engine)
+"""
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from src.bulk_loader import TAG_FIELDS
+
+
+TAG_BITS_TABLE = 'TB_TAG_BITS'
+
+# TAG_TYPE → 분석 테이블의 마스크 컬럼
+MASK_COLUMNS = {tag_type: f'{tag_type}_MASK' for tag_type in TAG_FIELDS}
+
+# 부호 있는 64비트 정수(SQLite INTEGER, Oracle NUMBER 바인드) 안에서 쓸 수 있는 비트 수
+MAX_BITS = 62
+
+_INSERT_BIT_SQL = """
+    INSERT INTO TB_TAG_BITS (TAG_TYPE, TAG_VALUE, BIT_NO, BIT_VALUE)
+    VALUES (:ttype, :tval, :bit_no, :bit_value)
+"""
+
+
+def mask_case(alias, type_column):
+    """TAG_TYPE 컬럼 값에 맞는 마스크 컬럼 식 (CASE t.TAG_TYPE WHEN 'BENEFIT' THEN a.BENEFIT_MASK ...)"""
+    whens = ' '.join(f"WHEN '{tag_type}' THEN {alias}.{column}" for tag_type, column in MASK_COLUMNS.items())
+    return f"CASE {type_column} {whens} END"
+
+
+class TagBitmap:
+    """
+    태그 값 ↔ 비트 (TB_TAG_BITS 캐시, 처음 사용할 때 로드)
+
+    engine을 주면 새 비트는 그 엔진의 별도 연결에서 INSERT 후 바로 커밋
+    - 긴 적재 트랜잭션(DbSink)이 유니크 키 행 잠금을 커밋 때까지 쥐고 있어 다른 워커가 기다리던 문제 제거
+    - 적재 트랜잭션이 롤백돼도 할당은 남음 (쓰이지 않는 비트가 남을 뿐)
+    engine이 None이면 호출한 연결의 세이브포인트에서 할당 (SQLite - DB 단위 쓰기 잠금이라 별도 연결은
+    적재 트랜잭션의 잠금을 기다리게 됨) → 롤백되면 할당한 비트도 사라지므로 reset()으로 캐시를 비워야 함 (DbSink caches)
+
+    Args:
+        engine: 비트 할당용 엔진 (None이면 호출한 연결에서 할당)
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self._bits = None
+
+    def _load(self, conn):
+        self._bits = {tag_type: {} for tag_type in MASK_COLUMNS}
+        for tag_type, value, bit_no in conn.execute(text("SELECT TAG_TYPE, TAG_VALUE, BIT_NO FROM TB_TAG_BITS")):
+            self._bits.setdefault(tag_type, {})[value] = bit_no
+
+    def reset(self):
+        self._bits = None
+
+    def bit(self, conn, tag_type, value):
+        """태그 값의 비트 번호 (없으면 다음 비트 할당)"""
+        if self._bits is None:
+            self._load(conn)
+        bit_no = self._bits[tag_type].get(value)
+        if bit_no is not None:
+            return bit_no
+
+        # 다른 프로세스가 같은 값/비트를 먼저 할당했으면 다시 읽고 재시도
+        for _ in range(3):
+            bit_no = max(self._bits[tag_type].values(), default=-1) + 1
+            if bit_no > MAX_BITS:
+                raise ValueError(f"{tag_type} 태그 값이 {MAX_BITS + 1}개를 넘음: {value}")
+            params = {'ttype': tag_type, 'tval': value, 'bit_no': bit_no, 'bit_value': 1 << bit_no}
+            inserted = self._insert(conn, params) if self.engine is None else self._insert_committed(params)
+            if inserted:
+                self._bits[tag_type][value] = bit_no
+                return bit_no
+            self._load(conn)
+            if value in self._bits[tag_type]:
+                return self._bits[tag_type][value]
+        raise RuntimeError(f"태그 비트 할당 실패: {tag_type} {value}")
+
+    def _insert(self, conn, params):
+        """호출한 연결의 세이브포인트에서 INSERT (유니크 키 충돌이면 False)"""
+        savepoint = conn.begin_nested()
+        try:
+            conn.execute(text(_INSERT_BIT_SQL), params)
+        except IntegrityError:
+            savepoint.rollback()
+            return False
+        savepoint.commit()
+        return True
+
+    def _insert_committed(self, params):
+        """별도 연결에서 INSERT 후 바로 커밋 (유니크 키 충돌이면 False)"""
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text(_INSERT_BIT_SQL), params)
+        except IntegrityError:
+            return False
+        return True
+
+    def encode(self, conn, tag_type, values):
+        """태그 값 목록 → 마스크"""
+        mask = 0
+        for value in values or []:
+            mask |= 1 << self.bit(conn, tag_type, value)
+        return mask
+
+    def decode(self, conn, tag_type, mask):
+        """마스크 → 태그 값 목록 (비트 순서)"""
+        if self._bits is None:
+            self._load(conn)
+        return [value for value, bit_no in sorted(self._bits[tag_type].items(), key=lambda kv: kv[1])
+                if mask and mask >> bit_no & 1]
+
+    def bit_values(self, conn, tag_type, values):
+        """이미 할당된 값들의 비트 합 (없는 값은 무시)"""
+        if self._bits is None:
+            self._load(conn)
+        return sum(1 << self._bits[tag_type][v] for v in set(values) if v in self._bits[tag_type])
@@ -0,0 +1,238 @@
+"""
+LLM 호출 텔레메트리
+
+토큰 수만 남기던 ai_token_usage.json / 50건마다 출력하던 누적 비용 대신 아래 두 종류의 행을 JSONL로 기록하고
+실행 종료 시 요약
+
+API 호출 1회 = attempt 행 (재시도, 필드 재요청도 각각 1행)
+- attempt: 리뷰 안에서 몇 번째 호출인지, call: full(전체 프롬프트) / field(실패 필드 재요청)
+- latency_sec: 이 호출의 응답 대기, queue_wait_sec: 이 호출의 rate limit 대기
+- error_class: 이 호출의 실패 분류 (성공이면 None), tokens_in/out
+
+리뷰 1건(클러스터 대표) = review 행 (리뷰 단위 합계)
+- total_latency_sec / total_queue_wait_sec: 재시도, 필드 재요청을 합친 응답 / rate limit 대기
+- elapsed_sec: 분석 시작 ~ 종료 (백오프 sleep 포함)
+- write_lag_sec: 분석 종료 ~ 싱크 적재 (writer가 밀리면 증가)
+- api_calls, retries, retry_classes, error_class(최종), tokens_in/out, cache_hit, batch_size
+
+요약: API 호출 지연 p50/p95/p99 (attempt 행), 리뷰당 합계 지연 / 경과 시간 분위수 (review 행),
+      실효 초당 요청 수, 리뷰 1천 건당 비용
+같은 파일에 여러 실행을 누적 기록하므로 run_id별로 다시 요약해 비교 가능
+"""
+
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+from src.checkpoint import CheckpointJournal, read_journal
+from src.token_estimator import estimate_cost
+
+
+PERCENTILES = (50, 95, 99)
+
+
+def _percentiles(values, prefix):
+    if not values:
+        return {f'{prefix}_p{p}': 0.0 for p in PERCENTILES}
+    arr = np.percentile(np.asarray(values, dtype=float), PERCENTILES)
+    return {f'{prefix}_p{p}': round(float(v), 3) for p, v in zip(PERCENTILES, arr)}
+
+
+KIND_ATTEMPT = 'attempt'
+KIND_REVIEW = 'review'
+
+
+def summarize_records(records, attempts, elapsed_sec=None, propagated=0):
+    """
+    텔레메트리 레코드 → 요약
+
+    Args:
+        records: 리뷰 1건당 review 행 목록
+        attempts: API 호출 1회당 attempt 행 목록 (지연 분위수는 호출 단위로 계산)
+        elapsed_sec: 실행 시간 (None이면 레코드 timestamp 범위로 추정)
+        propagated: 근사 중복 전파로 API 없이 채운 리뷰 수 (리뷰당 비용 계산용)
+    """
+    api = [r for r in records if not r['cache_hit']]
+    tokens_in = sum(r['tokens_in'] for r in records)
+    tokens_out = sum(r['tokens_out'] for r in records)
+    api_calls = sum(r['api_calls'] for r in records)
+    cost = estimate_cost(tokens_in, tokens_out)
+
+    if elapsed_sec is None:
+        stamps = [datetime.fromisoformat(r['timestamp']) for r in records]
+        elapsed_sec = (max(stamps) - min(stamps)).total_seconds() if len(stamps) > 1 else 0.0
+
+    reviews = len(records) + propagated
+    errors = Counter(r['error_class'] for r in records if r['error_class'])
+    retry_classes = Counter(c for r in records for c in r['retry_classes'])
+    attempt_errors = Counter(a['error_class'] for a in attempts if a['error_class'])
+
+    summary = {
+        'reviews': reviews,
+        'api_calls': api_calls,
+        'cache_hits': len(records) - len(api),
+        'retries': sum(r['retries'] for r in records),
+        'errors': sum(errors.values()),
+        'error_classes': dict(errors),
+        'retry_classes': dict(retry_classes),
+        'attempt_error_classes': dict(attempt_errors),
+        'elapsed_sec': round(elapsed_sec, 1),
+        'requests_per_sec': round(api_calls / elapsed_sec, 2) if elapsed_sec else 0.0,
+        'reviews_per_sec': round(reviews / elapsed_sec, 2) if elapsed_sec else 0.0,
+        'cost_usd': round(cost, 4),
+        'cost_per_1k_reviews': round(cost / reviews * 1000, 4) if reviews else 0.0,
+    }
+    # 호출 단위 (재시도 / 필드 재요청이 리뷰 지연에 섞이지 않게)
+    summary.update(_percentiles([a['latency_sec'] for a in attempts], 'latency'))
+    summary.update(_percentiles([a['queue_wait_sec'] for a in attempts], 'queue_wait'))
+    # 리뷰 단위 합계
+    summary.update(_percentiles([r['total_latency_sec'] for r in api], 'review_latency'))
+    summary.update(_percentiles([r['elapsed_sec'] for r in api], 'review_elapsed'))
+    summary.update(_percentiles([r['write_lag_sec'] for r in records], 'write_lag'))
+    return summary
+
+
+class CallTelemetry:
+    """
+    실행 1회의 텔레메트리 수집 (기록은 writer 스레드에서만 호출)
+
+    사용 예:
+        telemetry = CallTelemetry('output/llm_telemetry.jsonl')
+        telemetry.start()
+        telemetry.record(review_id, trace, batch_size=50)   # attempt 행 N개 + review 행 1개
+        telemetry.close()
+        print_telemetry(telemetry.summary())
+
+    Args:
+        path: JSONL 기록 파일 (None이면 메모리에만 보관)
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.run_id = None
+        self.records = []    # review 행
+        self.attempts = []   # attempt 행
+        self.propagated = 0
+        self.started_at = None
+        self._journal = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """기록 시작 (같은 분석기로 run을 여러 번 호출하면 한 실행으로 누적)"""
+        if self.run_id is None:
+            self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+            self.started_at = time.monotonic()
+        if self.path and self._journal is None:
+            self._journal = CheckpointJournal(self.path, fsync_policy='interval').open()
+        return self
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def record(self, review_id, trace, batch_size):
+        """
+        리뷰 1건 기록 (API 호출마다 attempt 행 + 리뷰 합계 review 행)
+
+        Args:
+            trace: LLMAnalyzer.analyze가 채운 호출 추적 dict
+            batch_size: 이 결과가 함께 적재된 배치 크기
+        """
+        attempts = [{
+            'run_id': self.run_id,
+            'kind': KIND_ATTEMPT,
+            'review_id': review_id,
+            'attempt': a['attempt'],
+            'call': a['call'],
+            'latency_sec': round(a['latency'], 3),
+            'queue_wait_sec': round(a['queue_wait'], 3),
+            'error_class': a['error_class'],
+            'tokens_in': a['tokens_in'],
+            'tokens_out': a['tokens_out'],
+            'timestamp': a['timestamp'],
+        } for a in trace['attempts']]
+        rec = {
+            'run_id': self.run_id,
+            'kind': KIND_REVIEW,
+            'review_id': review_id,
+            'total_queue_wait_sec': round(trace['queue_wait'], 3),
+            'total_latency_sec': round(trace['latency'], 3),
+            'elapsed_sec': round(trace['finished_at'] - trace['started_at'], 3),
+            'write_lag_sec': round(time.monotonic() - trace['finished_at'], 3),
+            'api_calls': trace['api_calls'],
+            'retries': len(trace['retry_classes']),
+            'retry_classes': trace['retry_classes'],
+            'error_class': trace['error_class'],
+            'tokens_in': trace['tokens_in'],
+            'tokens_out': trace['tokens_out'],
+            'cache_hit': trace['cache_hit'],
+            'batch_size': batch_size,
+            'timestamp': datetime.now().isoformat(),
+        }
+        with self._lock:
+            self.attempts.extend(attempts)
+            self.records.append(rec)
+            if self._journal is not None:
+                for row in attempts:
+                    self._journal.append(row)
+                self._journal.append(rec)
+
+    def record_propagated(self, count=1):
+        with self._lock:
+            self.propagated += count
+
+    def _elapsed(self):
+        return time.monotonic() - self.started_at if self.started_at is not None else 0.0
+
+    def live(self):
+        """진행률 표시줄용 실시간 처리량 (최근 호출 기준)"""
+        with self._lock:
+            latencies = [a['latency_sec'] for a in self.attempts[-200:]]
+            calls = len(self.attempts)
+            elapsed = self._elapsed()
+        return {
+            'rps': f"{calls / elapsed:.1f}" if elapsed else '0.0',
+            'p95': f"{np.percentile(latencies, 95):.2f}s" if latencies else '-',
+        }
+
+    def summary(self):
+        with self._lock:
+            summary = summarize_records(self.records, self.attempts, self._elapsed(), self.propagated)
+        summary['run_id'] = self.run_id
+        return summary
+
+
+def load_run_summaries(path):
+    """텔레메트리 파일 → run_id별 요약 (실행 간 비교용, 전파 건수는 포함되지 않음)"""
+    runs = {}
+    for rec in read_journal(path):
+        records, attempts = runs.setdefault(rec['run_id'], ([], []))
+        if rec.get('kind') == KIND_ATTEMPT:
+            attempts.append(rec)
+        else:
+            # kind가 없는 행은 호출 단위 기록 도입 전의 review 행 (호출 지연 분위수는 0으로 표시됨)
+            rec.setdefault('total_latency_sec', rec.get('latency_sec', 0.0))
+            records.append(rec)
+    return {run_id: dict(summarize_records(records, attempts), run_id=run_id)
+            for run_id, (records, attempts) in runs.items()}
+
+
+def print_telemetry(summary, label="텔레메트리"):
+    print(f"\n  [{label}] 리뷰 {summary['reviews']:,}건 | API 호출 {summary['api_calls']:,}건 | "
+          f"재시도 {summary['retries']:,}건 | 에러 {summary['errors']:,}건")
+    print(f"    - 호출 지연 p50 {summary['latency_p50']:.2f}초 / p95 {summary['latency_p95']:.2f}초 / "
+          f"p99 {summary['latency_p99']:.2f}초 (rate limit 대기 p95 {summary['queue_wait_p95']:.2f}초)")
+    print(f"    - 리뷰당 합계 지연 p95 {summary['review_latency_p95']:.2f}초 / "
+          f"경과 p95 {summary['review_elapsed_p95']:.2f}초 (재시도, 필드 재요청, 백오프 포함)")
+    print(f"    - 처리량 {summary['requests_per_sec']:.2f}req/s, {summary['reviews_per_sec']:.2f}리뷰/s | "
+          f"리뷰 1천 건당 ${summary['cost_per_1k_reviews']:.4f}")
+    if summary['error_classes']:
+        print(f"    - 에러 분류: {summary['error_classes']}")
+    if summary['retry_classes']:
+        print(f"    - 재시도 분류: {summary['retry_classes']}")
+    if summary['attempt_error_classes']:
+        print(f"    - 호출별 실패 분류: {summary['attempt_error_classes']}")
@@ -0,0 +1,74 @@
+"""
+오프라인 토큰 수 추정 및 비용 계산
+
+tiktoken 없이 문자 종류별 근사치로 토큰 수 추정 (gpt-4o 계열 o200k 토크나이저 기준)
+- 한글 음절: 약 1토큰/음절
+- 영문/숫자: 약 4글자당 1토큰
+- 공백 외 기호: 1토큰/글자
+"""
+
+import re
+
+
+# ===== 모델 단가 (gpt-4o-mini, USD / 1M 토큰) =====
+MODEL_NAME = "gpt-4o-mini"
+PRICE_INPUT_PER_1M = 0.15
+PRICE_OUTPUT_PER_1M = 0.60
+
+# 메시지 1건당 고정 오버헤드 (role, 구분자 등)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# ===== 문자 종류별 토큰 비율 =====
+HANGUL_TOKENS_PER_CHAR = 1.0
+ALNUM_CHARS_PER_TOKEN = 4.0
+SYMBOL_TOKENS_PER_CHAR = 1.0
+
+_RE_HANGUL = r'[가-힣ㄱ-ㅎㅏ-ㅣ]'
+_RE_ALNUM = r'[A-Za-z0-9]'
+_RE_SYMBOL = r'[^\sA-Za-z0-9가-힣ㄱ-ㅎㅏ-ㅣ]'
+
+_PATTERN_HANGUL = re.compile(_RE_HANGUL)
+_PATTERN_ALNUM = re.compile(_RE_ALNUM)
+_PATTERN_SYMBOL = re.compile(_RE_SYMBOL)
+
+
+def estimate_tokens(text):
+    """문자열 1건의 토큰 수 추정"""
+    if not text:
+        return 0
+    text = str(text)
+    hangul = len(_PATTERN_HANGUL.findall(text))
+    alnum = len(_PATTERN_ALNUM.findall(text))
+    symbol = len(_PATTERN_SYMBOL.findall(text))
+    tokens = hangul * HANGUL_TOKENS_PER_CHAR + alnum / ALNUM_CHARS_PER_TOKEN + symbol * SYMBOL_TOKENS_PER_CHAR
+    return int(round(tokens))
+
+
+def estimate_tokens_series(texts):
+    """
+    Series 전체 토큰 수 추정 (벡터화)
+
+    Args:
+        texts: 문자열 Series
+
+    Returns:
+        Series: 리뷰별 추정 토큰 수 (int)
+    """
+    s = texts.fillna('').astype(str)
+    tokens = (
+        s.str.count(_RE_HANGUL) * HANGUL_TOKENS_PER_CHAR
+        + s.str.count(_RE_ALNUM) / ALNUM_CHARS_PER_TOKEN
+        + s.str.count(_RE_SYMBOL) * SYMBOL_TOKENS_PER_CHAR
+    )
+    return tokens.round().astype(int)
+
+
+def estimate_messages_tokens(messages):
+    """chat 메시지 목록의 입력 토큰 수 추정"""
+    return sum(estimate_tokens(m.get('content', '')) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def estimate_cost(tokens_in, tokens_out):
+    """입력/출력 토큰 → 비용 (USD). 스칼라와 Series 모두 지원"""
+    return tokens_in * PRICE_INPUT_PER_1M / 1_000_000 + tokens_out * PRICE_OUTPUT_PER_1M / 1_000_000
+
@@ -0,0 +1,409 @@
+"""
+리스(lease) 기반 공유 작업 큐
+
+gpt_analyzer_full.py를 여러 개 띄우면 각자 시작 시점의 NOT EXISTS 결과를 그대로 처리해서
+같은 리뷰를 중복 분석(중복 과금)하던 문제 해결
+
+- 작업 등록: 리뷰 ID + 본문/별점을 큐에 등록 (대기/처리 중인 ID는 무시 → 여러 프로세스가 동시에 등록해도 안전)
+           본문을 함께 저장하므로 어느 워커(다른 호스트 포함)든 리스한 ID를 바로 처리 가능
+           failed로 끝난 ID, done이지만 분석이 삭제되어 다시 미분석으로 조회된 ID는 시도 횟수 0으로 다시 대기
+- 리스: 대기 중이거나 리스가 만료된 ID를 batch 단위로 가져감 (lease_seconds 동안 독점)
+- 하트비트: 처리 중인 ID의 리스를 주기적으로 연장
+- 완료/실패: 완료는 다시 배정되지 않음, 실패는 max_attempts까지 다시 대기열로
+- 반납: 처리하지 못한 ID는 시도 횟수 증가 없이 대기열로
+- 프로세스가 죽으면 하트비트가 끊겨 리스 만료 → 다른 워커가 자동으로 가져감
+
+백엔드는 QueueBackend 인터페이스만 맞추면 교체 가능 (기본: SQLite 파일)
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime
+
+from src.llm_engine import DbSink, Sink
+
+
+STATUS_PENDING = 'pending'
+STATUS_LEASED = 'leased'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+def _encode_id(item_id):
+    """NUMBER/VARCHAR ID를 타입 그대로 보존하도록 JSON 문자열로 저장"""
+    return json.dumps(item_id, ensure_ascii=False)
+
+
+def _decode_id(value):
+    return json.loads(value)
+
+
+# ===== 백엔드 =====
+class QueueBackend:
+    """작업 큐 저장소 인터페이스 (모든 메서드는 여러 프로세스에서 동시에 호출될 수 있음)"""
+
+    def enqueue(self, entries, listed_at=None):
+        """
+        [(ID, payload dict), ...] 등록 → 새로 대기 상태가 된 건수
+
+        - 없는 ID: 새로 등록
+        - failed: 시도 횟수 0으로 다시 대기 (dead-letter 건 재처리)
+        - done: listed_at(미분석 조회 시작 시각) 전에 완료된 건만 다시 대기
+          (조회 이후 다른 워커가 완료한 건은 분석이 이미 있으므로 그대로)
+        - pending / leased: 그대로
+        """
+        raise NotImplementedError
+
+    def lease(self, worker_id, limit, lease_seconds):
+        """대기 중이거나 리스가 만료된 ID를 최대 limit건 리스 → [(ID, payload), ...]"""
+        raise NotImplementedError
+
+    def heartbeat(self, worker_id, item_ids, lease_seconds):
+        """worker_id가 보유한 리스 연장 → 연장된 건수 (만료 후 다른 워커가 가져간 ID는 제외)"""
+        raise NotImplementedError
+
+    def complete(self, worker_id, item_ids):
+        raise NotImplementedError
+
+    def fail(self, worker_id, item_ids, error, max_attempts):
+        """실패 기록 (시도 횟수가 max_attempts 이상이면 failed, 아니면 다시 대기)"""
+        raise NotImplementedError
+
+    def release(self, worker_id, item_ids):
+        """처리하지 않은 리스 반납 (시도 횟수 유지)"""
+        raise NotImplementedError
+
+    def recover_expired(self):
+        """만료된 리스를 대기 상태로 되돌림 → 건수"""
+        raise NotImplementedError
+
+    def stats(self):
+        """상태별 건수"""
+        raise NotImplementedError
+
+
+class SQLiteQueueBackend(QueueBackend):
+    """
+    SQLite 파일 기반 큐 (같은 호스트의 여러 프로세스가 공유)
+
+    리스는 BEGIN IMMEDIATE 트랜잭션 안에서 선택 + 갱신하므로 두 워커가 같은 ID를 가져가지 않음
+
+    Args:
+        path: SQLite 파일 경로
+        queue_name: 큐 이름 (한 파일에 여러 큐 보관 가능)
+    """
+
+    def __init__(self, path, queue_name='default'):
+        self.path = str(path)
+        self.queue_name = queue_name
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS work_items (
+                    queue TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    payload TEXT,
+                    status TEXT NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    updated_at TEXT,
+                    PRIMARY KEY (queue, item_id)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_work_items_status ON work_items (queue, status, lease_expires)")
+            conn.commit()
+
+    def _connect(self):
+        # 호출마다 연결 (프로세스/스레드 간 연결 공유 없음), 잠금 대기는 timeout까지
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _write(self, fn):
+        """BEGIN IMMEDIATE 트랜잭션에서 fn(conn) 실행"""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    @staticmethod
+    def _now():
+        return datetime.now().isoformat()
+
+    def enqueue(self, entries, listed_at=None):
+        now = self._now()
+        listed_at = listed_at.isoformat() if listed_at is not None else ''
+        rows = [(self.queue_name, _encode_id(i), json.dumps(payload, ensure_ascii=False, default=str),
+                 STATUS_PENDING, now, STATUS_FAILED, STATUS_DONE, listed_at) for i, payload in entries]
+
+        def run(conn):
+            before = conn.total_changes
+            conn.executemany("""
+                INSERT INTO work_items (queue, item_id, payload, status, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (queue, item_id) DO UPDATE SET
+                    payload = excluded.payload, status = excluded.status, attempts = 0, last_error = NULL,
+                    lease_owner = NULL, lease_expires = NULL, updated_at = excluded.updated_at
+                WHERE work_items.status = ? OR (work_items.status = ? AND work_items.updated_at < ?)
+            """, rows)
+            return conn.total_changes - before
+        return self._write(run)
+
+    def lease(self, worker_id, limit, lease_seconds):
+        def run(conn):
+            now = time.time()
+            rows = conn.execute("""
+                SELECT item_id, payload FROM work_items
+                WHERE queue = ? AND (status = ? OR (status = ? AND lease_expires < ?))
+                ORDER BY rowid LIMIT ?
+            """, (self.queue_name, STATUS_PENDING, STATUS_LEASED, now, limit)).fetchall()
+            ids = [r[0] for r in rows]
+            conn.executemany("""
+                UPDATE work_items SET status = ?, lease_owner = ?, lease_expires = ?, updated_at = ?
+                WHERE queue = ? AND item_id = ?
+            """, [(STATUS_LEASED, worker_id, now + lease_seconds, self._now(), self.queue_name, i) for i in ids])
+            return [(_decode_id(i), json.loads(payload) if payload else None) for i, payload in rows]
+        return self._write(run)
+
+    def _update_owned(self, worker_id, item_ids, assignments, params):
+        """worker_id가 보유 중인 리스만 갱신 → 갱신 건수"""
+        def run(conn):
+            before = conn.total_changes
+            conn.executemany(f"""
+                UPDATE work_items SET {assignments}, updated_at = ?
+                WHERE queue = ? AND item_id = ? AND status = ? AND lease_owner = ?
+            """, [(*params, self._now(), self.queue_name, _encode_id(i), STATUS_LEASED, worker_id)
+                  for i in item_ids])
+            return conn.total_changes - before
+        return self._write(run)
+
+    def heartbeat(self, worker_id, item_ids, lease_seconds):
+        return self._update_owned(worker_id, item_ids, "lease_expires = ?", (time.time() + lease_seconds,))
+
+    def complete(self, worker_id, item_ids):
+        return self._update_owned(worker_id, item_ids, "status = ?, lease_owner = NULL, lease_expires = NULL",
+                                  (STATUS_DONE,))
+
+    def fail(self, worker_id, item_ids, error, max_attempts):
+        return self._update_owned(
+            worker_id, item_ids,
+            "status = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END, attempts = attempts + 1, "
+            "last_error = ?, lease_owner = NULL, lease_expires = NULL",
+            (max_attempts, STATUS_FAILED, STATUS_PENDING, str(error)[:500]),
+        )
+
+    def release(self, worker_id, item_ids):
+        return self._update_owned(worker_id, item_ids, "status = ?, lease_owner = NULL, lease_expires = NULL",
+                                  (STATUS_PENDING,))
+
+    def recover_expired(self):
+        def run(conn):
+            before = conn.total_changes
+            conn.execute("""
+                UPDATE work_items SET status = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE queue = ? AND status = ? AND lease_expires < ?
+            """, (STATUS_PENDING, self._now(), self.queue_name, STATUS_LEASED, time.time()))
+            return conn.total_changes - before
+        return self._write(run)
+
+    def stats(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM work_items WHERE queue = ? GROUP BY status", (self.queue_name,)
+            ).fetchall()
+        counts = {STATUS_PENDING: 0, STATUS_LEASED: 0, STATUS_DONE: 0, STATUS_FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+
+# ===== 워커 =====
+class WorkQueue:
+    """
+    워커 1개(프로세스 1개)의 큐 사용 창구 + 하트비트 스레드
+
+    사용 예:
+        queue = WorkQueue(SQLiteQueueBackend('output/gpt_work_queue.db', 'full'))
+        queue.enqueue_items(items)
+        with queue:                       # 하트비트 시작/종료 (종료 시 남은 리스 반납)
+            while True:
+                items = queue.lease_items(200)
+                if not items:
+                    break
+                ...
+                queue.complete(done_ids)
+
+    Args:
+        backend: QueueBackend
+        worker_id: 워커 식별자 (None이면 호스트명:PID:난수)
+        lease_seconds: 리스 유지 시간 (하트비트가 lease_seconds/3마다 연장)
+        max_attempts: 실패 허용 횟수 (넘으면 failed로 남고 더 배정되지 않음)
+    """
+
+    def __init__(self, backend, worker_id=None, lease_seconds=300, max_attempts=3):
+        self.backend = backend
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._held = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start_heartbeat()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop_heartbeat()
+        self.release(self.held())
+
+    def held(self):
+        with self._lock:
+            return list(self._held)
+
+    def enqueue_items(self, items, listed_at=None):
+        """엔진 item 목록 등록 (ID + 본문/별점, listed_at: 미분석 조회 시작 시각 - QueueBackend.enqueue)"""
+        return self.backend.enqueue([(item['id'], {'text': item['text'], 'rating': item['rating']}) for item in items],
+                                    listed_at)
+
+    def lease_items(self, limit):
+        """리스 → 엔진 item 목록"""
+        leased = self.backend.lease(self.worker_id, limit, self.lease_seconds)
+        with self._lock:
+            self._held.update(item_id for item_id, _ in leased)
+        return [{'id': item_id, 'key': item_id, 'text': payload['text'], 'rating': payload['rating'], 'row': None}
+                for item_id, payload in leased]
+
+    def _settle(self, item_ids):
+        with self._lock:
+            self._held.difference_update(item_ids)
+
+    def complete(self, item_ids):
+        if item_ids:
+            self.backend.complete(self.worker_id, item_ids)
+            self._settle(item_ids)
+
+    def fail(self, item_ids, error):
+        if item_ids:
+            self.backend.fail(self.worker_id, item_ids, error, self.max_attempts)
+            self._settle(item_ids)
+
+    def release(self, item_ids):
+        if item_ids:
+            self.backend.release(self.worker_id, item_ids)
+            self._settle(item_ids)
+
+    def _heartbeat_loop(self):
+        interval = max(1.0, self.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            held = self.held()
+            if held:
+                try:
+                    self.backend.heartbeat(self.worker_id, held, self.lease_seconds)
+                except sqlite3.Error as e:
+                    # 다음 주기에 다시 시도 (리스가 만료되면 다른 워커가 가져감)
+                    print(f"  [작업 큐] 하트비트 실패: {e}")
+
+    def start_heartbeat(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+            self._thread.start()
+
+    def stop_heartbeat(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+
+def run_with_queue(analyzer, work_queue, sinks, lease_size=500, desc="LLM 분석"):
+    """
+    큐에서 lease_size건씩 리스하며 analyzer.run 반복 (큐가 비거나 서킷 브레이커가 열리면 종료)
+
+    근사 중복 클러스터링은 리스 단위 안에서만 적용되므로 lease_size는 적재 배치보다 크게 잡음
+    완료 처리는 적재가 확인된 건만 (DbSink가 있으면 after_commit으로 받은 커밋된 건,
+    싱크의 completed_ids에 이미 있어 건너뛴 건) - 그 밖에 남은 리스는 실패 처리해 max_attempts까지 다시 대기열로
+
+    Returns:
+        dict: leased(리스 건수), completed(완료 적재), skipped(이미 저장돼 완료 처리), failed(실패),
+              unconfirmed(적재 확인 안 돼 다시 대기), released(반납), stopped
+    """
+    ack = QueueAckSink(work_queue)
+    # 주기 커밋 DB 싱크가 있으면 커밋된 건만 완료 처리 (커밋 전에 중단된 건은 큐에 남아 다시 처리)
+    db_sinks = [sink for sink in sinks if isinstance(sink, DbSink)]
+    if db_sinks:
+        db_sinks[-1].after_commit.append(ack)
+        chain = list(sinks)
+    else:
+        chain = list(sinks) + [ack]
+    stats = {'leased': 0, 'completed': 0, 'skipped': 0, 'failed': 0, 'unconfirmed': 0, 'released': 0,
+             'stopped': False}
+    with work_queue:
+        while True:
+            items = work_queue.lease_items(lease_size)
+            if not items:
+                break
+            stats['leased'] += len(items)
+            summary = analyzer.run(items, chain, desc=desc)
+            leftover = work_queue.held()
+            if summary['stopped']:
+                # 서킷 브레이커로 건너뛴 건은 반납 → 다른 워커나 다음 실행이 처리
+                work_queue.release(leftover)
+                stats['released'] += len(leftover)
+                stats['stopped'] = True
+                break
+            if not leftover:
+                continue
+            # 싱크에 이미 저장돼 있어 건너뛴 건만 완료 처리
+            stored = set()
+            for sink in sinks:
+                stored |= sink.completed_ids()
+            skipped = [item_id for item_id in leftover if item_id in stored]
+            unconfirmed = [item_id for item_id in leftover if item_id not in stored]
+            work_queue.complete(skipped)
+            work_queue.fail(unconfirmed, "적재 확인 안 됨 (싱크가 커밋하지 않음)")
+            stats['skipped'] += len(skipped)
+            stats['unconfirmed'] += len(unconfirmed)
+    stats['completed'] = ack.completed
+    stats['failed'] = ack.failed
+    return stats
+
+
+class QueueAckSink(Sink):
+    """
+    적재가 끝난 리뷰를 큐에 완료 처리 (다른 싱크 뒤에 두어 DB 커밋 후 완료되도록)
+
+    dead-letter로 간 실패 건은 write_failures로 받아 실패 처리
+    """
+
+    def __init__(self, work_queue):
+        self.work_queue = work_queue
+        self.completed = 0
+        self.failed = 0
+
+    def write(self, records):
+        ids = [item['id'] for item, _ in records]
+        self.work_queue.complete(ids)
+        self.completed += len(ids)
+
+    def write_failures(self, failures):
+        for item, error in failures:
+            self.work_queue.fail([item['id']], error)
+        self.failed += len(failures)
+
+
+def print_queue_stats(stats, label="작업 큐"):
+    print(f"  [{label}] 대기 {stats[STATUS_PENDING]:,} | 처리 중 {stats[STATUS_LEASED]:,} | "
+          f"완료 {stats[STATUS_DONE]:,} | 실패 {stats[STATUS_FAILED]:,}")
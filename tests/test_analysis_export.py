@@ -0,0 +1,175 @@
+"""src/analysis_export.IncrementalExporter - 전체 → 이어 쓰기 → 병합 → 삭제 왕복이 전체 내보내기와 같은지"""
+
+import csv
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from src.analysis_export import IncrementalExporter
+from src.maintenance import delete_analyses_where, recategorize_points
+from src.storage import PAIN_TABLE, RESULT_TABLES, SQLiteRepository
+
+
+REVIEWS = pd.DataFrame({
+    'REVIEW_ID': range(1, 11),
+    'BRAND_NAME': ['라운드랩 독도 토너', '아누아 어성초 토너'] * 5,
+    'REVIEW_CONTENT': [f'리뷰 {i}' for i in range(1, 11)],
+    'REVIEW_RATING': 5,
+    'REVIEW_DATE': '2025-03-01',
+    'PLATFORM_CODE': ['OLIVEYOUNG_M', 'COUPANG_M'] * 5,
+})
+
+
+def _load(repo, review_ids):
+    with repo.engine.begin() as conn, repo.bulk_loader(conn) as loader:
+        for rid in review_ids:
+            loader.add(rid, rid % 5 + 1, ['POS', 'NEG'][rid % 2], 1, 1, {
+                'pain_points': ['끈적임'] if rid % 2 else ['건조함'],
+                'positive_points': ['순함'],
+                'benefit_tags': ['보습'],
+            })
+
+
+def _exporter(repo, directory):
+    paths = {name: str(directory / name) for name in
+             ('out.json', 'out.jsonl', 'out.csv', 'state.json', 'index.npz')}
+    return IncrementalExporter(repo.engine, lambda name: name, *paths.values(), batch_size=3,
+                               tag_source=repo.tag_source()), paths
+
+
+def _outputs(paths):
+    """(JSONL 기록 순서의 ID, JSONL 레코드, JSON 항목, CSV 행 수)"""
+    with open(paths['out.jsonl'], encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    with open(paths['out.json'], encoding='utf-8') as f:
+        items = json.load(f)
+    with open(paths['out.csv'], encoding='utf-8-sig', newline='') as f:
+        csv_rows = len(list(csv.DictReader(f)))
+    return [r['analysis_id'] for r in lines], lines, items, csv_rows
+
+
+def _contents(records):
+    return sorted(json.dumps(dict(r, idx=None), ensure_ascii=False, sort_keys=True) for r in records)
+
+
+def _assert_matches_full(repo, tmp_path, paths):
+    order, lines, items, csv_rows = _outputs(paths)
+    assert np.load(paths['index.npz'])['ids'].tolist() == order
+    assert len(items) == len(order) == csv_rows
+
+    full_dir = tmp_path / 'full'
+    full_dir.mkdir(exist_ok=True)
+    exporter, full_paths = _exporter(repo, full_dir)
+    exporter.run(full=True)
+    _, full_lines, full_items, _ = _outputs(full_paths)
+    # 병합은 기존 순서 + 신규를 뒤에 쓰므로 내용만 비교 (idx는 기록 순서)
+    assert [r['idx'] for r in lines] == [r['idx'] for r in items] == list(range(len(order)))
+    assert _contents(lines) == _contents(full_lines)
+    assert _contents(items) == _contents(full_items)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = SQLiteRepository(path=str(tmp_path / 'e.db'))
+    repo.create_schema(drop=True)
+    repo.load_reviews(REVIEWS)
+    _load(repo, range(1, 5))
+    return repo
+
+
+def test_round_trip(repo, tmp_path):
+    exporter, paths = _exporter(repo, tmp_path)
+    assert exporter.run()['mode'] == 'full'
+    _assert_matches_full(repo, tmp_path, paths)
+
+    # 신규만 → 이어 쓰기 (JSON 배열 끝을 잘라 다시 닫음)
+    _load(repo, [5, 6])
+    result = exporter.run()
+    assert (result['mode'], result['inserted'], result['total']) == ('append', 2, 6)
+    _assert_matches_full(repo, tmp_path, paths)
+
+    # 재분류 → 병합
+    recategorize_points(repo.engine, PAIN_TABLE, {'끈적임': '끈적'})
+    result = exporter.run()
+    assert (result['mode'], result['updated'], result['total']) == ('merge', 3, 6)
+    _assert_matches_full(repo, tmp_path, paths)
+
+    # 변경 없음 → 파일 그대로
+    result = exporter.run()
+    assert (result['mode'], result['inserted'], result['updated'], result['deleted']) == ('append', 0, 0, 0)
+    _assert_matches_full(repo, tmp_path, paths)
+
+
+def test_delete_log_and_verify_catch_late_record(repo, tmp_path):
+    # 원본 리뷰가 나중에 적재된 작은 ID 분석 (워터마크 밖) 1건 + 삭제 1건 → 건수로는 변화가 안 보임
+    with repo.engine.begin() as conn:
+        repo.disable_review_fk(conn)
+    _load(repo, [11])
+    with repo.engine.begin() as conn:
+        late_id = conn.execute(text("SELECT ANALYSIS_ID FROM TB_REVIEW_GPT_ANALYSIS WHERE REVIEW_ID = 11")).scalar()
+        for table in RESULT_TABLES:
+            conn.execute(text(f"UPDATE {table} SET ANALYSIS_ID = 0 WHERE ANALYSIS_ID = :aid"), {'aid': late_id})
+        conn.execute(text("UPDATE TB_REVIEW_GPT_ANALYSIS SET ANALYZED_AT = '2000-01-01 00:00:00' WHERE REVIEW_ID = 11"))
+    exporter, paths = _exporter(repo, tmp_path)
+    assert exporter.run()['total'] == 4
+
+    repo.load_reviews(REVIEWS.iloc[:1].assign(REVIEW_ID=11, REVIEW_CONTENT='늦게 적재된 리뷰'))
+    delete_analyses_where(repo, "SELECT ANALYSIS_ID FROM TB_REVIEW_GPT_ANALYSIS WHERE REVIEW_ID = 2")
+    # 삭제는 삭제 로그로 찾고 (ID 전체 조회 없음), 워터마크 밖의 늦은 분석은 verify에서만 찾음
+    result = exporter.run()
+    assert (result['mode'], result['inserted'], result['deleted'], result['total']) == ('merge', 0, 1, 3)
+    result = exporter.run(verify=True)
+    assert (result['mode'], result['inserted'], result['deleted'], result['total']) == ('append', 1, 0, 4)
+    _, lines, _, _ = _outputs(paths)
+    assert {record['review_id'] for record in lines} == {1, 3, 4, 11}
+    _assert_matches_full(repo, tmp_path, paths)
+
+
+def _read_bytes(paths):
+    return {name: open(paths[name], 'rb').read() for name in ('out.json', 'out.jsonl', 'out.csv')}
+
+
+def test_merge_rewrites_only_from_first_change(repo, tmp_path):
+    _load(repo, range(5, 11))
+    exporter, paths = _exporter(repo, tmp_path)
+    exporter.run()
+    before = _read_bytes(paths)
+
+    delete_analyses_where(repo, "SELECT ANALYSIS_ID FROM TB_REVIEW_GPT_ANALYSIS WHERE REVIEW_ID = 8")
+    result = exporter.run()
+    assert (result['mode'], result['deleted'], result['rewritten'], result['total']) == ('merge', 1, 2, 9)
+    _assert_matches_full(repo, tmp_path, paths)
+
+    # 앞의 7건은 그대로 (잘라낸 위치 앞의 바이트가 같음)
+    offsets = np.load(paths['index.npz'])
+    after = _read_bytes(paths)
+    for name, key in (('out.json', 'json'), ('out.jsonl', 'jsonl'), ('out.csv', 'csv')):
+        cut = int(offsets[f'offsets_{key}'][7])
+        assert after[name][:cut] == before[name][:cut]
+
+
+def test_failed_merge_restores_files(repo, tmp_path):
+    _load(repo, range(5, 11))
+    exporter, paths = _exporter(repo, tmp_path)
+    exporter.run()
+    before = _read_bytes(paths)
+    state = open(paths['state.json'], encoding='utf-8').read()
+
+    delete_analyses_where(repo, "SELECT ANALYSIS_ID FROM TB_REVIEW_GPT_ANALYSIS WHERE REVIEW_ID = 6")
+
+    def failing_brand(name):
+        raise RuntimeError('브랜드 변환 실패')
+
+    exporter.brand_fn = failing_brand
+    with pytest.raises(RuntimeError):
+        exporter.run()
+    assert _read_bytes(paths) == before
+    assert open(paths['state.json'], encoding='utf-8').read() == state
+    assert exporter.load_state() is not None
+
+    exporter.brand_fn = lambda name: name
+    assert exporter.run()['deleted'] == 1
+    _assert_matches_full(repo, tmp_path, paths)
@@ -0,0 +1,85 @@
+"""src/checkpoint.py - 크래시로 잘린 마지막 줄 복구, 재개, 압축, 기존 JSON 결과 이관"""
+
+import json
+
+from src.checkpoint import CheckpointJournal, _repair_tail, compact_journal, load_completed_ids, read_journal, seed_journal
+
+
+def _write_torn(path, records, torn='{"review_id": 9, "sentim'):
+    """레코드를 쓰고 마지막 줄을 기록 도중 끊긴 것처럼 남김"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for rec in records:
+            f.write(json.dumps(rec, ensure_ascii=False) + '\n')
+        f.write(torn)
+
+
+RECORDS = [{'review_id': i, 'idx': i, 'sentiment': 'POS'} for i in (1, 2, 3)]
+
+
+def test_read_journal_skips_torn_last_line(tmp_path):
+    path = tmp_path / 'j.jsonl'
+    _write_torn(path, RECORDS)
+    assert list(read_journal(path)) == RECORDS
+    assert load_completed_ids(path) == {1, 2, 3}
+
+
+def test_repair_tail_truncates_to_last_newline(tmp_path):
+    path = tmp_path / 'j.jsonl'
+    _write_torn(path, RECORDS)
+    size = path.stat().st_size
+    _repair_tail(path)
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == ''.join(json.dumps(rec, ensure_ascii=False) + '\n' for rec in RECORDS)
+    assert path.stat().st_size < size
+
+    # 온전한 파일 / 개행 없는 한 줄뿐인 파일
+    _repair_tail(path)
+    assert list(read_journal(path)) == RECORDS
+    _write_torn(path, [], torn='{"review_id": 1')
+    _repair_tail(path)
+    assert path.stat().st_size == 0
+
+
+def test_resume_after_crash_appends_clean_lines(tmp_path):
+    path = tmp_path / 'j.jsonl'
+    # 잘린 줄이 4KB 청크 경계를 넘도록 긴 본문
+    _write_torn(path, RECORDS, torn='{"review_id": 4, "review": "' + '가' * 3000)
+    with CheckpointJournal(path, fsync_policy='never') as journal:
+        journal.append({'review_id': 4, 'idx': 4, 'sentiment': 'NEG'})
+
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 4
+    assert [json.loads(line)['review_id'] for line in lines] == [1, 2, 3, 4]
+
+
+def test_compact_keeps_last_record_per_id(tmp_path):
+    path = tmp_path / 'j.jsonl'
+    with CheckpointJournal(path, fsync_policy='interval') as journal:
+        journal.append({'review_id': 2, 'idx': 2, 'sentiment': 'NEU'})
+        journal.append({'_meta': 'legacy_tokens', 'tokens': 100})
+        journal.append({'review_id': 1, 'idx': 1, 'sentiment': 'POS'})
+        journal.append({'review_id': 2, 'idx': 2, 'sentiment': 'NEG'})
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"review_id": 3, "idx"')
+
+    records = compact_journal(path)
+    assert records == [{'review_id': 1, 'idx': 1, 'sentiment': 'POS'}, {'review_id': 2, 'idx': 2, 'sentiment': 'NEG'}]
+
+    # 정렬 키가 없는 레코드가 섞이면 기록 순서 유지
+    with CheckpointJournal(path) as journal:
+        journal.append({'review_id': 0, 'sentiment': 'POS'})
+    assert [rec['review_id'] for rec in compact_journal(path)] == [2, 1, 0]
+
+
+def test_seed_journal_migrates_legacy_results_once(tmp_path):
+    # gpt_analyzer: 저널 도입 이전 JSON 결과 + 누적 토큰 메타 레코드를 저널로 이관
+    path = tmp_path / 'j.jsonl'
+    legacy = RECORDS + [{'_meta': 'legacy_tokens', 'tokens': 1234}]
+    assert seed_journal(path, legacy) == 4
+    assert load_completed_ids(path) == {1, 2, 3}
+    assert compact_journal(path) == RECORDS
+
+    # 저널이 이미 있으면 덮어쓰지 않음 (이후 실행에서 재이관 없음)
+    assert seed_journal(path, [{'review_id': 99, 'idx': 99}]) == 0
+    assert load_completed_ids(path) == {1, 2, 3}
@@ -0,0 +1,65 @@
+"""src/db.py - 풀 설정 (방언별 풀 인자, DB_CONNECTOR 공개 설정)"""
+
+import sqlite3
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from src.db import create_pooled_engine, load_connector_engine
+
+
+def test_memory_sqlite_shares_one_connection():
+    engine = create_pooled_engine('sqlite:///:memory:')
+    assert isinstance(engine.pool, StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE T (X INTEGER)"))
+        conn.execute(text("INSERT INTO T VALUES (1)"))
+
+    seen = []
+
+    def read():
+        with engine.connect() as conn:
+            seen.append(conn.execute(text("SELECT COUNT(*) FROM T")).scalar())
+
+    worker = threading.Thread(target=read)
+    worker.start()
+    worker.join()
+    assert seen == [1]
+
+
+def test_file_sqlite_uses_queue_pool(tmp_path, monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '3')
+    engine = create_pooled_engine(f"sqlite:///{tmp_path / 'q.db'}")
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == 3
+
+
+def test_connector_file_url_and_connect_args(tmp_path):
+    db_path = tmp_path / 'c.db'
+    connector = tmp_path / 'connector.txt'
+    connector.write_text(
+        "from sqlalchemy import create_engine\n"
+        "connect_args = {'timeout': 7}\n"
+        f"engine = create_engine(r'sqlite:///{db_path}', connect_args=connect_args)\n",
+        encoding='utf-8')
+    engine = load_connector_engine(str(connector))
+    assert isinstance(engine.pool, QueuePool)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+    assert str(engine.url).endswith('c.db')
+
+
+def test_connector_file_creator(tmp_path):
+    db_path = tmp_path / 'd.db'
+    connector = tmp_path / 'connector.txt'
+    connector.write_text(
+        "import sqlite3\n"
+        "from sqlalchemy import create_engine\n"
+        f"creator = lambda: sqlite3.connect(r'{db_path}', check_same_thread=False)\n"
+        "engine = create_engine('sqlite://', creator=creator)\n",
+        encoding='utf-8')
+    engine = load_connector_engine(str(connector))
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE T (X INTEGER)"))
+    assert sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM T").fetchone() == (0,)
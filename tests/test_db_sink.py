@@ -0,0 +1,90 @@
+"""src/llm_engine.DbSink - SQLite 세이브포인트 격리와 커밋 후 전달 순서 (_use_explicit_begin 경로)"""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.llm_engine import DbSink, Sink
+from src.storage import _use_explicit_begin
+
+
+class RecordingSink(Sink):
+    """after_commit으로 받은 건과 그 시점에 다른 연결에서 보이는 커밋된 행 수 기록"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.written = []
+        self.failures = []
+        self.visible = []
+
+    def write(self, records):
+        self.written.extend(item['id'] for item, _ in records)
+        with self.engine.connect() as conn:
+            self.visible.append(conn.execute(text("SELECT COUNT(*) FROM RESULT")).scalar())
+
+    def write_failures(self, failures):
+        self.failures.extend(item['id'] for item, _ in failures)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sink.db'}")
+    _use_explicit_begin(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE RESULT (ID INTEGER PRIMARY KEY, NOTE TEXT)"))
+        conn.execute(text("CREATE TABLE RESULT_CHILD (ID INTEGER)"))
+    return engine
+
+
+def insert(conn, item, outcome):
+    # 자식 행을 먼저 넣고 부모 INSERT가 실패하면 세이브포인트가 자식 행까지 되돌려야 함
+    conn.execute(text("INSERT INTO RESULT_CHILD (ID) VALUES (:id)"), {'id': item['id']})
+    if item.get('bad'):
+        raise ValueError(f"적재 실패: {item['id']}")
+    conn.execute(text("INSERT INTO RESULT (ID) VALUES (:id)"), {'id': item['id']})
+
+
+def _records(ids, bad=()):
+    return [({'id': i, 'bad': i in bad}, {'result': {}}) for i in ids]
+
+
+def _ids(engine, table):
+    with engine.connect() as conn:
+        return [r[0] for r in conn.execute(text(f"SELECT ID FROM {table} ORDER BY ID"))]
+
+
+def test_failed_item_rolls_back_only_its_savepoint(engine):
+    sink = DbSink(engine, insert_fn=insert, commit_every=1000, commit_interval=3600)
+    acked = RecordingSink(engine)
+    sink.after_commit.append(acked)
+
+    sink.write(_records([1, 2]))
+    sink.write(_records([3, 4, 5], bad={4}))
+    sink.close()
+
+    assert _ids(engine, 'RESULT') == [1, 2, 3, 5]
+    assert _ids(engine, 'RESULT_CHILD') == [1, 2, 3, 5]
+    assert sink.failed == 1
+    assert sink.count == 4
+    assert acked.written == [1, 2, 3, 5]
+    assert acked.failures == [4]
+
+
+def test_ack_only_after_commit(engine):
+    sink = DbSink(engine, insert_fn=insert, commit_every=3, commit_interval=3600)
+    acked = RecordingSink(engine)
+    sink.after_commit.append(acked)
+
+    sink.write(_records([1, 2]))
+    assert acked.written == []
+    assert _ids(engine, 'RESULT') == []  # 커밋 전에는 다른 연결에서 안 보임
+
+    sink.write(_records([3]))  # commit_every 도달 → 커밋 후 전달
+    assert acked.written == [1, 2, 3]
+    assert acked.visible == [3]
+    assert sink.commits == 1
+
+    sink.write(_records([4]))
+    sink.rollback()  # 롤백된 건은 전달되지 않음 (큐에 남아 다시 처리)
+    sink.close()
+    assert acked.written == [1, 2, 3]
+    assert _ids(engine, 'RESULT') == [1, 2, 3]
@@ -0,0 +1,61 @@
+"""src/dedup.py - 근사 중복 전파 감사 파일 (실행별 이어 쓰기, 실제 전파된 멤버만 기록)"""
+
+import json
+from types import SimpleNamespace
+
+from src.dedup import write_propagation_audit
+from src.llm_engine import DataFrameSink, LLMAnalyzer, PromptSpec
+from src.resilience import RetryPolicy
+
+
+GOOD = '이 토너 정말 촉촉하고 순해서 매일 아침 저녁으로 잘 쓰고 있어요 재구매 의사 있습니다'
+BAD = '향이 너무 강하고 바르자마자 따가워서 결국 반품했습니다 민감성 피부는 비추합니다'
+
+
+class FakeClient:
+    """BAD 리뷰는 분류되지 않는 오류(재시도 없음)로 실패하는 chat.completions 대역"""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, model, messages, temperature, max_tokens):
+        if BAD in messages[-1]['content']:
+            raise RuntimeError('서버 오류')
+        return SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+            choices=[SimpleNamespace(message=SimpleNamespace(content='{"sentiment": "POS"}'))],
+        )
+
+
+def _run(audit_path, items):
+    analyzer = LLMAnalyzer(FakeClient(), PromptSpec('{review}'), policy=RetryPolicy(max_retries=0), workers=1,
+                           dedup_threshold=0.8, dedup_audit_path=audit_path)
+    analyzer.run(items, [DataFrameSink(None, [])])
+    return analyzer.telemetry.run_id
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_audit_lists_only_propagated_members(tmp_path):
+    audit_path = tmp_path / 'audit.jsonl'
+    items = [{'id': i, 'key': i, 'text': GOOD if i <= 3 else BAD, 'rating': 5} for i in range(1, 6)]
+    run_id = _run(audit_path, items)
+
+    rows = _read(audit_path)
+    # BAD 클러스터는 대표가 실패해 멤버(5)에 결과가 전파되지 않음
+    assert [(r['member_id'], r['representative_id']) for r in rows] == [(2, 1), (3, 1)]
+    assert {r['run_id'] for r in rows} == {run_id}
+
+
+def test_audit_appends_across_runs(tmp_path):
+    audit_path = tmp_path / 'audit.jsonl'
+    first = _run(audit_path, [{'id': i, 'key': i, 'text': GOOD, 'rating': 5} for i in (1, 2)])
+    second = _run(audit_path, [{'id': i, 'key': i, 'text': GOOD, 'rating': 5} for i in (3, 4)])
+
+    rows = _read(audit_path)
+    assert [(r['run_id'], r['member_id']) for r in rows] == [(first, 2), (second, 4)]
+    assert write_propagation_audit(audit_path, 'empty', []) == 0
+    assert len(_read(audit_path)) == 2
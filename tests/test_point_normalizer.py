@@ -0,0 +1,85 @@
+"""src/point_normalizer.py - 정규화 / 줄기 매칭 (부정 표현, 짧은 줄기 오매칭)"""
+
+import pytest
+
+from recategorize_pain_points import PAIN_MAPPING
+from recategorize_positive_points import POSITIVE_MAPPING
+from src.categorizer import CategorizationEngine, CategoryMapping
+from src.point_normalizer import StemMatcher, compact_mapping, negations, normalize_point
+
+
+@pytest.fixture(scope='module')
+def pain():
+    return StemMatcher(PAIN_MAPPING)
+
+
+@pytest.fixture(scope='module')
+def positive():
+    return StemMatcher(POSITIVE_MAPPING)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('너무 건조해요!', '건조'),
+    ('겨울에 건조함', '겨울에건조'),
+    ('좀 끈적거려요', '끈적거려'),
+    ('', ''),
+])
+def test_normalize_point(text, expected):
+    assert normalize_point(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('자극 안 됨', {'안'}),
+    ('냄새 안남', {'안'}),
+    ('안좋음', {'안'}),
+    ('안전한 성분', set()),
+    ('보습 부족', {'부족'}),
+    ('별로 촉촉하지 않음', {'별로', '않'}),
+])
+def test_negations(text, expected):
+    assert negations(text) == expected
+
+
+def test_exact_and_normalized_match(pain, positive):
+    for source, target in PAIN_MAPPING.items():
+        assert pain.match(source) == target
+    assert pain.match('너무 건조해요!') == PAIN_MAPPING['건조']
+    assert pain.match('효과가 없어요') == PAIN_MAPPING['효과가 없음']
+    assert positive.match('너무 촉촉해요') == POSITIVE_MAPPING['촉촉']
+
+
+@pytest.mark.parametrize('text', ['자극 안 됨', '냄새 안남', '안 비쌈', '건조 안함', '건조하지 않음'])
+def test_negated_pain_not_matched(pain, text):
+    assert pain.match(text) is None
+
+
+@pytest.mark.parametrize('text', ['안 촉촉함', '보습 부족', '별로 촉촉하지 않음'])
+def test_negated_positive_not_matched(positive, text):
+    assert positive.match(text) is None
+
+
+@pytest.mark.parametrize('matcher, text', [
+    ('pain', '각질제거는 흠'),
+    ('positive', '순해서 사용하기 좋아요'),
+    ('positive', '가볍게 피부결 정리하기 좋음'),
+])
+def test_short_stem_inside_phrase_not_matched(request, matcher, text):
+    assert request.getfixturevalue(matcher).match(text) is None
+
+
+def test_compact_mapping_same_result():
+    compact = compact_mapping(PAIN_MAPPING)
+    assert len(compact) < len(PAIN_MAPPING)
+    matcher = StemMatcher(compact)
+    for source, target in PAIN_MAPPING.items():
+        assert matcher.match(source) == target
+
+
+def test_engine_reports_stem_matches(pain):
+    engine = CategorizationEngine([CategoryMapping('PAIN', 'pain_points', PAIN_MAPPING, matcher=pain)])
+    item = engine.apply({'pain_points': ['너무 건조해요!', '자극 안 됨', '건조']})
+    assert item['pain_points'] == [PAIN_MAPPING['건조'], '자극 안 됨']
+    report = engine.report()
+    assert report['mappings']['PAIN']['stem_matches'] == {
+        '너무 건조해요!': {'target': PAIN_MAPPING['건조'], 'count': 1}}
+    assert report['unmapped']['pain_points']['top'] == [('자극 안 됨', 1)]
@@ -0,0 +1,74 @@
+"""src/resilience.py - 오류 분류, 서킷 브레이커 half-open 시험 호출, 파싱 실패 누적"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from src.resilience import (
+    ERROR_PARSE, ERROR_UNKNOWN, CircuitBreaker, CircuitOpenError, LLMCallError, RetryPolicy, call_with_retry,
+    classify_error
+)
+from src.response_parser import ResponseParseError
+
+
+def test_only_response_parse_errors_are_parse():
+    assert classify_error(ResponseParseError('JSON 없음')) == ERROR_PARSE
+    try:
+        json.loads('{')
+    except json.JSONDecodeError as e:
+        assert classify_error(e) == ERROR_PARSE
+    assert classify_error(ValueError('잘못된 인자')) == ERROR_UNKNOWN
+
+
+def test_half_open_allows_one_probe():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    time.sleep(0.06)
+
+    assert breaker.allow_request()      # 시험 호출 시작
+    assert breaker.allow_request()      # 같은 스레드의 재시도는 통과
+    others = []
+    worker = threading.Thread(target=lambda: others.append(breaker.allow_request()))
+    worker.start()
+    worker.join()
+    assert others == [False]            # 다른 스레드는 시험 호출이 끝날 때까지 차단
+
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    worker = threading.Thread(target=lambda: others.append(breaker.allow_request()))
+    worker.start()
+    worker.join()
+    assert others == [False, True]
+
+
+def test_stalled_probe_is_replaced():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    time.sleep(0.06)                    # 시험 호출이 끝나지 않음 → 다른 스레드가 새로 시험 호출
+    others = []
+    worker = threading.Thread(target=lambda: others.append(breaker.allow_request()))
+    worker.start()
+    worker.join()
+    assert others == [True]
+
+
+def test_parse_failures_open_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+    policy = RetryPolicy(max_retries=3, max_parse_retries=1)
+
+    def broken():
+        raise ResponseParseError('JSON 없음')
+
+    for _ in range(2):
+        with pytest.raises(LLMCallError) as info:
+            call_with_retry(broken, policy=policy, breaker=breaker)
+        assert info.value.category == ERROR_PARSE
+        assert info.value.attempts == 2
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        call_with_retry(broken, policy=policy, breaker=breaker)
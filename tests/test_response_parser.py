@@ -0,0 +1,104 @@
+"""src/response_parser.py - 코드 블록, 후행 쉼표, 잘린 응답, 허용되지 않은 값"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.llm_engine import LLMAnalyzer, PromptSpec, ResponseCache
+from src.resilience import RetryPolicy
+from src.response_parser import (
+    FULL_SCHEMA, POINTS_SCHEMA, REPAIR_FIXED, REPAIR_TRUNCATED, ResponseParseError, extract_json, parse_response
+)
+
+
+FULL = {'sentiment': 'POS', 'pain_points': [], 'positive_points': ['촉촉함'], 'benefit_tags': ['보습'],
+        'texture_tags': [], 'usage_tags': [], 'value_tags': ['가성비']}
+
+
+def test_fenced_response_with_explanation():
+    content = '분석 결과입니다.\n```json\n' + json.dumps(FULL, ensure_ascii=False) + '\n```\n참고하세요.'
+    result, failed, dropped = parse_response(content, FULL_SCHEMA)
+    assert result == FULL
+    assert failed == {} and dropped == {}
+
+
+def test_trailing_comma_is_repaired():
+    content = '{"sentiment": "NEG", "pain_points": ["자극", "건조함",], "positive_points": [],}'
+    assert extract_json(content) == ({'sentiment': 'NEG', 'pain_points': ['자극', '건조함'],
+                                      'positive_points': []}, REPAIR_FIXED)
+    result, failed, _ = parse_response(content, POINTS_SCHEMA)
+    assert result['pain_points'] == ['자극', '건조함'] and failed == {}
+
+
+def test_truncated_response_marks_cut_and_missing_fields_failed():
+    content = '{"sentiment": "POS", "pain_points": [], "positive_points": ["촉촉함", "진정 효'
+    data, repair = extract_json(content)
+    assert repair == REPAIR_TRUNCATED
+    assert data == {'sentiment': 'POS', 'pain_points': [], 'positive_points': ['촉촉함', '진정 효']}
+
+    result, failed, _ = parse_response(content, FULL_SCHEMA)
+    assert result['sentiment'] == 'POS'
+    # 끊긴 마지막 키 + 응답에 없는 태그 필드는 "해당 없음"이 아니라 실패
+    assert failed == {'positive_points': '잘림', 'benefit_tags': '누락', 'texture_tags': '누락',
+                      'usage_tags': '누락', 'value_tags': '누락'}
+
+
+def test_finish_reason_length_marks_last_field_failed():
+    content = json.dumps({'sentiment': 'POS', 'pain_points': [], 'positive_points': ['촉촉함']},
+                         ensure_ascii=False)
+    assert parse_response(content, POINTS_SCHEMA)[1] == {}
+    assert parse_response(content, POINTS_SCHEMA, truncated=True)[1] == {'positive_points': '잘림'}
+
+
+def test_off_enum_values_are_dropped_and_reported():
+    content = json.dumps(dict(FULL, sentiment='positive', benefit_tags=['보습', '미백', '진정'],
+                              value_tags=['최고']), ensure_ascii=False)
+    result, failed, dropped = parse_response(content, FULL_SCHEMA)
+    assert result['sentiment'] == 'POS'
+    assert result['benefit_tags'] == ['보습', '진정'] and result['value_tags'] == []
+    assert failed == {}
+    assert dropped == {'benefit_tags': ['미백'], 'value_tags': ['최고']}
+
+    _, failed, _ = parse_response(json.dumps(dict(FULL, sentiment='좋음'), ensure_ascii=False), FULL_SCHEMA)
+    assert set(failed) == {'sentiment'}
+
+
+def test_no_json_raises():
+    with pytest.raises(ResponseParseError):
+        parse_response('죄송합니다. 분석할 수 없습니다.', FULL_SCHEMA)
+
+
+class TruncatingClient:
+    """첫 호출은 max_tokens로 잘린 응답, 이후(필드 재요청)는 요청된 필드만 응답하는 대역"""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=self)
+        self.prompts = []
+
+    def create(self, model, messages, temperature, max_tokens):
+        self.prompts.append(messages[-1]['content'])
+        if len(self.prompts) == 1:
+            content, finish_reason = '{"sentiment": "POS", "pain_points": [], "positive_points": ["촉촉', 'length'
+        else:
+            content = json.dumps({'positive_points': ['촉촉함'], 'benefit_tags': ['보습'], 'texture_tags': [],
+                                  'usage_tags': [], 'value_tags': ['가성비']}, ensure_ascii=False)
+            finish_reason = 'stop'
+        return SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)],
+        )
+
+
+def test_engine_rerequests_truncated_fields_before_caching(tmp_path):
+    client = TruncatingClient()
+    cache = ResponseCache(tmp_path / 'cache.jsonl')
+    analyzer = LLMAnalyzer(client, PromptSpec('{review}', schema=FULL_SCHEMA), policy=RetryPolicy(max_retries=0),
+                           cache=cache)
+    outcome = analyzer.analyze({'id': 1, 'text': '촉촉하고 가성비 좋아요', 'rating': 5})
+    cache.close()
+
+    assert outcome['error'] is None
+    assert outcome['result'] == FULL
+    assert len(client.prompts) == 2 and '"benefit_tags"' in client.prompts[1]
+    assert analyzer.metrics.field_repairs == 1
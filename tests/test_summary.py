@@ -0,0 +1,84 @@
+"""src/summary.py - 증분 갱신 (구간 색인, 삭제 기록)이 전체 재집계와 같은 결과인지"""
+
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from src.maintenance import delete_analyses_where, recategorize_points
+from src.storage import PAIN_TABLE, SENTIMENT_SUMMARY_TABLE, SQLiteRepository
+from src.summary import SUMMARY_SPECS, read_summary, refresh_summaries
+
+
+REVIEWS = pd.DataFrame({
+    'REVIEW_ID': range(1, 9),
+    'BRAND_NAME': ['라운드랩 독도 토너', '아누아 어성초 토너'] * 4,
+    'REVIEW_CONTENT': [f'리뷰 {i}' for i in range(1, 9)],
+    'REVIEW_RATING': 5,
+    'REVIEW_DATE': ['2025-03-01', '2025-04-01'] * 4,
+    'PLATFORM_CODE': ['OLIVEYOUNG_M', 'COUPANG_M', 'COUPANG_M', 'OLIVEYOUNG_M'] * 2,
+})
+
+
+def _load(repo, review_ids):
+    with repo.engine.begin() as conn, repo.bulk_loader(conn) as loader:
+        for rid in review_ids:
+            loader.add(rid, rid % 5 + 1, ['POS', 'NEG'][rid % 2], 1, 1, {
+                'pain_points': ['건조함'] if rid % 2 else ['끈적임', '향'],
+                'pain_categories': ['건조'] if rid % 2 else ['끈적', '향'],
+                'benefit_tags': ['보습'],
+            })
+
+
+def _snapshot(repo):
+    with repo.engine.connect() as conn:
+        frames = {table: read_summary(conn, table) for table in SUMMARY_SPECS}
+    return {table: df.sort_values(list(df.columns)).reset_index(drop=True) for table, df in frames.items()}
+
+
+def _assert_matches_full(repo):
+    incremental = _snapshot(repo)
+    assert refresh_summaries(repo, full=True)['mode'] == 'full'
+    full = _snapshot(repo)
+    for table in SUMMARY_SPECS:
+        pd.testing.assert_frame_equal(incremental[table], full[table], check_dtype=False)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = SQLiteRepository(path=str(tmp_path / 's.db'))
+    repo.create_schema(drop=True)
+    repo.load_reviews(REVIEWS)
+    _load(repo, range(1, 5))
+    assert refresh_summaries(repo)['mode'] == 'full'
+    return repo
+
+
+def test_insert_is_incremental(repo):
+    _load(repo, [5])
+    result = refresh_summaries(repo)
+    assert result['mode'] == 'incremental'
+    assert result['slices'] >= 1
+    _assert_matches_full(repo)
+
+
+def test_recategorized_analyses_are_reaggregated(repo):
+    recategorize_points(repo.engine, PAIN_TABLE, {'끈적임': '건조'})
+    result = refresh_summaries(repo, overlap=timedelta(days=1))
+    assert result['mode'] == 'incremental'
+    _assert_matches_full(repo)
+
+
+def test_deletes_are_picked_up_from_the_delete_log(repo):
+    delete_analyses_where(repo, "SELECT ANALYSIS_ID FROM TB_REVIEW_GPT_ANALYSIS WHERE REVIEW_ID IN (1, 2)")
+    _load(repo, [6])
+    result = refresh_summaries(repo)
+    assert result['mode'] == 'incremental'
+    with repo.engine.connect() as conn:
+        total = conn.execute(text(f"SELECT SUM(REVIEW_COUNT) FROM {SENTIMENT_SUMMARY_TABLE}")).scalar()
+        logged = conn.execute(text("SELECT COUNT(*) FROM TB_ANALYSIS_DELETE_LOG")).scalar()
+    assert total == 3
+    assert logged == 2
+    _assert_matches_full(repo)
+
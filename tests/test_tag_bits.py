@@ -0,0 +1,53 @@
+"""src/tag_bits.TagBitmap - 새 비트는 별도 연결에서 바로 커밋 (적재 트랜잭션 롤백과 무관)"""
+
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+
+from src.storage import SQLiteRepository
+from src.tag_bits import TagBitmap
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = str(tmp_path / 't.db')
+    # 읽기 트랜잭션이 열린 채로 다른 연결이 커밋할 수 있도록 (Oracle의 행 단위 잠금에 해당)
+    raw = sqlite3.connect(path)
+    raw.execute("PRAGMA journal_mode=WAL")
+    raw.close()
+    repo = SQLiteRepository(path=path, tag_layout='packed')
+    repo.create_schema(drop=True)
+    return repo.engine
+
+
+def _bits(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT TAG_TYPE, TAG_VALUE, BIT_NO FROM TB_TAG_BITS ORDER BY BIT_NO")).fetchall()
+
+
+def test_allocation_survives_rollback(engine):
+    bitmap = TagBitmap(engine)
+    with engine.connect() as conn:
+        tx = conn.begin()
+        assert bitmap.bit(conn, 'BENEFIT', '보습') == 0
+        assert bitmap.bit(conn, 'BENEFIT', '진정') == 1
+        tx.rollback()
+    assert _bits(engine) == [('BENEFIT', '보습', 0), ('BENEFIT', '진정', 1)]
+
+
+def test_allocation_race_rereads(engine):
+    bitmap = TagBitmap(engine)
+    with engine.connect() as conn:
+        with conn.begin():
+            assert bitmap.bit(conn, 'BENEFIT', '보습') == 0
+        # 다른 워커가 같은 값과 다음 비트를 먼저 할당
+        with engine.begin() as other:
+            other.execute(text("""
+                INSERT INTO TB_TAG_BITS (TAG_TYPE, TAG_VALUE, BIT_NO, BIT_VALUE) VALUES
+                ('BENEFIT', '진정', 1, 2), ('BENEFIT', '장벽', 2, 4)
+            """))
+        with conn.begin():
+            assert bitmap.bit(conn, 'BENEFIT', '진정') == 1
+            assert bitmap.bit(conn, 'BENEFIT', '결') == 3
+    assert [row[1:] for row in _bits(engine)] == [('보습', 0), ('진정', 1), ('장벽', 2), ('결', 3)]
@@ -0,0 +1,54 @@
+"""src/telemetry.py - API 호출 1회 = attempt 행, 리뷰 합계는 review 행"""
+
+import json
+from types import SimpleNamespace
+
+from src.llm_engine import DataFrameSink, LLMAnalyzer, PromptSpec
+from src.resilience import ERROR_PARSE, ERROR_TIMEOUT, RetryPolicy
+from src.telemetry import KIND_ATTEMPT, KIND_REVIEW, load_run_summaries
+
+
+class FlakyClient:
+    """시간 초과 → 깨진 응답 → 정상 응답 순서로 돌려주는 chat.completions 대역"""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=self)
+        self.calls = 0
+
+    def create(self, model, messages, temperature, max_tokens):
+        self.calls += 1
+        if self.calls == 1:
+            raise TimeoutError('응답 없음')
+        content = '분석할 수 없습니다' if self.calls == 2 else '{"sentiment": "POS"}'
+        return SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=self.calls),
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason='stop')],
+        )
+
+
+def test_one_row_per_attempt(tmp_path):
+    path = tmp_path / 'telemetry.jsonl'
+    analyzer = LLMAnalyzer(FlakyClient(), PromptSpec('{review}'), policy=RetryPolicy(base_delay=0, max_delay=0),
+                           workers=1, telemetry_path=str(path))
+    analyzer.run([{'id': 7, 'key': 0, 'text': '촉촉해요', 'rating': 5}], [DataFrameSink(None, [])])
+
+    with open(path, encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    attempts = [r for r in rows if r['kind'] == KIND_ATTEMPT]
+    reviews = [r for r in rows if r['kind'] == KIND_REVIEW]
+
+    assert [(a['review_id'], a['attempt'], a['error_class']) for a in attempts] == [
+        (7, 1, ERROR_TIMEOUT), (7, 2, ERROR_PARSE), (7, 3, None)
+    ]
+    assert [a['tokens_out'] for a in attempts] == [0, 2, 3]
+    assert len(reviews) == 1
+    review = reviews[0]
+    assert (review['api_calls'], review['retries'], review['error_class']) == (3, 2, None)
+    assert review['total_latency_sec'] >= max(a['latency_sec'] for a in attempts)
+
+    summary = load_run_summaries(path)[analyzer.telemetry.run_id]
+    assert (summary['reviews'], summary['api_calls']) == (1, 3)
+    assert summary['attempt_error_classes'] == {ERROR_TIMEOUT: 1, ERROR_PARSE: 1}
+    assert summary['retry_classes'] == {ERROR_TIMEOUT: 1, ERROR_PARSE: 1}
+    assert summary == dict(analyzer.telemetry.summary(), elapsed_sec=summary['elapsed_sec'],
+                           requests_per_sec=summary['requests_per_sec'], reviews_per_sec=summary['reviews_per_sec'])
@@ -0,0 +1,129 @@
+"""src/work_queue.py - 리스 만료, 하트비트, 커밋 후 완료 처리"""
+
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+from src.llm_engine import DbSink
+from src.work_queue import (
+    STATUS_DONE, STATUS_FAILED, STATUS_LEASED, STATUS_PENDING, SQLiteQueueBackend, WorkQueue, run_with_queue
+)
+
+
+ITEMS = [{'id': i, 'text': f'리뷰 {i}', 'rating': 5} for i in range(1, 6)]
+
+
+class WritingAnalyzer:
+    """리스된 item 중 write_ids만 싱크에 적재하고 (커밋 전) 큐 상태를 기록하는 분석기 대역"""
+
+    def __init__(self, backend, write_ids=None):
+        self.backend = backend
+        self.write_ids = write_ids
+        self.before_commit = None
+
+    def run(self, items, sinks, desc=None):
+        records = [(item, {'result': {}}) for item in items
+                   if self.write_ids is None or item['id'] in self.write_ids]
+        for sink in sinks:
+            sink.write(records)
+        self.before_commit = self.backend.stats()
+        for sink in sinks:
+            sink.close()
+        return {'stopped': False}
+
+
+def _db_sink(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'out.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE RESULT (ID INTEGER PRIMARY KEY)"))
+
+    def insert(conn, item, outcome):
+        conn.execute(text("INSERT INTO RESULT (ID) VALUES (:id)"), {'id': item['id']})
+    return engine, DbSink(engine, insert_fn=insert, commit_every=1000, commit_interval=3600)
+
+
+def test_expired_lease_moves_to_another_worker(tmp_path):
+    backend = SQLiteQueueBackend(tmp_path / 'q.db')
+    first, second = WorkQueue(backend, 'w1', lease_seconds=0.2), WorkQueue(backend, 'w2', lease_seconds=60)
+    first.enqueue_items(ITEMS)
+    assert len(first.lease_items(10)) == 5
+    assert second.lease_items(10) == []
+
+    time.sleep(0.3)
+    assert [item['id'] for item in second.lease_items(10)] == [1, 2, 3, 4, 5]
+    # 만료된 리스의 완료 처리는 새 소유자의 리스를 건드리지 않음
+    assert backend.complete('w1', [1, 2]) == 0
+    assert backend.stats()[STATUS_LEASED] == 5
+
+
+def test_heartbeat_keeps_lease(tmp_path):
+    backend = SQLiteQueueBackend(tmp_path / 'q.db')
+    worker, other = WorkQueue(backend, 'w1', lease_seconds=1.5), WorkQueue(backend, 'w2')
+    worker.enqueue_items(ITEMS)
+    with worker:
+        worker.lease_items(10)
+        time.sleep(2.5)  # 하트비트(1초 간격)가 없으면 1.5초에 만료
+        assert other.lease_items(10) == []
+    # 종료 시 남은 리스 반납
+    assert backend.stats()[STATUS_PENDING] == 5
+
+
+def test_ack_after_commit(tmp_path):
+    backend = SQLiteQueueBackend(tmp_path / 'q.db')
+    work_queue = WorkQueue(backend, 'w1')
+    work_queue.enqueue_items(ITEMS)
+    engine, sink = _db_sink(tmp_path)
+    analyzer = WritingAnalyzer(backend)
+
+    stats = run_with_queue(analyzer, work_queue, [sink])
+    assert analyzer.before_commit[STATUS_DONE] == 0
+    assert analyzer.before_commit[STATUS_LEASED] == 5
+    assert stats['completed'] == 5
+    assert backend.stats()[STATUS_DONE] == 5
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM RESULT")).scalar() == 5
+
+
+def test_unwritten_ids_go_back_to_queue(tmp_path):
+    backend = SQLiteQueueBackend(tmp_path / 'q.db')
+    work_queue = WorkQueue(backend, 'w1', max_attempts=2)
+    work_queue.enqueue_items(ITEMS)
+    _, sink = _db_sink(tmp_path)
+
+    # 적재되지 않은 3건은 완료가 아니라 실패 → 다시 리스되어 max_attempts번 시도 후 failed
+    stats = run_with_queue(WritingAnalyzer(backend, write_ids={1, 2}), work_queue, [sink])
+    assert stats['completed'] == 2
+    assert stats['unconfirmed'] == 6
+    counts = backend.stats()
+    assert counts[STATUS_DONE] == 2
+    assert counts[STATUS_FAILED] == 3
+    assert counts[STATUS_LEASED] == 0
+
+
+def test_enqueue_requeues_failed_and_deleted_done(tmp_path):
+    backend = SQLiteQueueBackend(tmp_path / 'q.db')
+    work_queue = WorkQueue(backend, 'w1', max_attempts=1)
+    work_queue.enqueue_items(ITEMS[:3])
+    work_queue.lease_items(10)
+    work_queue.complete([1])
+    work_queue.fail([2], '파싱 실패')          # max_attempts=1 → failed
+    assert backend.stats()[STATUS_FAILED] == 1
+
+    # 미분석으로 다시 조회됨: 1(분석 삭제된 done), 2(failed), 3(다른 워커가 처리 중), 4(신규)
+    listed_at = datetime.now()
+    assert work_queue.enqueue_items(ITEMS[:4], listed_at=listed_at) == 3
+    counts = backend.stats()
+    assert (counts[STATUS_PENDING], counts[STATUS_LEASED], counts[STATUS_FAILED]) == (3, 1, 0)
+    assert sorted(item['id'] for item in WorkQueue(backend, 'w2').lease_items(10)) == [1, 2, 4]
+
+
+def test_enqueue_keeps_done_completed_after_listing(tmp_path):
+    backend = SQLiteQueueBackend(tmp_path / 'q.db')
+    work_queue = WorkQueue(backend, 'w1')
+    listed_at = datetime.now()                 # 미분석 조회 시작
+    work_queue.enqueue_items(ITEMS[:1])
+    work_queue.lease_items(10)
+    work_queue.complete([1])                   # 조회 뒤에 다른 워커가 완료 → 다시 대기하면 중복 분석
+    assert work_queue.enqueue_items(ITEMS[:1], listed_at=listed_at) == 0
+    assert backend.stats()[STATUS_DONE] == 1
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 경량 분류기 학습 + 평가
+- 기존 GPT 라벨(JSON 결과 파일, TB_REVIEW_GPT_ANALYSIS)로 학습
+- 홀드아웃 평가 리포트: output/local_classifier_report.json
+- 모델 저장: output/local_classifier.npz (ai_enhancer.enhance_with_ai(local_model=...)에서 사용)
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from src.local_classifier import (
+    DEFAULT_CONFIDENCE, LocalReviewClassifier, evaluate, load_labels_from_db,
+    load_labels_from_json, print_evaluation, split_holdout
+)
+from src.storage import open_repository
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+load_dotenv('config/.env')
+
+MODEL_PATH = 'output/local_classifier.npz'
+REPORT_PATH = 'output/local_classifier_report.json'
+
+# (GPT 결과 파일, idx가 가리키는 리뷰 원본) - 위에서부터 우선
+LABEL_SOURCES = [
+    ('output/gpt_analysis_roundlab.json', 'data/올영리뷰데이터_utf8.json'),
+    ('output/gpt_analysis_results.json', 'data/올영리뷰데이터_utf8.json'),
+    ('output/gpt_analysis_roundlab.json', 'data/올영리뷰데이터_utf8.csv'),
+    ('output/gpt_analysis_categorized.json', 'data/oliveyoung_reviews_processed.csv'),
+]
+
+
+def load_reviews(path):
+    """리뷰 원본 로드 (JSON: {쿼리: [레코드]} / CSV)"""
+    path = Path(path)
+    if path.suffix == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        first_key = list(data.keys())[0]
+        return pd.DataFrame(data[first_key])
+    # 원본 CSV는 기본 파서로 읽히지 않아 data_loader와 동일하게 python 엔진 사용
+    return pd.read_csv(path, encoding='utf-8-sig', engine='python', on_bad_lines='skip')
+
+
+def load_all_labels():
+    """사용 가능한 모든 라벨 소스 결합"""
+    frames = []
+    reviews_cache = {}
+    loaded = set()
+    for labels_path, reviews_path in LABEL_SOURCES:
+        # 같은 결과 파일은 먼저 찾은 원본 하나로만 (JSON 원본이 없을 때 CSV로 대체)
+        if labels_path in loaded or not os.path.exists(labels_path) or not os.path.exists(reviews_path):
+            continue
+        loaded.add(labels_path)
+        if reviews_path not in reviews_cache:
+            reviews_cache[reviews_path] = load_reviews(reviews_path)
+        labels = load_labels_from_json(labels_path, reviews_cache[reviews_path])
+        print(f"  {labels_path}: {len(labels):,}건")
+        frames.append(labels)
+
+    connector_path = os.getenv('DB_CONNECTOR')
+    if os.getenv('REVIEW_DB_URL') or (connector_path and os.path.exists(connector_path)):
+        repo = open_repository()
+        with repo.engine.connect() as conn:
+            labels = load_labels_from_db(conn, tag_source=repo.tag_source())
+        print(f"  TB_REVIEW_GPT_ANALYSIS: {len(labels):,}건")
+        frames.append(labels)
+
+    if not frames:
+        return pd.DataFrame()
+
+    labels = pd.concat(frames, ignore_index=True)
+    # 같은 리뷰 텍스트는 마지막 라벨만 사용
+    return labels.drop_duplicates(subset='text', keep='last').reset_index(drop=True)
+
+
+def main():
+    print("=" * 60)
+    print("로컬 경량 분류기 학습")
+    print("=" * 60)
+
+    print("\n[1] GPT 라벨 로드...")
+    labels = load_all_labels()
+    if labels.empty:
+        print("  학습할 라벨이 없습니다.")
+        return
+    print(f"  합계 (중복 제거): {len(labels):,}건")
+
+    train, test = split_holdout(labels, test_size=0.2)
+    print(f"  학습: {len(train):,}건 / 평가: {len(test):,}건")
+
+    print("\n[2] 학습...")
+    start = time.perf_counter()
+    model = LocalReviewClassifier().fit(train['text'].tolist(), train)
+    print(f"  완료: {time.perf_counter() - start:.1f}초 (태그 {len(model.tags)}개)")
+
+    print("\n[3] 홀드아웃 평가...")
+    start = time.perf_counter()
+    report = evaluate(model, test, threshold=DEFAULT_CONFIDENCE)
+    report['predict_seconds'] = round(time.perf_counter() - start, 3)
+    print_evaluation(report)
+
+    # 최종 모델은 전체 라벨로 재학습
+    model = LocalReviewClassifier().fit(labels['text'].tolist(), labels)
+    model.save(MODEL_PATH)
+
+    with open(REPORT_PATH, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n저장: {MODEL_PATH}")
+    print(f"리포트: {REPORT_PATH}")
+
+
+if __name__ == "__main__":
+    main()